@@ -2,7 +2,7 @@
 
 from fastapi import FastAPI
 
-from app.api.endpoints import auth, photo, photo_guest, project
+from app.api.endpoints import auth, metrics, photo, photo_guest, project
 
 
 def register_routers(app: FastAPI) -> None:
@@ -16,3 +16,4 @@ def register_routers(app: FastAPI) -> None:
     app.include_router(project.router)
     app.include_router(photo.router)
     app.include_router(photo_guest.router)
+    app.include_router(metrics.router)
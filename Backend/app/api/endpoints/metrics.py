@@ -0,0 +1,32 @@
+"""Metrics API endpoints"""
+
+from fastapi import APIRouter, Depends, status
+
+from app.core.config import settings
+from app.core.constant.messages import MessageConstants
+from app.schemas.common import ApiResponse
+from app.utils import metrics
+from app.utils.auth import verify_metrics_token
+
+router = APIRouter(prefix=settings.API_V1_STR, tags=["Metrics"])
+
+
+@router.get(
+    "/metrics",
+    response_model=ApiResponse[dict],
+    status_code=status.HTTP_200_OK,
+    summary="Get process metrics",
+    description="Counters, gauges and latency summaries of the serving worker process (requires METRICS_TOKEN)",
+    dependencies=[Depends(verify_metrics_token)],
+)
+def get_metrics() -> ApiResponse[dict]:
+    """
+    Get in-process metrics of the worker that handles the request.
+
+    Includes storage operation latency and connection pool saturation.
+    """
+    return ApiResponse(
+        success=True,
+        message=MessageConstants.METRICS_RETRIEVED,
+        data=metrics.snapshot(),
+    )
@@ -1,9 +1,10 @@
 """Photo API endpoints"""
 
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Path, Query, UploadFile, status
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlmodel import Session
 
 from app.core.config import settings
@@ -19,17 +20,22 @@ from app.schemas.common import (
     pagination_params_dep,
 )
 from app.schemas.photo import (
+    BulkEditedUploadResponse,
     PhotoDetailResponse,
     PhotoListResponse,
 )
-from app.services import photo_service
+from app.schemas.photo_download import ArchiveLayout, ArchiveVersion, PhotoArchiveJobResponse, PhotoArchiveSpec
+from app.schemas.photo_sync import PhotoSyncRequest, PhotoSyncResponse
+from app.services import photo_archive_service, photo_service, photo_sync_service
 from app.services.photo_download_service import (
     build_photo_download_scripts_response,
     build_photo_manifest,
-    build_photo_manifest_zip,
-    generate_csv_content,
+    prepare_photo_archive,
+    stream_photo_archive,
 )
+from app.services.photo_export_service import EXPORT_CONTENT_TYPES, open_manifest_export
 from app.utils.auth import get_current_user
+from app.utils.http_range import content_range
 
 router = APIRouter(
     prefix=f"{settings.API_V1_STR}/photos",
@@ -111,6 +117,42 @@ async def upload_edited_photo(
         data=photo_detail,
     )
 
+@router.post(
+    "/edited/bulk",
+    response_model=ApiResponse[BulkEditedUploadResponse],
+    status_code=status.HTTP_201_CREATED,
+    summary="Bulk upload edited photos",
+    description="Upload many edited JPEG photos, matched to originals by filename or variant postfix",
+)
+async def upload_edited_photos_bulk(
+    files: list[UploadFile] = File(..., description="Edited JPEG image files"),
+    project_id: str = Form(..., description="Project ID to upload photos to"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> ApiResponse[BulkEditedUploadResponse]:
+    """Upload many edited JPEG photos to a project"""
+    # Convert project_id string to UUID
+    try:
+        project_uuid = UUID(project_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid project_id format",
+        )
+
+    bulk_result = await photo_service.upload_edited_photos_bulk(
+        db=db,
+        user=current_user,
+        project_id=project_uuid,
+        files=files,
+    )
+    return ApiResponse(
+        success=True,
+        message=MessageConstants.PHOTO_UPLOADED,
+        data=bulk_result,
+    )
+
+
 @router.get(
     "/{photo_id}",
     status_code=status.HTTP_200_OK,
@@ -145,11 +187,17 @@ async def get_photo(
             detail=MessageConstants.PHOTO_NOT_FOUND,
         )
 
+    headers = {"Content-Disposition": f"inline; filename={photo_response['filename']}"}
+
+    # Local files are served by the server directly (no copy through Python memory)
+    if photo_response.get("path"):
+        return FileResponse(photo_response["path"], media_type=photo_response["content_type"], headers=headers)
+
     # Return streaming response
     return StreamingResponse(
         photo_response["stream"],
         media_type=photo_response["content_type"],
-        headers={"Content-Disposition": f"inline; filename={photo_response['filename']}"},
+        headers=headers,
     )
 
 
@@ -187,6 +235,33 @@ def list_project_photos(
     )
 
 
+@router.post(
+    "/projects/{project_id}/sync",
+    response_model=ApiResponse[PhotoSyncResponse],
+    status_code=status.HTTP_200_OK,
+    summary="Diff local files against project",
+    description="Report which local files are missing, changed or should be uploaded as edited variants",
+)
+def sync_project_photos(
+    project_id: UUID,
+    sync_request: PhotoSyncRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> ApiResponse[PhotoSyncResponse]:
+    """Diff a desktop client's file list (filename, size, sha256) against the project"""
+    sync_result = photo_sync_service.sync_project_photos(
+        db=db,
+        user=current_user,
+        project_id=project_id,
+        sync_request=sync_request,
+    )
+    return ApiResponse(
+        success=True,
+        message=MessageConstants.PHOTO_SYNC_COMPLETED,
+        data=sync_result,
+    )
+
+
 @router.get(
     "/{photo_id}/meta",
     status_code=status.HTTP_200_OK,
@@ -225,31 +300,41 @@ async def download_photos(
         regex="^(manifest|scripts)$",
         description="Download type: manifest (ZIP with selected photos) or scripts (shell templates)",
     ),
+    version: ArchiveVersion = Query(ArchiveVersion.ORIGINAL, description="Manifest ZIP: original, edited or edited_or_original"),
+    size: int = Query(None, ge=1, le=2000, description="Manifest ZIP: rendition width for a web-size bundle"),
+    layout: ArchiveLayout = Query(ArchiveLayout.BY_EXTENSION, description="Manifest ZIP: by_extension, by_version or flat"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
     Download project photos as manifest ZIP or script templates.
 
-    - **type=manifest**: Returns ZIP with selected photos organized by extension (Selected/[EXT]/filename) + photos.csv
+    - **type=manifest**: Returns ZIP with selected photos organized by extension (Selected/[EXT]/filename) + photos.csv,
+      served from the pre-built archive when the selection has one; version, size and layout change the content
     - **type=scripts**: Returns JSON with PowerShell, Bash, and Zsh script templates
     """
     if type == "manifest":
         try:
-            zip_buffer = build_photo_manifest_zip(db, project_id, current_user.id)
+            spec = PhotoArchiveSpec(version=version, size=size, layout=layout)
+            archive = prepare_photo_archive(db, project_id, current_user.id, spec)
         except ValueError as e:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
-        # Get project name for filename
-        from app.crud import project_crud
+        project_name = archive.project_title.replace(" ", "_")
+        headers = {"Content-Disposition": f"attachment; filename={project_name}_selected_photos.zip"}
 
-        project = project_crud.get_by_id(db, project_id)
-        project_name = project.title.replace(" ", "_") if project else "photos"
+        # Serve the archive pre-built for this selection when there is one
+        ready_archive = await photo_archive_service.open_ready_archive(archive)
+        if ready_archive and ready_archive.get("path"):
+            return FileResponse(ready_archive["path"], media_type="application/zip", headers=headers)
+        if ready_archive:
+            headers["Content-Length"] = str(ready_archive["size"])
+            return StreamingResponse(ready_archive["stream"], media_type="application/zip", headers=headers)
 
         return StreamingResponse(
-            iter([zip_buffer.getvalue()]),
+            stream_photo_archive(archive),
             media_type="application/zip",
-            headers={"Content-Disposition": f"attachment; filename={project_name}_selected_photos.zip"},
+            headers=headers,
         )
 
     elif type == "scripts":
@@ -273,20 +358,144 @@ async def download_photos(
     description="Get selected photos with comments as CSV file",
     status_code=status.HTTP_200_OK,
 )
-async def download_photos_csv(
+def download_photos_csv(
     project_id: UUID,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Download selected photos with comments as CSV"""
+    """Download selected photos with comments as CSV, streamed row by row"""
     try:
-        manifest = build_photo_manifest(db, project_id, current_user.id)
+        project_title, csv_stream = open_manifest_export(db, project_id, current_user.id)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
-    csv_content = generate_csv_content(manifest)
     return StreamingResponse(
-        iter([csv_content]),
+        csv_stream,
         media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename={manifest.project_title.replace(' ', '_')}_photos.csv"},
+        headers={"Content-Disposition": f"attachment; filename={project_title.replace(' ', '_')}_photos.csv"},
+    )
+
+
+@router.get(
+    "/{project_id}/download-photos/export",
+    summary="Export photo manifest",
+    description="Stream the project's photos with their full comment history as CSV or NDJSON",
+    status_code=status.HTTP_200_OK,
+)
+def export_photo_manifest(
+    project_id: UUID,
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="Export format: csv or ndjson (one JSON object per line)"),
+    scope: str = Query("all", pattern="^(all|selected)$", description="Export all photos or only selected ones"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Export photos with comment history, generated from a server-side cursor with bounded memory"""
+    try:
+        project_title, export_stream = open_manifest_export(
+            db,
+            project_id,
+            current_user.id,
+            export_format=format,
+            selected_only=scope == "selected",
+            with_history=True,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    return StreamingResponse(
+        export_stream,
+        media_type=EXPORT_CONTENT_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename={project_title.replace(' ', '_')}_manifest.{format}"},
+    )
+
+
+@router.post(
+    "/{project_id}/download-photos/archive",
+    response_model=ApiResponse[PhotoArchiveJobResponse],
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Start archive job",
+    description="Build the selected-photo ZIP in the background; an unchanged selection reuses the finished archive",
+)
+async def start_photo_archive(
+    project_id: UUID,
+    spec: Optional[PhotoArchiveSpec] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> ApiResponse[PhotoArchiveJobResponse]:
+    """Start (or reuse) a background archive job, progress is published as task_progress messages"""
+    job = await photo_archive_service.start_photo_archive_job(db=db, user=current_user, project_id=project_id, spec=spec)
+    return ApiResponse(
+        success=True,
+        message=MessageConstants.ARCHIVE_JOB_STARTED,
+        data=job,
+    )
+
+
+@router.get(
+    "/{project_id}/download-photos/archive/{job_id}",
+    response_model=ApiResponse[PhotoArchiveJobResponse],
+    status_code=status.HTTP_200_OK,
+    summary="Get archive job",
+    description="Poll the state of a background archive job",
+)
+async def get_photo_archive(
+    project_id: UUID,
+    job_id: str = Path(..., pattern="^[0-9a-f]{64}$", description="Archive job ID"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> ApiResponse[PhotoArchiveJobResponse]:
+    """Get archive job state (status, progress, download URL once completed)"""
+    job = await photo_archive_service.get_photo_archive_job(db=db, user=current_user, project_id=project_id, job_id=job_id)
+    return ApiResponse(
+        success=True,
+        message=MessageConstants.ARCHIVE_JOB_RETRIEVED,
+        data=job,
+    )
+
+
+@router.get(
+    "/{project_id}/download-photos/archive/{job_id}/download",
+    summary="Download archive",
+    description="Download a finished archive, resumable with a Range header",
+    status_code=status.HTTP_200_OK,
+)
+async def download_photo_archive(
+    project_id: UUID,
+    job_id: str = Path(..., pattern="^[0-9a-f]{64}$", description="Archive job ID"),
+    range_header: str = Header(None, alias="Range", description="Single byte range, e.g. bytes=1048576-"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Serve a finished archive (206 Partial Content for a byte range)"""
+    archive = await photo_archive_service.open_photo_archive(
+        db=db,
+        user=current_user,
+        project_id=project_id,
+        job_id=job_id,
+        range_header=range_header,
     )
+
+    headers = {
+        "Content-Disposition": f"attachment; filename={archive['filename']}",
+        "ETag": f'"{job_id}"',
+    }
+
+    # Local files are served by the server directly, including Range handling
+    if archive.get("path"):
+        return FileResponse(archive["path"], media_type="application/zip", headers=headers)
+
+    headers["Accept-Ranges"] = "bytes"
+    byte_range = archive["range"]
+    if byte_range:
+        start, end = byte_range
+        headers["Content-Range"] = content_range(start, end, archive["size"])
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(
+            archive["stream"],
+            status_code=status.HTTP_206_PARTIAL_CONTENT,
+            media_type="application/zip",
+            headers=headers,
+        )
+
+    headers["Content-Length"] = str(archive["size"])
+    return StreamingResponse(archive["stream"], media_type="application/zip", headers=headers)
@@ -3,7 +3,7 @@
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlmodel import Session
 
 from app.core.config import settings
@@ -18,6 +18,7 @@ from app.schemas.common import (
 )
 from app.schemas.photo import PhotoListResponse, PhotoMetaResponse, PhotoSelectRequest
 from app.services import photo_guest_service
+from app.services.photo_download_service import stream_photo_archive
 
 router = APIRouter(
     prefix=f"{settings.API_V1_STR}/photos-guest",
@@ -25,6 +26,28 @@ router = APIRouter(
 )
 
 
+@router.get(
+    "/selection/archive",
+    status_code=status.HTTP_200_OK,
+    summary="Download selected photos (guest)",
+    description="Stream a ZIP of the selected photos at preview size - requires project token, rate limited per token",
+)
+async def download_selection_archive(
+    project_token: str = Query(..., description="Project access token"),
+    db: Session = Depends(get_db),
+):
+    """Stream the selected photos as a ZIP of preview renditions using project token"""
+    archive = await photo_guest_service.prepare_selection_archive_guest(db=db, project_token=project_token)
+
+    project_name = archive.project_title.replace(" ", "_")
+    headers = {"Content-Disposition": f"attachment; filename={project_name}_selected_previews.zip"}
+    return StreamingResponse(
+        stream_photo_archive(archive),
+        media_type="application/zip",
+        headers=headers,
+    )
+
+
 @router.get(
     "/{photo_id}",
     status_code=status.HTTP_200_OK,
@@ -57,11 +80,17 @@ async def get_photo_image(
             detail="Photo not found",
         )
 
+    headers = {"Content-Disposition": f"inline; filename={photo_response['filename']}"}
+
+    # Local files are served by the server directly (no copy through Python memory)
+    if photo_response.get("path"):
+        return FileResponse(photo_response["path"], media_type=photo_response["content_type"], headers=headers)
+
     # Return streaming response
     return StreamingResponse(
         photo_response["stream"],
         media_type=photo_response["content_type"],
-        headers={"Content-Disposition": f"inline; filename={photo_response['filename']}"},
+        headers=headers,
     )
 
 
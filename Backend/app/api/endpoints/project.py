@@ -2,7 +2,8 @@
 
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Path, UploadFile, status
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlmodel import Session
 
 from app.core.config import settings
@@ -15,6 +16,7 @@ from app.schemas.common import (
     pagination_params_dep,
 )
 from app.schemas.project import (
+    ProjectBackupJobResponse,
     ProjectCreate,
     ProjectCreateToken,
     ProjectResponse,
@@ -22,8 +24,9 @@ from app.schemas.project import (
     ProjectUpdate,
     VerifyProjectToken,
 )
-from app.services import project_service
+from app.services import project_backup_service, project_service
 from app.utils.auth import get_current_user
+from app.utils.http_range import content_range
 
 router = APIRouter(prefix=f"{settings.API_V1_STR}/projects", tags=["Projects"])
 
@@ -237,3 +240,135 @@ def get_active_project_token(
         message=MessageConstants.PROJECT_TOKEN_RETRIEVED,
         data=project_token,
     )
+
+
+@router.post(
+    "/restore",
+    response_model=ApiResponse[ProjectBackupJobResponse],
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Restore project backup",
+    description="Upload a project backup and restore it in the background, keeping its IDs",
+)
+async def restore_project_backup(
+    backup_file: UploadFile = File(..., description="Backup ZIP written by a backup job"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> ApiResponse[ProjectBackupJobResponse]:
+    """Start a restore job, progress is published as task_progress messages"""
+    job = await project_backup_service.start_project_restore_job(db=db, user=current_user, backup_file=backup_file)
+    return ApiResponse(
+        success=True,
+        message=MessageConstants.PROJECT_RESTORE_STARTED,
+        data=job,
+    )
+
+
+@router.get(
+    "/restore/{job_id}",
+    response_model=ApiResponse[ProjectBackupJobResponse],
+    status_code=status.HTTP_200_OK,
+    summary="Get restore job",
+    description="Poll the state of a background restore job",
+)
+async def get_restore_job(
+    job_id: str = Path(..., pattern="^[0-9a-f]{32}$", description="Restore job ID"),
+    current_user: User = Depends(get_current_user),
+) -> ApiResponse[ProjectBackupJobResponse]:
+    """Get restore job state (status, progress, restored project ID once completed)"""
+    job = await project_backup_service.get_project_restore_job(user=current_user, job_id=job_id)
+    return ApiResponse(
+        success=True,
+        message=MessageConstants.PROJECT_RESTORE_RETRIEVED,
+        data=job,
+    )
+
+
+@router.post(
+    "/{project_id}/backup",
+    response_model=ApiResponse[ProjectBackupJobResponse],
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Start backup job",
+    description="Write a backup of the project (rows and objects) in the background",
+)
+async def start_project_backup(
+    project_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> ApiResponse[ProjectBackupJobResponse]:
+    """Start a backup job, progress is published as task_progress messages"""
+    job = await project_backup_service.start_project_backup_job(db=db, user=current_user, project_id=project_id)
+    return ApiResponse(
+        success=True,
+        message=MessageConstants.PROJECT_BACKUP_STARTED,
+        data=job,
+    )
+
+
+@router.get(
+    "/{project_id}/backup/{job_id}",
+    response_model=ApiResponse[ProjectBackupJobResponse],
+    status_code=status.HTTP_200_OK,
+    summary="Get backup job",
+    description="Poll the state of a background backup job",
+)
+async def get_project_backup(
+    project_id: UUID,
+    job_id: str = Path(..., pattern="^[0-9a-f]{32}$", description="Backup job ID"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> ApiResponse[ProjectBackupJobResponse]:
+    """Get backup job state (status, progress, download URL once completed)"""
+    job = await project_backup_service.get_project_backup_job(db=db, user=current_user, project_id=project_id, job_id=job_id)
+    return ApiResponse(
+        success=True,
+        message=MessageConstants.PROJECT_BACKUP_RETRIEVED,
+        data=job,
+    )
+
+
+@router.get(
+    "/{project_id}/backup/{job_id}/download",
+    summary="Download backup",
+    description="Download a finished backup, resumable with a Range header",
+    status_code=status.HTTP_200_OK,
+)
+async def download_project_backup(
+    project_id: UUID,
+    job_id: str = Path(..., pattern="^[0-9a-f]{32}$", description="Backup job ID"),
+    range_header: str = Header(None, alias="Range", description="Single byte range, e.g. bytes=1048576-"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Serve a finished backup (206 Partial Content for a byte range)"""
+    backup = await project_backup_service.open_project_backup(
+        db=db,
+        user=current_user,
+        project_id=project_id,
+        job_id=job_id,
+        range_header=range_header,
+    )
+
+    headers = {
+        "Content-Disposition": f"attachment; filename={backup['filename']}",
+        "ETag": f'"{job_id}"',
+    }
+
+    # Local files are served by the server directly, including Range handling
+    if backup.get("path"):
+        return FileResponse(backup["path"], media_type="application/zip", headers=headers)
+
+    headers["Accept-Ranges"] = "bytes"
+    byte_range = backup["range"]
+    if byte_range:
+        start, end = byte_range
+        headers["Content-Range"] = content_range(start, end, backup["size"])
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(
+            backup["stream"],
+            status_code=status.HTTP_206_PARTIAL_CONTENT,
+            media_type="application/zip",
+            headers=headers,
+        )
+
+    headers["Content-Length"] = str(backup["size"])
+    return StreamingResponse(backup["stream"], media_type="application/zip", headers=headers)
@@ -27,6 +27,7 @@ class Settings(BaseSettings):
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 30  # 30 days
+    METRICS_TOKEN: str = ""  # Bearer token of the metrics scraper, empty closes GET /metrics
 
     # Server Configuration
     SERVER_NAME: str = "UrlsBE"
@@ -60,6 +61,11 @@ class Settings(BaseSettings):
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: str = "urls123"
     REDIS_DB: int = 0
+    REDIS_CACHE_DB: int = 1  # Binary cache entries, kept apart from the Celery broker DB
+
+    # Storage Backend Configuration
+    STORAGE_BACKEND: str = "minio"  # "minio" or "local" (single node, files under STORAGE_LOCAL_ROOT)
+    STORAGE_LOCAL_ROOT: str = "/data/storage"
 
     # MinIO Configuration
     MINIO_ENDPOINT: str = "minio:9000"
@@ -69,6 +75,67 @@ class Settings(BaseSettings):
     MINIO_PUBLIC_BUCKET_NAME: str = "photos"
     MINIO_SECURE: bool = False
     MINIO_PUBLIC_URL: str = "http://localhost:9000"
+    MINIO_IO_THREADS: int = 32  # Thread pool running blocking MinIO calls for async handlers
+    MINIO_POOL_MAXSIZE: int = 32  # HTTP connections kept per MinIO host, match MINIO_IO_THREADS
+    MINIO_CONNECT_TIMEOUT: float = 5.0  # Seconds
+    MINIO_READ_TIMEOUT: float = 60.0  # Seconds
+    MINIO_HTTP_RETRIES: int = 2  # Transport-level retries per call (connection errors, 5xx)
+    MINIO_BREAKER_FAILURE_THRESHOLD: int = 5  # Consecutive failures of one operation type that open the breaker
+    MINIO_BREAKER_RESET_SECONDS: float = 30.0  # Open breaker fails fast this long, then lets one probe through
+    STORAGE_HEDGE_DELAY_MS: int = 0  # Thumbnail reads send a second request after this delay, 0 disables hedging
+    # Extra storage shards, JSON list of {"name", "endpoint", "access_key", "secret_key", "bucket",
+    # "public_url", "secure", "weight"}; the MINIO_* settings above are always the "default" shard
+    MINIO_SHARDS: list[dict] = []
+    MINIO_DEFAULT_SHARD_WEIGHT: int = 1  # Share of new projects placed on the default shard, 0 drains it
+
+    # Storage Cache Configuration
+    STORAGE_DISK_CACHE_DIR: str = ""  # Node-local read cache directory, empty disables it
+    STORAGE_DISK_CACHE_MAX_BYTES: int = 5 * 1024 * 1024 * 1024  # 5 GB per node, shared by all worker processes
+    STORAGE_DISK_CACHE_MAX_OBJECT_BYTES: int = 50 * 1024 * 1024  # Larger objects are not cached
+    RENDITION_MEMORY_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # In-process thumbnail cache per worker
+    RENDITION_MEMORY_CACHE_MAX_ENTRY_BYTES: int = 2 * 1024 * 1024  # Fits guest archive previews, not full-size images
+    RENDITION_REDIS_CACHE_MAX_ENTRY_BYTES: int = 2 * 1024 * 1024  # Shared cache across workers and nodes
+    RENDITION_REDIS_CACHE_TTL_SECONDS: int = 60 * 60 * 24 * 7  # 7 days
+
+    # Upload Configuration
+    UPLOAD_MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10 MB per file
+    UPLOAD_MAX_BULK_REQUEST_SIZE: int = 2 * 1024 * 1024 * 1024  # 2 GB per bulk request
+    UPLOAD_MULTIPART_OVERHEAD: int = 64 * 1024  # Form fields and part headers
+    UPLOAD_SNIFF_BYTES: int = 16 * 1024  # Leading bytes inspected per file part
+    UPLOAD_MAX_IMAGE_DIMENSION: int = 20000  # Max width/height in pixels
+
+    # Archive Configuration
+    ARCHIVE_PREFETCH_CONCURRENCY: int = 8  # Object downloads kept in flight ahead of the ZIP writer
+    ARCHIVE_PREFETCH_MAX_BYTES: int = 128 * 1024 * 1024  # Cap on prefetched data waiting to be written
+    ARCHIVE_TEMP_DIR: str = ""  # Worker scratch directory for archives being built (system temp if empty)
+    ARCHIVE_STALE_GRACE_SECONDS: int = 60 * 60  # Superseded cached archives kept this long for running downloads
+    ARCHIVE_DOWNLOAD_CHUNK_SIZE: int = 1024 * 1024  # Ranged reads per chunk when serving a cached archive
+    ARCHIVE_PREBUILD_ON_PENDING_EDIT: bool = True  # Build the selection archive when a project enters pending_edit
+    MANIFEST_EXPORT_BATCH_SIZE: int = 5000  # Rows fetched per server-side cursor round trip
+    MANIFEST_EXPORT_CHUNK_BYTES: int = 64 * 1024  # Export output buffered before each streamed chunk
+    GUEST_ARCHIVE_PREVIEW_WIDTH: int = 1600  # Preview width in guest selection downloads (must fit the rendition caches)
+    GUEST_ARCHIVE_RATE_LIMIT: int = 5  # Guest selection downloads per project token and window, 0 disables
+    GUEST_ARCHIVE_RATE_WINDOW_SECONDS: int = 60 * 60  # 1 hour
+
+    # Project Backup Configuration
+    PROJECT_BACKUP_BATCH_SIZE: int = 5000  # Rows per NDJSON part, cursor round trip and restore transaction
+    PROJECT_BACKUP_OBJECT_CONCURRENCY: int = 8  # Object reads (backup) or writes (restore) in flight
+
+    # Storage GC Configuration
+    STORAGE_GC_GRACE_SECONDS: int = 60 * 60  # Unreferenced objects are kept this long before removal
+    STORAGE_GC_BATCH_SIZE: int = 1000  # Objects removed per batch / DB round trip
+    STORAGE_GC_INTERVAL_SECONDS: int = 60 * 60  # Periodic sweep (requires celery beat)
+    STORAGE_RECONCILE_INTERVAL_SECONDS: int = 60 * 60 * 24  # Report-only reconciliation run
+    STORAGE_REBALANCE_INTERVAL_SECONDS: int = 60 * 60 * 24  # Moves projects after shards are added or reweighted
+    STORAGE_REBALANCE_BATCH_SIZE: int = 100  # Projects checked per page (resume cursor saved after each)
+    STORAGE_REBALANCE_LOCK_SECONDS: int = 60 * 60  # Guard against overlapping runs, renewed per page
+    STORAGE_BACKFILL_BATCH_SIZE: int = 500  # Legacy versions moved to content addresses per page
+    TASK_PROGRESS_TTL_SECONDS: int = 60 * 60 * 24  # Task progress hashes kept for 24 hours
+
+    # Idempotency Configuration
+    IDEMPOTENCY_TTL_SECONDS: int = 60 * 60 * 24  # Stored responses kept for 24 hours
+    IDEMPOTENCY_LOCK_TTL_SECONDS: int = 60 * 5  # In-progress marker expiry, refreshed while the handler runs
+    IDEMPOTENCY_MAX_BODY_BYTES: int = 1024 * 1024  # Larger responses are not stored
 
     @computed_field  # type: ignore[prop-decorator]
     @property
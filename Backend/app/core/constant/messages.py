@@ -19,6 +19,7 @@ class MessageConstants:
     INVALID_GOOGLE_TOKEN_FORMAT = "invalid_google_token_format"
     INVALID_AUTH_SCHEME = "invalid_auth_scheme"
     TOKEN_VERIFICATION_FAILED = "token_verification_failed"
+    METRICS_ACCESS_DENIED = "metrics_access_denied"
 
     # User Error Messages
     USER_NOT_FOUND = "user_not_found"
@@ -32,6 +33,10 @@ class MessageConstants:
     PROJECT_LIST_RETRIEVED = "project_list_retrieved"
     PROJECT_TOKEN_VERIFIED = "project_token_verified"
     PROJECT_TOKEN_RETRIEVED = "project_token_retrieved"
+    PROJECT_BACKUP_STARTED = "project_backup_started"
+    PROJECT_BACKUP_RETRIEVED = "project_backup_retrieved"
+    PROJECT_RESTORE_STARTED = "project_restore_started"
+    PROJECT_RESTORE_RETRIEVED = "project_restore_retrieved"
 
     # Project Error Messages
     PROJECT_NOT_FOUND = "project_not_found"
@@ -43,20 +48,41 @@ class MessageConstants:
     PROJECT_TOKEN_ALREADY_EXISTS = "project_token_already_exists"
     PROJECT_ALREADY_EXISTS = "project_already_exists"
     INVALID_PROJECT_TOKEN = "invalid_project_token"
+    PROJECT_BACKUP_NOT_FOUND = "project_backup_not_found"
+    PROJECT_BACKUP_NOT_READY = "project_backup_not_ready"
+    PROJECT_BACKUP_JOB_UNAVAILABLE = "project_backup_job_unavailable"
+    INVALID_PROJECT_BACKUP = "invalid_project_backup"
 
     # Photo Success Messages
     PHOTO_UPLOADED = "photo_uploaded"
     PHOTO_RETRIEVED = "photo_retrieved"
     PHOTO_LIST_RETRIEVED = "photo_list_retrieved"
+    PHOTO_SYNC_COMPLETED = "photo_sync_completed"
+    ARCHIVE_JOB_STARTED = "archive_job_started"
+    ARCHIVE_JOB_RETRIEVED = "archive_job_retrieved"
 
     # Photo Error Messages
     PHOTO_NOT_FOUND = "photo_not_found"
     PHOTO_NOT_SELECTED = "photo_not_selected"
     INVALID_FILE_TYPE = "invalid_file_type"
     FILE_TOO_LARGE = "file_too_large"
+    IMAGE_DIMENSIONS_TOO_LARGE = "image_dimensions_too_large"
     DUPLICATE_FILENAME = "duplicate_filename"
     MINIO_UPLOAD_ERROR = "minio_upload_error"
+    STORAGE_UNAVAILABLE = "storage_unavailable"
     PROJECT_PERMISSION_DENIED = "project_permission_denied"
+    ARCHIVE_NOT_FOUND = "archive_not_found"
+    ARCHIVE_NOT_READY = "archive_not_ready"
+    ARCHIVE_JOB_UNAVAILABLE = "archive_job_unavailable"
+    INVALID_RANGE = "invalid_range"
+
+    # Metrics Messages
+    METRICS_RETRIEVED = "metrics_retrieved"
+
+    # Request Error Messages
+    IDEMPOTENCY_REQUEST_IN_PROGRESS = "idempotency_request_in_progress"
+    IDEMPOTENCY_KEY_REUSED = "idempotency_key_reused"
+    RATE_LIMIT_EXCEEDED = "rate_limit_exceeded"
 
     # Log Messages
     LOG_FIREBASE_LOGIN_REQUEST = "firebase_login_request"
@@ -1,12 +1,17 @@
 """CRUD operations for Photo model"""
 
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy.orm import Session
+from sqlalchemy import String, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, aliased
 
 from app.models.photo import Photo, PhotoStatus
-from app.models.photo_version import VersionType
+from app.models.photo_comment import PhotoComment
+from app.models.photo_version import PhotoVersion, VersionType
+from app.models.stored_object import StoredObject
 from app.schemas.common import PaginationSortSearchSchema
 from app.schemas.photo import PhotoCreate
 
@@ -71,18 +76,9 @@ def get_by_filename_with_variant(
     if exact_photo:
         return exact_photo
 
-    # If not found, extract base name and postfix
-    # Naming pattern: <Name>_<postfix>.<ext>
-    base_name, dot, ext = filename.rpartition(".")
-
-    # Check if filename has postfix pattern (underscore followed by version/variant)
-    if "_" in base_name:
-        # Get the last underscore-separated part
-        parts = base_name.rsplit("_", 1)
-        potential_base = parts[0]
-
-        # Try to find the base filename
-        base_filename = f"{potential_base}{dot}{ext}" if dot else potential_base
+    # If not found, try the base filename of the variant
+    base_filename = variant_base_filename(filename)
+    if base_filename:
         base_photo = get_by_project_and_filename(db, project_id, base_filename)
 
         if base_photo:
@@ -91,6 +87,60 @@ def get_by_filename_with_variant(
     return None
 
 
+def variant_base_filename(filename: str) -> Optional[str]:
+    """
+    Get the base filename for a variant filename.
+
+    Naming pattern: <Name>_<postfix>.<ext> -> <Name>.<ext>
+
+    Args:
+        filename: Filename that may carry a variant postfix
+
+    Returns:
+        Base filename, or None if the filename has no postfix
+    """
+    base_name, dot, ext = filename.rpartition(".")
+
+    # Check if filename has postfix pattern (underscore followed by version/variant)
+    if "_" not in base_name:
+        return None
+
+    # Get the last underscore-separated part
+    potential_base = base_name.rsplit("_", 1)[0]
+    return f"{potential_base}{dot}{ext}" if dot else potential_base
+
+
+class PhotoFilenameIndex:
+    """
+    In-memory filename index of a project's photos.
+
+    Resolves original and variant filenames with dict lookups instead of
+    one or two queries per file (see get_by_filename_with_variant).
+    """
+
+    def __init__(self, photos: List[Photo]):
+        self.by_filename: Dict[str, Photo] = {photo.filename: photo for photo in photos}
+
+    def resolve(self, filename: str) -> tuple[Optional[Photo], Optional[str]]:
+        """Return (photo, matched_filename) for an exact or variant filename"""
+        photo = self.by_filename.get(filename)
+        if photo:
+            return photo, filename
+
+        base_filename = variant_base_filename(filename)
+        if base_filename:
+            photo = self.by_filename.get(base_filename)
+            if photo:
+                return photo, base_filename
+
+        return None, None
+
+
+def get_filename_index(db: Session, project_id: UUID) -> PhotoFilenameIndex:
+    """Load all photos of a project once into a filename index"""
+    return PhotoFilenameIndex(get_all_by_project(db, project_id))
+
+
 def get_by_project(
     db: Session,
     project_id: UUID,
@@ -140,3 +190,159 @@ def get_all_by_project(
 ) -> List[Photo]:
     """Get all photos in a project (selected and not selected)"""
     return db.query(Photo).filter(Photo.project_id == project_id).all()
+
+
+def get_selection_manifest(
+    db: Session,
+    project_id: UUID,
+    shard: str,
+    version_type: VersionType = VersionType.ORIGINAL,
+    fallback_version_type: Optional[VersionType] = None,
+) -> List[Tuple]:
+    """
+    Selected photos of a project with everything downloads need, in one query.
+
+    Rows are (Photo, PhotoVersion or None, latest_comment, object_size):
+    the requested version (or the fallback version for photos without
+    one), the content of the newest comment (picked with a window function
+    instead of a query per photo) and the stored size of the version's
+    content on the shard. Rows are ordered by filename.
+    """
+    ranked_comments = (
+        select(
+            PhotoComment.photo_id,
+            PhotoComment.content,
+            func.row_number()
+            .over(partition_by=PhotoComment.photo_id, order_by=PhotoComment.created_at.desc())
+            .label("comment_rank"),
+        )
+        .join(Photo, Photo.id == PhotoComment.photo_id)
+        .where(Photo.project_id == project_id, Photo.is_selected == True)
+        .subquery()
+    )
+    versions = [version_type] + ([fallback_version_type] if fallback_version_type else [])
+    version_aliases = [aliased(PhotoVersion) for _ in versions]
+    object_aliases = [aliased(StoredObject) for _ in versions]
+
+    statement = select(Photo).where(Photo.project_id == project_id, Photo.is_selected == True)
+    for version, version_alias, object_alias in zip(versions, version_aliases, object_aliases, strict=True):
+        statement = (
+            statement.add_columns(version_alias, object_alias.size)
+            .outerjoin(
+                version_alias,
+                (version_alias.photo_id == Photo.id) & (version_alias.version_type == version.value),
+            )
+            .outerjoin(
+                object_alias,
+                (object_alias.content_hash == version_alias.content_hash) & (object_alias.shard == shard),
+            )
+        )
+    statement = (
+        statement.add_columns(ranked_comments.c.content.label("latest_comment"))
+        .outerjoin(
+            ranked_comments,
+            (ranked_comments.c.photo_id == Photo.id) & (ranked_comments.c.comment_rank == 1),
+        )
+        .order_by(Photo.filename)
+    )
+
+    rows = []
+    for photo, *columns, latest_comment in db.execute(statement):
+        # (version, size) pairs in preference order, the first existing version wins
+        pairs = list(zip(columns[::2], columns[1::2], strict=True))
+        photo_version, object_size = next(((version, size) for version, size in pairs if version is not None), (None, None))
+        rows.append((photo, photo_version, latest_comment, object_size))
+    return rows
+
+
+def stream_with_comments(
+    db: Session,
+    project_id: UUID,
+    selected_only: bool = True,
+    batch_size: int = 5000,
+) -> Iterator[Row]:
+    """
+    Stream a project's photos joined with their comments through a server-side cursor.
+
+    One row per comment (a single row with NULL comment columns for photos
+    without comments), ordered by filename in byte order and then by
+    comment creation time, so rows of a photo are adjacent.
+
+    Yields:
+        Rows with photo_id, filename, is_selected, comment_content, comment_author_type, comment_created_at
+    """
+    statement = (
+        select(
+            Photo.id.label("photo_id"),
+            Photo.filename,
+            Photo.is_selected,
+            PhotoComment.content.label("comment_content"),
+            PhotoComment.author_type.label("comment_author_type"),
+            PhotoComment.created_at.label("comment_created_at"),
+        )
+        .outerjoin(PhotoComment, PhotoComment.photo_id == Photo.id)
+        .where(Photo.project_id == project_id)
+        .order_by(Photo.filename.collate("C"), Photo.id, PhotoComment.created_at)
+    )
+    if selected_only:
+        statement = statement.where(Photo.is_selected == True)
+    result = db.execute(statement.execution_options(stream_results=True, yield_per=batch_size))
+    yield from result
+
+
+def diff_against_project(
+    db: Session,
+    project_id: UUID,
+    filenames: List[str],
+    base_filenames: List[Optional[str]],
+    shard: str,
+) -> List[Row]:
+    """
+    Match client file entries against a project in one set-based query.
+
+    The entries are passed as two arrays and unnested server-side, so the
+    round trip count does not depend on the number of entries.
+
+    Args:
+        db: Database session
+        project_id: Project ID
+        filenames: Client filenames
+        base_filenames: Variant base filename per entry (None if not a variant)
+        shard: Storage shard of the project (sizes come from its stored objects)
+
+    Returns:
+        One row per entry in input order with filename, photo_id, original_hash,
+        original_size, base_photo_id, base_is_selected, edited_hash
+    """
+    entries = (
+        func.unnest(
+            bindparam("filenames", filenames, type_=ARRAY(String)),
+            bindparam("base_filenames", base_filenames, type_=ARRAY(String)),
+        )
+        .table_valued("filename", "base_filename", with_ordinality="ordinal")
+        .render_derived(name="entry")
+    )
+    exact_photo = aliased(Photo, name="exact_photo")
+    base_photo = aliased(Photo, name="base_photo")
+    original_version = aliased(PhotoVersion, name="original_version")
+    edited_version = aliased(PhotoVersion, name="edited_version")
+
+    statement = (
+        select(
+            entries.c.filename,
+            exact_photo.id.label("photo_id"),
+            original_version.content_hash.label("original_hash"),
+            StoredObject.size.label("original_size"),
+            base_photo.id.label("base_photo_id"),
+            base_photo.is_selected.label("base_is_selected"),
+            edited_version.content_hash.label("edited_hash"),
+        )
+        .select_from(entries)
+        .outerjoin(exact_photo, (exact_photo.project_id == project_id) & (exact_photo.filename == entries.c.filename))
+        .outerjoin(base_photo, exact_photo.id.is_(None) & (base_photo.project_id == project_id) & (base_photo.filename == entries.c.base_filename))
+        .outerjoin(original_version, (original_version.photo_id == exact_photo.id) & (original_version.version_type == VersionType.ORIGINAL.value))
+        .outerjoin(StoredObject, (StoredObject.content_hash == original_version.content_hash) & (StoredObject.shard == shard))
+        .outerjoin(edited_version, (edited_version.photo_id == func.coalesce(exact_photo.id, base_photo.id)) & (edited_version.version_type == VersionType.EDITED.value))
+        .order_by(entries.c.ordinal)
+    )
+    return db.execute(statement).all()
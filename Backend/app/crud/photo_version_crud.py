@@ -1,11 +1,17 @@
 """CRUD operations for PhotoVersion"""
 
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from uuid import UUID
 
+from sqlalchemy import String, cast, func, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
+from app.models.photo import Photo
 from app.models.photo_version import PhotoVersion, VersionType
+from app.models.project import Project
+from app.utils import common_utils
+from app.utils.storage_shards import DEFAULT_SHARD
 
 
 def create_photo_version(
@@ -13,6 +19,7 @@ def create_photo_version(
     photo_id: UUID,
     version_type: VersionType,
     image_url: str,
+    content_hash: Optional[str] = None,
 ) -> PhotoVersion:
     """Create a new PhotoVersion"""
     existed_photo_version = get_by_photo_and_version_type(
@@ -24,10 +31,26 @@ def create_photo_version(
         photo_id=photo_id,
         version_type=version_type.value,
         image_url=image_url,
+        content_hash=content_hash,
     )
     db.add(db_photo_version)
     return db_photo_version
 
+
+def update_content(
+    db: Session,
+    photo_version: PhotoVersion,
+    image_url: str,
+    content_hash: Optional[str],
+) -> PhotoVersion:
+    """Point an existing PhotoVersion at new stored content"""
+    photo_version.image_url = image_url
+    photo_version.content_hash = content_hash
+    photo_version.updated_at = common_utils.get_utc_now()
+    db.add(photo_version)
+    return photo_version
+
+
 def get_by_photo_and_version_type(
     db: Session,
     photo_id: UUID,
@@ -45,3 +68,136 @@ def get_by_photo_and_version_type(
         PhotoVersion or None if not found
     """
     return db.query(PhotoVersion).filter(PhotoVersion.photo_id == photo_id, PhotoVersion.version_type == version_type.value).first()
+
+
+def get_by_photos_and_version_type(
+    db: Session,
+    photo_ids: List[UUID],
+    version_type: VersionType,
+) -> Dict[UUID, PhotoVersion]:
+    """Get PhotoVersions of one type for many photos, keyed by photo_id"""
+    if not photo_ids:
+        return {}
+    versions = db.query(PhotoVersion).filter(PhotoVersion.photo_id.in_(photo_ids), PhotoVersion.version_type == version_type.value).all()
+    return {version.photo_id: version for version in versions}
+
+
+def bulk_upsert_photo_versions(
+    db: Session,
+    version_type: VersionType,
+    rows: List[dict],
+) -> None:
+    """
+    Create or repoint many PhotoVersions in a single INSERT ... ON CONFLICT.
+
+    Args:
+        db: Database session
+        version_type: Version type for every row
+        rows: Dicts with photo_id, image_url and content_hash
+    """
+    if not rows:
+        return
+    now = common_utils.get_utc_now()
+    statement = insert(PhotoVersion).values(
+        [
+            {
+                "photo_id": row["photo_id"],
+                "version_type": version_type.value,
+                "image_url": row["image_url"],
+                "content_hash": row["content_hash"],
+            }
+            for row in rows
+        ]
+    )
+    statement = statement.on_conflict_do_update(
+        constraint="uq_photo_version_photo_type",
+        set_={
+            "image_url": statement.excluded.image_url,
+            "content_hash": statement.excluded.content_hash,
+            "updated_at": now,
+        },
+    )
+    db.execute(statement)
+
+
+def count_legacy_by_project(db: Session, project_id: UUID) -> int:
+    """Count versions of a project stored under legacy per-project keys (no content hash)"""
+    return db.scalar(
+        select(func.count())
+        .select_from(PhotoVersion)
+        .join(Photo, Photo.id == PhotoVersion.photo_id)
+        .where(Photo.project_id == project_id, PhotoVersion.content_hash.is_(None))
+    )
+
+
+def get_legacy_versions(db: Session, after_id: Optional[UUID], limit: int) -> List:
+    """
+    Page of versions still stored under legacy per-project keys, in ID order.
+
+    Returns (id, version_type, project_id, filename) rows with IDs
+    greater than after_id.
+    """
+    statement = (
+        select(PhotoVersion.id, PhotoVersion.version_type, Photo.project_id, Photo.filename)
+        .join(Photo, Photo.id == PhotoVersion.photo_id)
+        .where(PhotoVersion.content_hash.is_(None))
+        .order_by(PhotoVersion.id)
+        .limit(limit)
+    )
+    if after_id is not None:
+        statement = statement.where(PhotoVersion.id > after_id)
+    return db.execute(statement).all()
+
+
+def adopt_content(db: Session, version_id: UUID, image_url: str, content_hash: str) -> bool:
+    """Point a legacy version at its content address, returns False if it was replaced meanwhile"""
+    result = db.execute(
+        update(PhotoVersion)
+        .where(PhotoVersion.id == version_id, PhotoVersion.content_hash.is_(None))
+        .values(image_url=image_url, content_hash=content_hash, updated_at=common_utils.get_utc_now())
+    )
+    return result.rowcount > 0
+
+
+def stream_legacy_object_names(
+    db: Session,
+    webp: bool = False,
+    shard: str = DEFAULT_SHARD,
+    batch_size: int = 5000,
+) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Stream legacy object keys ({project_id}/{version}/{filename}) of the
+    projects on a storage shard in byte order.
+
+    With webp=True the keys of the WebP derivatives are streamed instead
+    (extension replaced by .webp), which sort differently from the sources.
+
+    Yields:
+        (object_name, source_object_name) tuples, the source being None for
+        source keys and the JPEG key for WebP derivatives
+    """
+    prefix = cast(Photo.project_id, String) + "/" + PhotoVersion.version_type + "/"
+    source_name = prefix + Photo.filename
+    object_name = prefix + func.regexp_replace(Photo.filename, r"\.[^.]*$", "") + ".webp" if webp else source_name
+
+    statement = (
+        select(object_name.label("object_name"), source_name.label("source_name"))
+        .select_from(PhotoVersion)
+        .join(Photo, Photo.id == PhotoVersion.photo_id)
+        .join(Project, Project.id == Photo.project_id)
+        .where(PhotoVersion.content_hash.is_(None), func.coalesce(Project.storage_shard, DEFAULT_SHARD) == shard)
+        .order_by(object_name.self_group().collate("C"))
+    )
+    result = db.execute(statement.execution_options(stream_results=True, yield_per=batch_size))
+    for row in result:
+        yield row.object_name, row.source_name if webp else None
+
+
+def rebase_image_urls(db: Session, project_id: UUID, old_base: str, new_base: str) -> None:
+    """Point the image URLs of a project's versions at another storage base URL ("{public_url}/{bucket}/")"""
+    photo_ids = select(Photo.id).where(Photo.project_id == project_id)
+    db.execute(
+        update(PhotoVersion)
+        .where(PhotoVersion.photo_id.in_(photo_ids), PhotoVersion.image_url.startswith(old_base, autoescape=True))
+        .values(image_url=func.concat(new_base, func.substr(PhotoVersion.image_url, len(old_base) + 1)))
+    )
@@ -0,0 +1,100 @@
+"""CRUD operations for project backups (streamed reads and idempotent bulk inserts)"""
+
+from typing import Iterator, List, Set, Type
+from uuid import UUID
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from sqlmodel import SQLModel
+
+from app.models.client_session import ClientSession
+from app.models.photo import Photo
+from app.models.photo_version import PhotoVersion
+from app.models.stored_object import StoredObject
+
+
+def _project_filter(model: Type[SQLModel], project_id: UUID):
+    """Rows of a project: directly by project_id, or through their photo"""
+    if model in (Photo, ClientSession):
+        return model.project_id == project_id
+    return model.photo_id.in_(select(Photo.id).where(Photo.project_id == project_id))
+
+
+def count_project_rows(db: Session, model: Type[SQLModel], project_id: UUID) -> int:
+    """Number of rows of a table belonging to a project (soft-deleted included)"""
+    return db.scalar(select(func.count()).select_from(model).where(_project_filter(model, project_id))) or 0
+
+
+def stream_project_rows(db: Session, model: Type[SQLModel], project_id: UUID, batch_size: int = 5000) -> Iterator[SQLModel]:
+    """Stream a project's rows of a table through a server-side cursor, ordered by ID"""
+    statement = select(model).where(_project_filter(model, project_id)).order_by(model.id)
+    result = db.execute(statement.execution_options(stream_results=True, yield_per=batch_size))
+    for row in result:
+        yield row[0]
+
+
+def stream_project_versions(db: Session, project_id: UUID, shard: str, batch_size: int = 5000) -> Iterator[Row]:
+    """
+    Stream a project's photo versions with the size and content type of
+    their stored object on the shard (NULL for legacy versions).
+    """
+    statement = (
+        select(PhotoVersion, StoredObject.size, StoredObject.content_type)
+        .outerjoin(
+            StoredObject,
+            and_(StoredObject.shard == shard, StoredObject.content_hash == PhotoVersion.content_hash),
+        )
+        .where(_project_filter(PhotoVersion, project_id))
+        .order_by(PhotoVersion.id)
+    )
+    result = db.execute(statement.execution_options(stream_results=True, yield_per=batch_size))
+    yield from result
+
+
+def stream_project_content_hashes(db: Session, project_id: UUID, batch_size: int = 5000) -> Iterator[str]:
+    """Stream the distinct content hashes a project's versions reference"""
+    statement = (
+        select(PhotoVersion.content_hash)
+        .where(_project_filter(PhotoVersion, project_id), PhotoVersion.content_hash.isnot(None))
+        .distinct()
+        .order_by(PhotoVersion.content_hash)
+    )
+    result = db.execute(statement.execution_options(stream_results=True, yield_per=batch_size))
+    for row in result:
+        yield row[0]
+
+
+def insert_ignore_existing(db: Session, model: Type[SQLModel], rows: List[dict]) -> int:
+    """
+    Insert rows, skipping those whose ID (or another unique key) already exists.
+
+    Returns:
+        Number of rows inserted
+    """
+    if not rows:
+        return 0
+    result = db.execute(insert(model).on_conflict_do_nothing().returning(model.id), rows)
+    return len(result.all())
+
+
+def insert_versions_ignore_existing(db: Session, rows: List[dict]) -> List[str]:
+    """
+    Insert photo versions, skipping existing ones.
+
+    Returns:
+        Content hashes of the inserted content-addressed versions (one per version)
+    """
+    if not rows:
+        return []
+    result = db.execute(insert(PhotoVersion).on_conflict_do_nothing().returning(PhotoVersion.content_hash), rows)
+    return [content_hash for (content_hash,) in result if content_hash]
+
+
+def get_project_photo_ids(db: Session, project_id: UUID, photo_ids: Set[UUID]) -> Set[UUID]:
+    """Subset of the given photo IDs that belong to the project"""
+    if not photo_ids:
+        return set()
+    rows = db.execute(select(Photo.id).where(Photo.project_id == project_id, Photo.id.in_(photo_ids)))
+    return {row[0] for row in rows}
@@ -1,15 +1,22 @@
 """CRUD operations for Project model"""
 
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from uuid import UUID
 
+from sqlalchemy import delete as sql_delete
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
 
+from app.models.client_session import ClientSession
+from app.models.photo import Photo
+from app.models.photo_comment import PhotoComment
+from app.models.photo_version import PhotoVersion
 from app.models.project import Project, ProjectStatus
 from app.schemas.common import PaginationSortSearchSchema
 from app.schemas.project import ProjectCreate, ProjectUpdate
 from app.utils import common_utils
+from app.utils.storage_shards import DEFAULT_SHARD, shard_for_project
 
 
 def create(db: Session, project: ProjectCreate, owner_id: UUID) -> Project:
@@ -25,6 +32,8 @@ def create(db: Session, project: ProjectCreate, owner_id: UUID) -> Project:
         status=project.status or ProjectStatus.DRAFT.value,
         expired_date=expired_date,
     )
+    # Placement is recorded, so later ring changes never move reads implicitly
+    db_project.storage_shard = shard_for_project(db_project.id)
     db.add(db_project)
     return db_project
 
@@ -114,6 +123,79 @@ def delete(db: Session, project_id: UUID) -> bool:
     return True
 
 
+def delete_tree(db: Session, project_ids: List[UUID]) -> int:
+    """
+    Delete projects and all their rows with set-based statements.
+
+    Comments, versions, photos and client sessions are removed with one
+    DELETE each instead of loading them through the ORM. Stored object
+    references must be released first (stored_object_crud.release_project_refs).
+
+    Returns:
+        Number of projects deleted
+    """
+    if not project_ids:
+        return 0
+
+    photo_ids = select(Photo.id).where(Photo.project_id.in_(project_ids))
+    db.execute(sql_delete(PhotoComment).where(PhotoComment.photo_id.in_(photo_ids)))
+    db.execute(sql_delete(PhotoVersion).where(PhotoVersion.photo_id.in_(photo_ids)))
+    db.execute(sql_delete(Photo).where(Photo.project_id.in_(project_ids)))
+    db.execute(sql_delete(ClientSession).where(ClientSession.project_id.in_(project_ids)))
+    result = db.execute(sql_delete(Project).where(Project.id.in_(project_ids)))
+    return result.rowcount
+
+
+def lock_for_storage_write(db: Session, project_id: UUID) -> Optional[Project]:
+    """
+    Get a project under a share lock held until commit, refreshing a
+    loaded instance: its storage shard cannot be switched while objects
+    are written to it (the rebalance switch takes FOR UPDATE).
+    """
+    statement = (
+        select(Project)
+        .where(Project.id == project_id)
+        .with_for_update(read=True)
+        .execution_options(populate_existing=True)
+    )
+    return db.scalars(statement).first()
+
+
+def get_expired_project_shards(db: Session) -> Dict[UUID, Optional[str]]:
+    """Get the storage shard of every project whose expired_date has passed, by project ID"""
+    now = datetime.utcnow()
+    rows = db.execute(
+        select(Project.id, Project.storage_shard).where(Project.expired_date.isnot(None), Project.expired_date < now)
+    )
+    return {row.id: row.storage_shard for row in rows}
+
+
+def get_shard_mismatches(
+    db: Session,
+    shard_of: Callable[[UUID], str],
+    after_id: Optional[UUID],
+    limit: int,
+) -> List[Tuple[UUID, Optional[str]]]:
+    """
+    Get up to limit (project_id, storage_shard) rows, ordered by ID and
+    starting after after_id, whose recorded shard differs from the one
+    shard_of places the project on.
+
+    The hash ring lives in the application, so IDs are streamed and
+    compared in Python; callers page with after_id.
+    """
+    query = select(Project.id, Project.storage_shard).order_by(Project.id)
+    if after_id is not None:
+        query = query.where(Project.id > after_id)
+    mismatches = []
+    for row in db.execute(query.execution_options(yield_per=1000)):
+        if (row.storage_shard or DEFAULT_SHARD) != shard_of(row.id):
+            mismatches.append((row.id, row.storage_shard))
+            if len(mismatches) >= limit:
+                break
+    return mismatches
+
+
 def count_by_owner(db: Session, owner_id: UUID, status: Optional[str] = None) -> int:
     """Count projects by owner with optional status filter"""
     query = db.query(Project).filter(Project.owner_id == owner_id)
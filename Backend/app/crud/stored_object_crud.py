@@ -0,0 +1,186 @@
+"""CRUD operations for StoredObject model"""
+
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from sqlalchemy import delete, func, literal_column, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.photo import Photo
+from app.models.photo_version import PhotoVersion
+from app.models.project import Project
+from app.models.stored_object import StoredObject
+from app.utils import common_utils
+from app.utils.storage_shards import DEFAULT_SHARD
+
+
+def get_by_hash(db: Session, content_hash: str, shard: str = DEFAULT_SHARD) -> Optional[StoredObject]:
+    """Get stored object by content hash on a storage shard"""
+    return (
+        db.query(StoredObject)
+        .filter(StoredObject.shard == shard, StoredObject.content_hash == content_hash)
+        .first()
+    )
+
+
+def increment_ref(db: Session, content_hash: str, shard: str = DEFAULT_SHARD) -> bool:
+    """Atomically add a reference to an existing stored object, returns False if the row is gone"""
+    result = db.execute(
+        update(StoredObject)
+        .where(StoredObject.shard == shard, StoredObject.content_hash == content_hash)
+        .values(ref_count=StoredObject.ref_count + 1, updated_at=common_utils.get_utc_now())
+    )
+    return result.rowcount > 0
+
+
+def upsert_with_ref(
+    db: Session,
+    content_hash: str,
+    object_name: str,
+    size: int,
+    content_type: Optional[str] = None,
+    shard: str = DEFAULT_SHARD,
+) -> None:
+    """Insert a stored object with one reference, or add a reference if a concurrent upload created it"""
+    statement = insert(StoredObject).values(
+        shard=shard,
+        content_hash=content_hash,
+        object_name=object_name,
+        size=size,
+        content_type=content_type,
+        ref_count=1,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[StoredObject.shard, StoredObject.content_hash],
+        set_={"ref_count": StoredObject.ref_count + 1, "updated_at": common_utils.get_utc_now()},
+    )
+    db.execute(statement)
+
+
+def add_refs(
+    db: Session,
+    content_hash: str,
+    object_name: str,
+    size: int,
+    content_type: Optional[str],
+    ref_total: int,
+    shard: str = DEFAULT_SHARD,
+) -> None:
+    """Add ref_total references to a stored object, inserting its row if the shard has none"""
+    statement = insert(StoredObject).values(
+        shard=shard,
+        content_hash=content_hash,
+        object_name=object_name,
+        size=size,
+        content_type=content_type,
+        ref_count=ref_total,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[StoredObject.shard, StoredObject.content_hash],
+        set_={"ref_count": StoredObject.ref_count + ref_total, "updated_at": common_utils.get_utc_now()},
+    )
+    db.execute(statement)
+
+
+def decrement_ref(db: Session, content_hash: str, shard: str = DEFAULT_SHARD) -> None:
+    """Drop a reference; objects reaching zero are left for storage GC"""
+    db.execute(
+        update(StoredObject)
+        .where(StoredObject.shard == shard, StoredObject.content_hash == content_hash)
+        .values(ref_count=func.greatest(StoredObject.ref_count - 1, 0), updated_at=common_utils.get_utc_now())
+    )
+
+
+def release_project_refs(db: Session, project_ids: List) -> None:
+    """Drop the references held by every photo version of the given projects in one statement"""
+    project_shard = func.coalesce(Project.storage_shard, DEFAULT_SHARD)
+    refs = (
+        select(PhotoVersion.content_hash, project_shard.label("shard"), func.count().label("ref_total"))
+        .join(Photo, Photo.id == PhotoVersion.photo_id)
+        .join(Project, Project.id == Photo.project_id)
+        .where(Photo.project_id.in_(project_ids), PhotoVersion.content_hash.isnot(None))
+        .group_by(PhotoVersion.content_hash, project_shard)
+        .subquery()
+    )
+    db.execute(
+        update(StoredObject)
+        .where(StoredObject.shard == refs.c.shard, StoredObject.content_hash == refs.c.content_hash)
+        .values(
+            ref_count=func.greatest(StoredObject.ref_count - refs.c.ref_total, 0),
+            updated_at=common_utils.get_utc_now(),
+        )
+    )
+
+
+def delete_unreferenced(db: Session, released_before: datetime, limit: int) -> list:
+    """
+    Delete up to limit stored objects without references.
+
+    Returns (shard, content_hash, object_name) rows of the deleted objects.
+
+    Rows that gain a reference concurrently no longer match ref_count = 0
+    once their row lock is released, so they are never returned.
+    """
+    candidates = (
+        select(StoredObject.id)
+        .where(StoredObject.ref_count == 0, StoredObject.updated_at < released_before)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = db.execute(
+        delete(StoredObject)
+        .where(StoredObject.id.in_(candidates), StoredObject.ref_count == 0)
+        .returning(StoredObject.shard, StoredObject.content_hash, StoredObject.object_name)
+    )
+    return result.all()
+
+
+def get_project_refs(db: Session, project_id, image_url_prefix: Optional[str] = None) -> List:
+    """
+    (content_hash, ref_total) rows of the content-addressed objects a
+    project references, optionally only from versions whose image URL
+    starts with image_url_prefix.
+    """
+    statement = (
+        select(PhotoVersion.content_hash, func.count().label("ref_total"))
+        .join(Photo, Photo.id == PhotoVersion.photo_id)
+        .where(Photo.project_id == project_id, PhotoVersion.content_hash.isnot(None))
+        .group_by(PhotoVersion.content_hash)
+    )
+    if image_url_prefix is not None:
+        statement = statement.where(PhotoVersion.image_url.startswith(image_url_prefix, autoescape=True))
+    return db.execute(statement).all()
+
+
+def move_refs(db: Session, content_hash: str, ref_total: int, source_shard: str, target_shard: str) -> None:
+    """
+    Move ref_total references of an object between shards (the object must
+    already be copied to the target shard). The source row is left for GC
+    once its count reaches zero.
+    """
+    source = get_by_hash(db, content_hash, source_shard)
+    if source is None:
+        return
+    add_refs(db, content_hash, source.object_name, source.size, source.content_type, ref_total, target_shard)
+    db.execute(
+        update(StoredObject)
+        .where(StoredObject.shard == source_shard, StoredObject.content_hash == content_hash)
+        .values(
+            ref_count=func.greatest(StoredObject.ref_count - ref_total, 0),
+            updated_at=common_utils.get_utc_now(),
+        )
+    )
+
+
+def stream_object_names(db: Session, shard: str = DEFAULT_SHARD, batch_size: int = 5000) -> Iterator[str]:
+    """Stream object names of the shard's stored objects in byte order (matches S3 listing order)"""
+    statement = (
+        select(StoredObject.object_name)
+        .where(StoredObject.shard == shard)
+        .order_by(literal_column('object_name COLLATE "C"'))
+    )
+    result = db.execute(statement.execution_options(stream_results=True, yield_per=batch_size))
+    for row in result:
+        yield row[0]
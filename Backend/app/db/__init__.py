@@ -1,6 +1,7 @@
 from sqlmodel import Session, SQLModel, create_engine
 
 from app.core.config import settings
+from app.db.migrations import upgrade_schema
 
 # Import all models to ensure they are registered
 from app.models import (  # noqa: F401
@@ -10,6 +11,7 @@ from app.models import (  # noqa: F401
     PhotoComment,
     PhotoVersion,
     Project,
+    StoredObject,
     User,
 )
 
@@ -27,5 +29,6 @@ def get_db():
 
 
 def create_tables():
-    """Create all tables defined in models"""
+    """Create all tables defined in models, then upgrade existing ones"""
     SQLModel.metadata.create_all(engine)
+    upgrade_schema(engine)
@@ -0,0 +1,55 @@
+"""
+Idempotent schema upgrades applied at startup.
+
+SQLModel.metadata.create_all only creates missing tables: it never adds
+columns or changes constraints on tables that already exist. Columns and
+constraints added to existing tables are listed here as statements that
+are safe to run on every start (IF NOT EXISTS, or guarded by a catalog
+check), so a deployed database matches the models before serving.
+
+Existing rows take the column defaults: photo_version.content_hash stays
+NULL, which resolves to the legacy per-project keys until the
+storage.backfill_content_hashes job moves the version to its content
+address; project.storage_shard stays NULL and stored_object.shard is
+'default', both meaning the default shard where every object was stored.
+"""
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+# Serializes upgrades when several processes start at once
+SCHEMA_UPGRADE_LOCK_ID = 7_239_401
+
+SCHEMA_UPGRADES = [
+    # Content-addressed photo versions (NULL keeps legacy keys)
+    "ALTER TABLE photo_version ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)",
+    "CREATE INDEX IF NOT EXISTS ix_photo_version_content_hash ON photo_version (content_hash)",
+    # Storage sharding (NULL / 'default' is the default shard)
+    "ALTER TABLE project ADD COLUMN IF NOT EXISTS storage_shard VARCHAR(64)",
+    "CREATE INDEX IF NOT EXISTS ix_project_storage_shard ON project (storage_shard)",
+    "ALTER TABLE stored_object ADD COLUMN IF NOT EXISTS shard VARCHAR(64) NOT NULL DEFAULT 'default'",
+    # Content is deduplicated per shard: the unique index on content_hash becomes (shard, content_hash)
+    """
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid
+            WHERE pg_class.relname = 'ix_stored_object_content_hash' AND pg_index.indisunique
+        ) THEN
+            DROP INDEX ix_stored_object_content_hash;
+        END IF;
+        IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_stored_object_shard_hash') THEN
+            ALTER TABLE stored_object ADD CONSTRAINT uq_stored_object_shard_hash UNIQUE (shard, content_hash);
+        END IF;
+    END $$
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_stored_object_content_hash ON stored_object (content_hash)",
+]
+
+
+def upgrade_schema(engine: Engine) -> None:
+    """Apply SCHEMA_UPGRADES in one transaction, under an advisory lock"""
+    with engine.begin() as connection:
+        connection.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": SCHEMA_UPGRADE_LOCK_ID})
+        for statement in SCHEMA_UPGRADES:
+            connection.execute(text(statement))
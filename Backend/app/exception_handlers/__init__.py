@@ -1,11 +1,13 @@
 from app.exception_handlers.http_exception import (
     AppException,
+    circuit_open_exception_handler,
     custom_exception_handler,
     custom_http_exception_handler,
 )
 
 __all__ = [
     "AppException",
+    "circuit_open_exception_handler",
     "custom_http_exception_handler",
     "custom_exception_handler",
 ]
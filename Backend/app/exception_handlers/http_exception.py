@@ -3,7 +3,9 @@ from typing import Any, Optional
 from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
 
+from app.core.constant.messages import MessageConstants
 from app.schemas.common import ApiResponse
+from app.utils.circuit_breaker import CircuitOpenError
 
 # ============================================================================
 # Custom Exception inheriting from HTTPException
@@ -61,3 +63,12 @@ async def custom_http_exception_handler(request: Request, exc: HTTPException):
 
 async def custom_exception_handler(request: Request, exc: Exception):
     return JSONResponse(status_code=400, content=ApiResponse(message=str(exc), success=False, data=None).model_dump())
+
+
+async def circuit_open_exception_handler(_request: Request, exc: CircuitOpenError):
+    """Fail fast with 503 while a storage circuit breaker is open"""
+    return JSONResponse(
+        status_code=503,
+        content=ApiResponse(message=MessageConstants.STORAGE_UNAVAILABLE, success=False, data=None).model_dump(),
+        headers={"Retry-After": str(int(exc.retry_after))},
+    )
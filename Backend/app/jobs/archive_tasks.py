@@ -0,0 +1,146 @@
+"""Background jobs building selected-photo archives"""
+
+import asyncio
+import tempfile
+from datetime import timedelta
+from typing import BinaryIO, Callable, Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.db.manager import DatabaseManager
+from app.jobs.celery_worker import celery_app
+from app.schemas.photo_download import PhotoArchiveSpec
+from app.services.photo_archive_service import (
+    ACTIVE_JOB_STATUSES,
+    ARCHIVE_JOB_KEY,
+    archive_download_url,
+    archive_object_name,
+    remove_project_archives,
+)
+from app.services.photo_download_service import PhotoArchive, prepare_photo_archive, stream_photo_archive
+from app.utils import common_utils
+from app.utils.logging import logger
+from app.utils.redis import get_redis_client, publish_user_message, report_task_progress
+from app.utils.storage_backend import get_storage_backend
+
+
+async def _write_archive(archive: PhotoArchive, file: BinaryIO, on_progress: Callable[[int, int], None]) -> None:
+    async for chunk in stream_photo_archive(archive, on_progress, fail_on_missing=True):
+        file.write(chunk)
+
+
+def _notify_ready(project_id: str, user_id: str, job_id: str, size: int) -> None:
+    """Tell the user's UI the download can be served from the finished archive"""
+    publish_user_message(
+        user_id,
+        {
+            "type": "archive_ready",
+            "data": {
+                "project_id": project_id,
+                "job_id": job_id,
+                "size": size,
+                "download_url": archive_download_url(UUID(project_id), job_id),
+            },
+        },
+    )
+
+
+@celery_app.task(bind=True, name="archive.build_photo_archive", max_retries=3)
+def build_photo_archive(
+    self,
+    project_id: str,
+    user_id: str,
+    job_id: Optional[str] = None,
+    spec: Optional[dict] = None,
+) -> dict:
+    """
+    Build a project's selected-photo archive and store it on the project's shard.
+
+    The ZIP is streamed to a temporary file on the worker (constant memory)
+    and uploaded to archives/{project_id}/{job_id}.zip, where it serves
+    every download until the selection changes, so a photo that cannot be
+    read fails the build (retried) instead of storing an incomplete archive.
+    Progress is reported under
+    the task_progress:{job_id}:{user_id} hash and published to the user.
+    Archives of earlier selections are removed once older than
+    ARCHIVE_STALE_GRACE_SECONDS (downloads may still be reading them).
+    When the archive is ready an archive_ready message is published on
+    user:{user_id}:archive_ready.
+
+    Without a job_id (pre-build on a status change) the job takes the
+    current selection's digest and claims it, unless a build of the same
+    selection is already running.
+
+    Args:
+        project_id: Project ID
+        user_id: Owner requesting the archive
+        job_id: Selection digest the job was started for (None to pre-build)
+        spec: PhotoArchiveSpec fields (None for originals by extension)
+
+    Returns:
+        Dict with the job outcome
+    """
+
+    def report(status: str, progress: int, **fields) -> None:
+        report_task_progress(job_id, user_id, status, progress, project_id=project_id, **fields)
+
+    with DatabaseManager.get_session() as db:
+        try:
+            archive = prepare_photo_archive(db, UUID(project_id), UUID(user_id), PhotoArchiveSpec(**spec) if spec else None)
+        except ValueError as e:
+            if job_id:
+                report("failed", 0, error=str(e))
+            return {"job_id": job_id, "status": "failed"}
+
+    if job_id is None:
+        job_id = archive.selection_hash
+        redis = get_redis_client()
+        job_key = ARCHIVE_JOB_KEY.format(job_id=job_id, user_id=user_id)
+        if not redis.hsetnx(job_key, "status", "pending") and redis.hget(job_key, "status") in ACTIVE_JOB_STATUSES:
+            return {"job_id": job_id, "status": "skipped"}
+
+    # The selection changed after the job was queued: the client starts a new job
+    if archive.selection_hash != job_id:
+        report("failed", 0, error="selection_changed")
+        return {"job_id": job_id, "status": "failed"}
+
+    backend = get_storage_backend(archive.shard)
+    object_name = archive_object_name(archive.project_id, job_id)
+    info = backend.stat(backend.bucket_name, object_name)
+    if info is not None:
+        report("completed", 100, size=info.size, object_name=object_name)
+        _notify_ready(project_id, user_id, job_id, info.size)
+        return {"job_id": job_id, "status": "completed", "size": info.size}
+
+    reported = -1
+
+    def on_progress(written: int, total: int) -> None:
+        nonlocal reported
+        progress = min(99, written * 100 // total)
+        if progress > reported:
+            reported = progress
+            report("running", progress)
+
+    report("running", 0)
+    try:
+        with tempfile.NamedTemporaryFile(dir=settings.ARCHIVE_TEMP_DIR or None, prefix="archive-", suffix=".zip") as tmp_file:
+            asyncio.run(_write_archive(archive, tmp_file, on_progress))
+            tmp_file.flush()
+            size = tmp_file.tell()
+            if not backend.upload_file(backend.bucket_name, object_name, tmp_file.name, "application/zip"):
+                raise OSError(f"Failed to upload archive {object_name}")
+    except Exception as e:
+        logger.exception(f"Archive job {job_id} for project {project_id} failed: {e}")
+        if self.request.retries < self.max_retries:
+            report("retrying", 0)
+            # Retry under the claimed job id (a pre-build would otherwise see its own claim)
+            raise self.retry(args=(project_id, user_id, job_id, spec), exc=e, countdown=60)
+        report("failed", 0, error=str(e))
+        raise
+
+    stale_before = common_utils.get_utc_now() - timedelta(seconds=settings.ARCHIVE_STALE_GRACE_SECONDS)
+    removed = remove_project_archives(backend, project_id, keep=object_name, modified_before=stale_before)
+    report("completed", 100, size=size, object_name=object_name)
+    _notify_ready(project_id, user_id, job_id, size)
+    logger.info(f"Built archive {object_name} ({size} bytes, {len(archive.entries)} photos, {removed} stale removed)")
+    return {"job_id": job_id, "status": "completed", "size": size}
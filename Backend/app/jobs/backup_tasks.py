@@ -0,0 +1,187 @@
+"""Background jobs writing and restoring project backups"""
+
+import asyncio
+import tempfile
+from datetime import timedelta
+from typing import BinaryIO, Callable, List
+from uuid import UUID
+from zipfile import BadZipFile, ZipFile
+
+from app.core.config import settings
+from app.db.manager import DatabaseManager
+from app.jobs.celery_worker import celery_app
+from app.models.project import Project
+from app.services.project_backup_service import (
+    RESTORE_STATE_KEY,
+    BackupRestoreError,
+    backup_object_name,
+    remove_project_backups,
+    restore_project_backup,
+    restore_upload_object_name,
+    stream_project_backup,
+)
+from app.utils import common_utils
+from app.utils.logging import logger
+from app.utils.object_reader import open_object_reader
+from app.utils.redis import get_redis_client, report_task_progress
+from app.utils.storage_backend import get_storage_backend
+
+
+async def _write_backup(
+    db,
+    project: Project,
+    file: BinaryIO,
+    on_progress: Callable[[int, int], None],
+    on_missing: Callable[[str], None],
+) -> None:
+    async for chunk in stream_project_backup(db, project, on_progress, on_missing):
+        file.write(chunk)
+
+
+def _progress_reporter(report: Callable[..., None]) -> Callable[[int, int], None]:
+    """on_progress callback reporting whole-percent changes only"""
+    reported = -1
+
+    def on_progress(processed: int, total: int) -> None:
+        nonlocal reported
+        progress = min(99, processed * 100 // total) if total else 0
+        if progress > reported:
+            reported = progress
+            report("running", progress)
+
+    return on_progress
+
+
+@celery_app.task(bind=True, name="backup.backup_project", max_retries=3)
+def backup_project(self, project_id: str, user_id: str, job_id: str) -> dict:
+    """
+    Write a project backup and store it on the project's shard.
+
+    The ZIP is streamed to a temporary file on the worker (constant memory)
+    and uploaded to backups/{project_id}/{job_id}.zip, where it is served
+    with Range support, so the download of a large backup can be resumed.
+    A failed attempt is retried from the start, as is one that finishes
+    after the project moved to another shard. Earlier backups of the
+    project are removed once older than ARCHIVE_STALE_GRACE_SECONDS.
+    Progress is reported under the task_progress:{job_id}:{user_id} hash.
+    A backup missing objects that could not be read is stored, listed in
+    its manifest, and reported as partial instead of completed.
+
+    Args:
+        project_id: Project ID
+        user_id: Owner requesting the backup
+        job_id: Backup job ID
+
+    Returns:
+        Dict with the job outcome
+    """
+
+    def report(status: str, progress: int, **fields) -> None:
+        report_task_progress(job_id, user_id, status, progress, kind="backup", project_id=project_id, **fields)
+
+    report("running", 0)
+    with DatabaseManager.get_session() as db:
+        project = db.get(Project, UUID(project_id))
+        if project is None or str(project.owner_id) != user_id:
+            report("failed", 0, error="Project not found or access denied")
+            return {"job_id": job_id, "status": "failed"}
+
+        backend = get_storage_backend(project.storage_shard)
+        object_name = backup_object_name(project.id, job_id)
+        missing: List[str] = []
+        try:
+            with tempfile.NamedTemporaryFile(dir=settings.ARCHIVE_TEMP_DIR or None, prefix="backup-", suffix=".zip") as tmp_file:
+                asyncio.run(_write_backup(db, project, tmp_file, _progress_reporter(report), missing.append))
+                tmp_file.flush()
+                size = tmp_file.tell()
+                if not backend.upload_file(backend.bucket_name, object_name, tmp_file.name, "application/zip"):
+                    raise OSError(f"Failed to upload backup {object_name}")
+            # A rebalance moved the project meanwhile and copied its backups without this one
+            shard = project.storage_shard
+            db.refresh(project)
+            if project.storage_shard != shard:
+                backend.delete(backend.bucket_name, object_name)
+                raise OSError(f"Project {project_id} moved to shard {project.storage_shard} during the backup")
+        except Exception as e:
+            logger.exception(f"Backup job {job_id} for project {project_id} failed: {e}")
+            if self.request.retries < self.max_retries:
+                report("retrying", 0)
+                raise self.retry(exc=e, countdown=60)
+            report("failed", 0, error=str(e))
+            raise
+
+    stale_before = common_utils.get_utc_now() - timedelta(seconds=settings.ARCHIVE_STALE_GRACE_SECONDS)
+    removed = remove_project_backups(backend, project_id, keep=object_name, modified_before=stale_before)
+    job_status = "partial" if missing else "completed"
+    report(job_status, 100, size=size, object_name=object_name, missing_objects=len(missing))
+    if missing:
+        logger.warning(f"Backup {object_name} is missing {len(missing)} objects that could not be read, listed in its manifest")
+    logger.info(f"Wrote backup {object_name} ({size} bytes, {removed} earlier backups removed)")
+    return {"job_id": job_id, "status": job_status, "size": size, "missing_objects": len(missing)}
+
+
+@celery_app.task(bind=True, name="backup.restore_project", max_retries=5)
+def restore_project(self, user_id: str, job_id: str) -> dict:
+    """
+    Restore an uploaded backup for the user.
+
+    The backup is read in place from the default shard with ranged reads
+    (nothing is downloaded up front). The number of NDJSON parts committed
+    is checkpointed under project_restore:{job_id}, so a retry resumes
+    after the last committed part; objects already written are skipped.
+    The uploaded backup is deleted once the restore completes.
+
+    Args:
+        user_id: User the restored project belongs to
+        job_id: Restore job ID
+
+    Returns:
+        Dict with the job outcome and restore counts
+    """
+
+    def report(status: str, progress: int, **fields) -> None:
+        report_task_progress(job_id, user_id, status, progress, kind="restore", **fields)
+
+    redis = get_redis_client()
+    state_key = RESTORE_STATE_KEY.format(job_id=job_id)
+    entries_done = int(redis.hget(state_key, "entries_done") or 0)
+
+    def checkpoint(count: int) -> None:
+        redis.hset(state_key, "entries_done", count)
+        redis.expire(state_key, settings.TASK_PROGRESS_TTL_SECONDS)
+
+    backend = get_storage_backend()
+    object_name = restore_upload_object_name(job_id)
+    info = backend.stat(backend.bucket_name, object_name)
+    if info is None:
+        report("failed", 0, error="Uploaded backup not found")
+        return {"job_id": job_id, "status": "failed"}
+
+    report("running", 0)
+    try:
+        with open_object_reader(backend, object_name, info.size) as file, ZipFile(file) as zip_file:
+            with DatabaseManager.get_session() as db:
+                result = restore_project_backup(
+                    db,
+                    zip_file,
+                    UUID(user_id),
+                    entries_done=entries_done,
+                    on_checkpoint=checkpoint,
+                    on_progress=_progress_reporter(report),
+                )
+    except (BackupRestoreError, BadZipFile) as e:
+        logger.warning(f"Restore job {job_id} rejected: {e}")
+        report("failed", 0, error=str(e))
+        return {"job_id": job_id, "status": "failed"}
+    except Exception as e:
+        logger.exception(f"Restore job {job_id} interrupted after {entries_done} parts: {e}")
+        if self.request.retries < self.max_retries:
+            report("retrying", 0)
+            raise self.retry(exc=e, countdown=60)
+        report("failed", 0, error=str(e))
+        raise
+
+    backend.delete(backend.bucket_name, object_name)
+    redis.delete(state_key)
+    report("completed", 100, project_id=result["project_id"])
+    return {"job_id": job_id, "status": "completed", **result}
@@ -12,7 +12,7 @@ celery_app = Celery(
     "worker",
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
-    include=[],  # Explicitly include tasks module
+    include=["app.jobs.storage_tasks", "app.jobs.archive_tasks", "app.jobs.backup_tasks"],  # Explicitly include tasks modules
 )
 
 # Configure Celery settings for better timeout handling
@@ -28,3 +28,19 @@ celery_app.conf.update(
     task_default_retry_delay=60,
     task_max_retries=3,
 )
+
+# Periodic jobs (run `celery -A app.jobs.celery_worker beat` to enable)
+celery_app.conf.beat_schedule = {
+    "collect-unreferenced-objects": {
+        "task": "storage.collect_unreferenced_objects",
+        "schedule": settings.STORAGE_GC_INTERVAL_SECONDS,
+    },
+    "reconcile-storage": {
+        "task": "storage.reconcile_storage",
+        "schedule": settings.STORAGE_RECONCILE_INTERVAL_SECONDS,
+    },
+    "rebalance-shards": {
+        "task": "storage.rebalance_shards",
+        "schedule": settings.STORAGE_REBALANCE_INTERVAL_SECONDS,
+    },
+}
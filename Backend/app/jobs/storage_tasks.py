@@ -0,0 +1,343 @@
+"""Background jobs for object storage garbage collection and shard rebalancing"""
+
+import asyncio
+import json
+from collections import defaultdict
+from datetime import timedelta
+from typing import Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.crud import photo_version_crud, project_crud, stored_object_crud
+from app.db.manager import DatabaseManager
+from app.jobs.celery_worker import celery_app
+from app.services.object_store_service import adopt_legacy_content, webp_object_name_for_hash
+from app.services.photo_archive_service import remove_project_archives
+from app.services.project_backup_service import remove_project_backups
+from app.services.storage_rebalance_service import migrate_project
+from app.services.storage_reconcile_service import reconcile_storage
+from app.utils import common_utils
+from app.utils.logging import logger
+from app.utils.redis import get_redis_client, report_task_progress
+from app.utils.storage_backend import get_storage_backend
+from app.utils.storage_shards import get_shard, shard_for_project, shard_names
+
+# Redis hash holding the resume state of a project purge
+PURGE_STATE_KEY = "storage_gc:purge:{shard}:{project_id}"
+# Latest reconciliation report per shard (JSON)
+RECONCILE_REPORT_KEY = "storage_reconcile:last_report:{shard}"
+# Last project ID checked by the rebalance job, and the guard against overlapping runs
+REBALANCE_CURSOR_KEY = "storage_rebalance:cursor"
+REBALANCE_LOCK_KEY = "storage_rebalance:lock"
+# Last photo version ID checked by the content hash backfill
+BACKFILL_CURSOR_KEY = "storage_backfill:cursor"
+
+
+@celery_app.task(bind=True, name="storage.purge_project_storage", max_retries=5)
+def purge_project_storage(
+    self,
+    project_id: str,
+    user_id: Optional[str] = None,
+    expected_objects: int = 0,
+    shard: Optional[str] = None,
+) -> dict:
+    """
+    Remove every object under a project's prefix on a storage shard,
+    and the project's cached archives and backups.
+
+    The listing is streamed and deleted in batches of STORAGE_GC_BATCH_SIZE.
+    After each batch the last removed key is saved in Redis, so a retried or
+    redelivered task continues from there instead of listing from the start.
+
+    Used for deleted projects, and for the old shard of a project moved by
+    the rebalance job.
+
+    Args:
+        project_id: Project ID (objects live under "{project_id}/")
+        user_id: Owner to notify with task progress, if any
+        expected_objects: Estimated object count, used for the progress percentage
+        shard: Storage shard to purge (None for the default shard)
+
+    Returns:
+        Dict with removed and failed object counts
+    """
+    redis = get_redis_client()
+    shard = get_shard(shard).name
+    state_key = PURGE_STATE_KEY.format(shard=shard, project_id=project_id)
+    state = redis.hgetall(state_key)
+    start_after = state.get("cursor") or None
+    removed = int(state.get("removed", 0))
+    failed = int(state.get("failed", 0))
+    task_id = self.request.id
+
+    def report(status: str, progress: int) -> None:
+        if user_id:
+            report_task_progress(task_id, user_id, status, progress, project_id=project_id, removed=removed, failed=failed)
+
+    report("running", 0)
+    backend = get_storage_backend(shard)
+    try:
+        batch = []
+        for info in backend.list_objects(backend.bucket_name, prefix=f"{project_id}/", start_after=start_after):
+            batch.append(info.object_name)
+            if len(batch) < settings.STORAGE_GC_BATCH_SIZE:
+                continue
+
+            errors = backend.remove_objects(backend.bucket_name, batch)
+            removed += len(batch) - len(errors)
+            failed += len(errors)
+            redis.hset(state_key, mapping={"cursor": batch[-1], "removed": removed, "failed": failed})
+            redis.expire(state_key, settings.TASK_PROGRESS_TTL_SECONDS)
+            report("running", min(99, removed * 100 // expected_objects) if expected_objects else 50)
+            batch = []
+
+        if batch:
+            errors = backend.remove_objects(backend.bucket_name, batch)
+            removed += len(batch) - len(errors)
+            failed += len(errors)
+
+        # Cached archives and backups live outside the project prefix
+        removed += remove_project_archives(backend, project_id)
+        removed += remove_project_backups(backend, project_id)
+    except Exception as e:
+        logger.exception(f"Storage purge of project {project_id} interrupted after {removed} objects: {e}")
+        report("retrying", 0)
+        raise self.retry(exc=e, countdown=60)
+
+    redis.delete(state_key)
+    report("completed", 100)
+    logger.info(f"Purged storage of project {project_id} on shard {shard}: {removed} removed, {failed} failed")
+    return {"project_id": project_id, "shard": shard, "removed": removed, "failed": failed}
+
+
+@celery_app.task(name="storage.collect_unreferenced_objects")
+def collect_unreferenced_objects() -> dict:
+    """
+    Delete content-addressed objects whose reference count dropped to zero.
+
+    Rows released more than STORAGE_GC_GRACE_SECONDS ago are deleted in
+    batches, and their objects and WebP derivatives are removed before
+    the delete commits. An upload of the same content meanwhile blocks
+    on the deleted rows (store_content takes the row before writing), so
+    it writes the object again after the removal instead of referencing
+    a removed one. Rows whose removal fails stay deleted: the leftover
+    objects are orphans for the reconcile job, never missing content.
+
+    Returns:
+        Dict with deleted row and removed object counts
+    """
+    released_before = common_utils.get_utc_now() - timedelta(seconds=settings.STORAGE_GC_GRACE_SECONDS)
+    rows_deleted = 0
+    objects_removed = 0
+
+    while True:
+        with DatabaseManager.get_session() as db:
+            rows = stored_object_crud.delete_unreferenced(db, released_before, settings.STORAGE_GC_BATCH_SIZE // 2)
+            if not rows:
+                break
+            rows_deleted += len(rows)
+
+            object_names_by_shard = defaultdict(list)
+            for row in rows:
+                object_names_by_shard[row.shard].extend([row.object_name, webp_object_name_for_hash(row.content_hash)])
+
+            try:
+                for shard, object_names in object_names_by_shard.items():
+                    backend = get_storage_backend(shard)
+                    errors = backend.remove_objects(backend.bucket_name, object_names)
+                    objects_removed += len(object_names) - len(errors)
+            finally:
+                # Release the row locks only once the objects are gone
+                db.commit()
+
+    if rows_deleted:
+        logger.info(f"Storage GC removed {rows_deleted} unreferenced objects ({objects_removed} keys)")
+    return {"rows_deleted": rows_deleted, "objects_removed": objects_removed}
+
+
+@celery_app.task(bind=True, name="storage.reconcile_storage")
+def reconcile_storage_task(
+    self,
+    repair: bool = False,
+    user_id: Optional[str] = None,
+    shard: Optional[str] = None,
+) -> dict:
+    """
+    Compare shard buckets with database references and report (or repair) drift.
+
+    Each shard's report is stored in Redis under RECONCILE_REPORT_KEY.
+
+    Args:
+        repair: Regenerate missing derivatives and delete old orphans
+        user_id: User to notify with task progress, if any
+        shard: Only scan this shard (all shards if omitted)
+
+    Returns:
+        StorageReconcileReport as a JSON-compatible dict, by shard name
+    """
+    task_id = self.request.id
+
+    def on_progress(report) -> None:
+        if user_id:
+            report_task_progress(
+                task_id,
+                user_id,
+                "running",
+                50,
+                scanned=report.scanned_objects,
+                orphans=report.orphan_count,
+                missing=report.missing_count + report.missing_derivative_count,
+            )
+
+    results = {}
+    for shard_name in [get_shard(shard).name] if shard else shard_names():
+        with DatabaseManager.get_session() as db:
+            report = reconcile_storage(db, shard_name, repair=repair, on_progress=on_progress)
+
+        results[shard_name] = report.model_dump(mode="json")
+        try:
+            get_redis_client().set(RECONCILE_REPORT_KEY.format(shard=shard_name), json.dumps(results[shard_name]))
+        except Exception as e:
+            logger.warning(f"Failed to store reconciliation report of shard {shard_name}: {e}")
+
+    if user_id:
+        report_task_progress(
+            task_id,
+            user_id,
+            "completed",
+            100,
+            orphans=sum(result["orphan_count"] for result in results.values()),
+            missing=sum(result["missing_count"] for result in results.values()),
+        )
+    return results
+
+
+@celery_app.task(bind=True, name="storage.rebalance_shards")
+def rebalance_shards(self, user_id: Optional[str] = None) -> dict:
+    """
+    Move projects whose recorded shard differs from their ring placement.
+
+    Runs after a shard is added or reweighted (and periodically, where a
+    run without mismatches is a scan of project IDs). Projects are moved
+    one at a time in ID order; the last checked ID is saved in Redis so an
+    interrupted run resumes there. The old shard's legacy prefix is purged
+    by purge_project_storage once a project is switched.
+
+    Args:
+        user_id: User to notify with task progress, if any
+
+    Returns:
+        Dict with moved and failed project counts
+    """
+    redis = get_redis_client()
+    task_id = self.request.id
+    if not redis.set(REBALANCE_LOCK_KEY, task_id, nx=True, ex=settings.STORAGE_REBALANCE_LOCK_SECONDS):
+        logger.info("Storage rebalance already running, skipped")
+        return {"skipped": True}
+
+    moved = 0
+    failed = 0
+    try:
+        cursor = redis.get(REBALANCE_CURSOR_KEY)
+        after_id = UUID(cursor) if cursor else None
+        while True:
+            with DatabaseManager.get_session() as db:
+                mismatches = project_crud.get_shard_mismatches(
+                    db, shard_for_project, after_id, settings.STORAGE_REBALANCE_BATCH_SIZE
+                )
+            if not mismatches:
+                break
+
+            for project_id, _ in mismatches:
+                try:
+                    with DatabaseManager.get_session() as db:
+                        result = migrate_project(db, project_id, shard_for_project(project_id))
+                except Exception as e:
+                    failed += 1
+                    logger.exception(f"Failed to move project {project_id} to another storage shard: {e}")
+                    continue
+
+                if result:
+                    moved += 1
+                    purge_project_storage.delay(str(project_id), None, result["legacy_objects"], result["source_shard"])
+
+            after_id = mismatches[-1][0]
+            redis.set(REBALANCE_CURSOR_KEY, str(after_id), ex=settings.TASK_PROGRESS_TTL_SECONDS)
+            redis.expire(REBALANCE_LOCK_KEY, settings.STORAGE_REBALANCE_LOCK_SECONDS)
+            if user_id:
+                report_task_progress(task_id, user_id, "running", 50, moved=moved, failed=failed)
+
+        # Full pass done: the next run starts from the beginning
+        redis.delete(REBALANCE_CURSOR_KEY)
+    finally:
+        redis.delete(REBALANCE_LOCK_KEY)
+
+    if user_id:
+        report_task_progress(task_id, user_id, "completed", 100, moved=moved, failed=failed)
+    if moved or failed:
+        logger.info(f"Storage rebalance moved {moved} projects ({failed} failed)")
+    return {"moved": moved, "failed": failed}
+
+
+@celery_app.task(bind=True, name="storage.backfill_content_hashes")
+def backfill_content_hashes(self, user_id: Optional[str] = None) -> dict:
+    """
+    Move photo versions stored under legacy per-project keys to their
+    content address, so their content is deduplicated like new uploads.
+
+    One-off job for databases created before content addressing (run it
+    once after the upgrade; it is not scheduled). Versions are handled in
+    ID order, one transaction each; the last checked ID is saved in Redis
+    after each page so an interrupted run resumes there. Versions whose
+    legacy object is missing stay legacy and are reported as failed.
+
+    Args:
+        user_id: User to notify with task progress, if any
+
+    Returns:
+        Dict with adopted and failed version counts
+    """
+    redis = get_redis_client()
+    task_id = self.request.id
+    cursor = redis.get(BACKFILL_CURSOR_KEY)
+    after_id = UUID(cursor) if cursor else None
+    adopted = 0
+    failed = 0
+
+    while True:
+        with DatabaseManager.get_session() as db:
+            versions = photo_version_crud.get_legacy_versions(db, after_id, settings.STORAGE_BACKFILL_BATCH_SIZE)
+        if not versions:
+            break
+
+        for version in versions:
+            try:
+                with DatabaseManager.get_session() as db:
+                    done = asyncio.run(
+                        adopt_legacy_content(
+                            db,
+                            version.id,
+                            version.project_id,
+                            version.filename,
+                            version.version_type,
+                        )
+                    )
+                    db.commit()
+            except Exception as e:
+                done = False
+                logger.exception(f"Failed to backfill the content hash of version {version.id}: {e}")
+            if done:
+                adopted += 1
+            else:
+                failed += 1
+
+        after_id = versions[-1].id
+        redis.set(BACKFILL_CURSOR_KEY, str(after_id), ex=settings.TASK_PROGRESS_TTL_SECONDS)
+        if user_id:
+            report_task_progress(task_id, user_id, "running", 50, adopted=adopted, failed=failed)
+
+    redis.delete(BACKFILL_CURSOR_KEY)
+    if user_id:
+        report_task_progress(task_id, user_id, "completed", 100, adopted=adopted, failed=failed)
+    logger.info(f"Content hash backfill adopted {adopted} legacy versions ({failed} failed)")
+    return {"adopted": adopted, "failed": failed}
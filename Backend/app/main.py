@@ -8,8 +8,17 @@ from app.core.config import settings
 from app.core.firebase import initialize_firebase
 from app.core.vault_loader import load_config
 from app.db import create_tables
-from app.exception_handlers.http_exception import custom_exception_handler, custom_http_exception_handler
+from app.exception_handlers.http_exception import (
+    circuit_open_exception_handler,
+    custom_exception_handler,
+    custom_http_exception_handler,
+)
+from app.utils.circuit_breaker import CircuitOpenError
+from app.utils.idempotency import IdempotencyMiddleware
 from app.utils.logging import FastAPILoggingMiddleware, logger, setup_logging
+from app.utils.storage_backend import get_storage_backend
+from app.utils.storage_shards import shard_names
+from app.utils.upload_guard import UploadGuardMiddleware
 
 # Load configuration from .env or Vault
 load_config()
@@ -81,6 +90,12 @@ app = FastAPI(
 # Set custom OpenAPI schema
 app.openapi = custom_openapi
 
+# Reject oversized / non-JPEG uploads before the body is spooled (inside CORS)
+app.add_middleware(UploadGuardMiddleware)
+
+# Replay stored responses for retried mutations carrying an Idempotency-Key
+app.add_middleware(IdempotencyMiddleware)
+
 # Add CORS middleware
 APP_CORS_ORIGINS = ["*"]
 
@@ -97,6 +112,7 @@ app.add_middleware(FastAPILoggingMiddleware)
 
 # Error handler
 app.add_exception_handler(HTTPException, custom_http_exception_handler)
+app.add_exception_handler(CircuitOpenError, circuit_open_exception_handler)
 app.add_exception_handler(Exception, custom_exception_handler)
 
 
@@ -116,6 +132,14 @@ def startup_event():
     # Initialize database tables
     create_tables()
 
+    # Warm up object storage (clients, connection pools, buckets) of every shard before serving traffic
+    for shard in shard_names():
+        try:
+            get_storage_backend(shard).init()
+        except Exception as e:
+            # The client is created lazily on first use if storage is not reachable yet
+            logger.error(f"Failed to initialize storage shard {shard}: {e}", exc_info=True)
+
     # Register API routers
     register_routers(app)
     logger.info("Application startup completed")
@@ -6,6 +6,7 @@ from app.models.photo import Photo
 from app.models.photo_comment import PhotoComment
 from app.models.photo_version import PhotoVersion, VersionType
 from app.models.project import Project, ProjectStatus
+from app.models.stored_object import StoredObject
 from app.models.user import User
 
 __all__ = [
@@ -18,4 +19,5 @@ __all__ = [
     "VersionType",
     "PhotoComment",
     "ClientSession",
+    "StoredObject",
 ]
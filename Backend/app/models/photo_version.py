@@ -1,7 +1,7 @@
 """PhotoVersion model - Original and edited versions"""
 
 from enum import Enum
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 from uuid import UUID
 
 from sqlalchemy import Index, UniqueConstraint
@@ -28,6 +28,12 @@ class PhotoVersion(BaseModel, table=True):
     photo_id: UUID = Field(foreign_key="photo.id", nullable=False, index=True)
     version_type: str = Field(nullable=False, max_length=20)
     image_url: str = Field(nullable=False, max_length=512)
+    content_hash: Optional[str] = Field(
+        default=None,
+        max_length=64,
+        index=True,
+        description="SHA-256 of the stored object (NULL for legacy per-project keys)",
+    )
 
     # Relationships
     photo: "Photo" = Relationship(back_populates="photo_versions")
@@ -47,6 +47,12 @@ class Project(BaseModel, table=True):
         default=None,
         description="Project auto-delete date after completion (NULL means permanent)",
     )
+    storage_shard: Optional[str] = Field(
+        default=None,
+        max_length=64,
+        index=True,
+        description="Storage shard holding the project's objects (NULL means the default shard)",
+    )
 
     # Relationships
     owner: "User" = Relationship(back_populates="projects")
@@ -0,0 +1,44 @@
+"""StoredObject model - Content-addressed blobs shared by photo versions"""
+
+from typing import Optional
+
+from sqlalchemy import UniqueConstraint
+from sqlmodel import Field
+
+from app.models.base import BaseModel
+
+
+class StoredObject(BaseModel, table=True):
+    """Content-addressed object (keyed by SHA-256) with reference counting"""
+
+    __tablename__ = "stored_object"
+
+    shard: str = Field(
+        default="default",
+        nullable=False,
+        max_length=64,
+        description="Storage shard holding the object (content is deduplicated per shard)",
+    )
+    content_hash: str = Field(
+        nullable=False,
+        index=True,
+        max_length=64,
+        description="SHA-256 hex digest of the object bytes",
+    )
+    object_name: str = Field(nullable=False, max_length=512)
+    size: int = Field(nullable=False)
+    content_type: Optional[str] = Field(default=None, max_length=100)
+    ref_count: int = Field(
+        default=0,
+        nullable=False,
+        index=True,
+        description="Number of photo versions referencing this object (0 means eligible for GC)",
+    )
+
+    # Constraints
+    __table_args__ = (UniqueConstraint("shard", "content_hash", name="uq_stored_object_shard_hash"),)
+
+    class Config:
+        """Pydantic config"""
+
+        from_attributes = True
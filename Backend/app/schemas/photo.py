@@ -1,6 +1,7 @@
 """Schemas for Photo operations"""
 
 from datetime import datetime
+from typing import Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -43,6 +44,7 @@ class PhotoVersionBase(BaseModel):
 
     version_type: str = Field(..., description="Version type: original or edited")
     image_url: str = Field(..., max_length=512, description="S3/MinIO image URL")
+    content_hash: Optional[str] = Field(default=None, description="SHA-256 of the stored object")
 
 
 class PhotoVersionResponse(PhotoVersionBase):
@@ -71,6 +73,24 @@ class PhotoDetailResponse(BaseModel):
         from_attributes = True
 
 
+class EditedUploadResult(BaseModel):
+    """Per-file result of a bulk edited upload"""
+
+    filename: str = Field(..., description="Uploaded filename")
+    status: str = Field(..., description="uploaded, superseded (a later file of the batch matched the same photo), not_found, not_selected, invalid_file or upload_failed")
+    photo_id: Optional[UUID] = Field(default=None, description="Matched photo ID")
+    matched_filename: Optional[str] = Field(default=None, description="Filename of the matched original photo")
+    content_hash: Optional[str] = Field(default=None, description="SHA-256 of the stored edited file")
+
+
+class BulkEditedUploadResponse(BaseModel):
+    """Schema for bulk edited upload response"""
+
+    uploaded: int = Field(default=0, description="Number of edited versions stored (one per photo)")
+    failed: int = Field(default=0, description="Number of files that were not stored (superseded files are not counted)")
+    results: list[EditedUploadResult] = Field(default_factory=list, description="Per-file match results")
+
+
 class PhotoListResponse(BaseModel):
     """Schema for photo list response"""
 
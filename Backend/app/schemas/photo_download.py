@@ -1,6 +1,7 @@
 """Photo download schemas - manifest and scripts"""
 
 from datetime import datetime
+from enum import Enum
 from typing import List, Optional
 
 from pydantic import BaseModel, Field
@@ -57,3 +58,43 @@ class PhotoDownloadScriptsResponse(BaseModel):
         """Pydantic config"""
 
         from_attributes = True
+
+
+class PhotoArchiveJobResponse(BaseModel):
+    """State of a background archive job"""
+
+    job_id: str = Field(..., description="Job ID (digest of the selection, stable until it changes)")
+    status: str = Field(..., description="pending, running, completed or failed")
+    progress: int = Field(default=0, description="Percentage of photos written")
+    size: Optional[int] = Field(default=None, description="Archive size in bytes once completed")
+    error: Optional[str] = Field(default=None, description="Failure reason")
+    download_url: Optional[str] = Field(default=None, description="URL serving the finished archive")
+
+
+class ArchiveVersion(str, Enum):
+    """Photo version put into an archive"""
+
+    ORIGINAL = "original"
+    EDITED = "edited"
+    EDITED_OR_ORIGINAL = "edited_or_original"
+
+
+class ArchiveLayout(str, Enum):
+    """Folder layout inside an archive"""
+
+    BY_EXTENSION = "by_extension"  # Selected/JPG/name.jpg
+    BY_VERSION = "by_version"  # Original/name.jpg, Edited/name.jpg
+    FLAT = "flat"  # name.jpg
+
+
+class PhotoArchiveSpec(BaseModel):
+    """What goes into a selected-photo archive"""
+
+    version: ArchiveVersion = Field(default=ArchiveVersion.ORIGINAL, description="original, edited, or edited falling back to original")
+    size: Optional[int] = Field(default=None, ge=1, le=2000, description="Rendition width for web bundles (full size if omitted)")
+    layout: ArchiveLayout = Field(default=ArchiveLayout.BY_EXTENSION, description="Folder layout inside the archive")
+
+    class Config:
+        """Pydantic config"""
+
+        frozen = True
@@ -0,0 +1,50 @@
+"""Photo sync schemas - delta sync for desktop clients"""
+
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+# Upper bound on entries accepted in a single sync request
+MAX_SYNC_ENTRIES = 50000
+
+
+class PhotoSyncEntry(BaseModel):
+    """Single local file reported by the client"""
+
+    filename: str = Field(..., max_length=255, description="Local filename")
+    size: int = Field(..., ge=0, description="File size in bytes")
+    sha256: str = Field(..., min_length=64, max_length=64, description="SHA-256 hex digest of the file")
+
+
+class PhotoSyncRequest(BaseModel):
+    """Request containing the client's file list"""
+
+    files: List[PhotoSyncEntry] = Field(..., max_length=MAX_SYNC_ENTRIES, description="Local files to diff against the project")
+
+
+class PhotoSyncVariant(BaseModel):
+    """Local file that should be uploaded as an edited version"""
+
+    filename: str = Field(..., description="Local filename")
+    photo_id: UUID = Field(..., description="Photo the variant belongs to")
+    base_filename: str = Field(..., description="Filename of the original photo")
+    is_selected: bool = Field(..., description="Whether the original is selected (edited uploads require it)")
+
+
+class PhotoSyncChanged(BaseModel):
+    """Local file whose content differs from the stored photo"""
+
+    filename: str = Field(..., description="Local filename")
+    photo_id: UUID = Field(..., description="Existing photo with this filename")
+
+
+class PhotoSyncResponse(BaseModel):
+    """Diff between the client's files and the project"""
+
+    missing: List[str] = Field(default_factory=list, description="Files not on the server, upload as originals")
+    changed: List[PhotoSyncChanged] = Field(default_factory=list, description="Files whose content differs from the server copy")
+    variants: List[PhotoSyncVariant] = Field(default_factory=list, description="Files to upload through the edited upload endpoint")
+    unchanged: int = Field(default=0, description="Count of files already stored with identical content")
+    unverified: List[str] = Field(default_factory=list, description="Files stored before content hashing, matched by filename only")
+    project_id: Optional[UUID] = Field(default=None, description="Project ID")
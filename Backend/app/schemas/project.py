@@ -112,3 +112,16 @@ class VerifyProjectToken(BaseModel):
         default="",
         description="Password for the token if it is password-protected",
     )
+
+
+class ProjectBackupJobResponse(BaseModel):
+    """State of a background project backup or restore job"""
+
+    job_id: str = Field(..., description="Job ID")
+    status: str = Field(..., description="pending, running, retrying, completed, partial (backup without some objects) or failed")
+    progress: int = Field(default=0, description="Percentage of rows and objects processed")
+    project_id: Optional[UUID] = Field(default=None, description="Project backed up or restored")
+    size: Optional[int] = Field(default=None, description="Backup size in bytes once completed")
+    missing_objects: Optional[int] = Field(default=None, description="Objects a partial backup is missing (listed in its manifest)")
+    error: Optional[str] = Field(default=None, description="Failure reason")
+    download_url: Optional[str] = Field(default=None, description="URL serving the finished backup")
@@ -0,0 +1,27 @@
+"""Storage reconciliation schemas - orphan and missing object reports"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.utils import common_utils
+
+
+class StorageReconcileReport(BaseModel):
+    """Result of comparing the object listing with database references"""
+
+    shard: str = Field(default="default", description="Storage shard that was scanned")
+    scanned_objects: int = Field(default=0, description="Objects listed from storage")
+    expected_objects: int = Field(default=0, description="Object keys referenced by the database")
+    matched: int = Field(default=0, description="Keys present on both sides")
+    orphan_count: int = Field(default=0, description="Objects in storage without a database reference")
+    missing_count: int = Field(default=0, description="Referenced source objects missing from storage")
+    missing_derivative_count: int = Field(default=0, description="Referenced WebP derivatives missing from storage")
+    orphan_samples: List[str] = Field(default_factory=list, description="First orphan keys found")
+    missing_samples: List[str] = Field(default_factory=list, description="First missing keys found")
+    repaired_derivatives: int = Field(default=0, description="WebP derivatives regenerated (repair mode)")
+    deleted_orphans: int = Field(default=0, description="Orphans deleted (repair mode)")
+    repair: bool = Field(default=False, description="Whether repairs were applied")
+    started_at: datetime = Field(default_factory=common_utils.get_utc_now, description="Run start timestamp")
+    finished_at: Optional[datetime] = Field(default=None, description="Run end timestamp")
@@ -0,0 +1,209 @@
+"""Service layer for content-addressed object storage"""
+
+import asyncio
+import hashlib
+import mimetypes
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.crud import photo_version_crud, project_crud, stored_object_crud
+from app.models.photo_version import PhotoVersion, VersionType
+from app.models.project import Project
+from app.models.stored_object import StoredObject
+from app.utils import storage
+from app.utils.image_utils import convert_to_webp
+from app.utils.logging import logger
+from app.utils.storage_shards import get_shard
+
+# Constants
+CONTENT_PREFIX = "objects"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def compute_content_hash(file_bytes: bytes) -> str:
+    """Return the SHA-256 hex digest used as the content address"""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def object_name_for_hash(content_hash: str) -> str:
+    """Object key for content-addressed bytes: objects/ab/cd/abcd..."""
+    return f"{CONTENT_PREFIX}/{content_hash[:2]}/{content_hash[2:4]}/{content_hash}"
+
+
+def webp_object_name_for_hash(content_hash: str) -> str:
+    """Object key of the WebP thumbnail derived from content-addressed bytes"""
+    return f"{object_name_for_hash(content_hash)}.webp"
+
+
+def public_base_url(shard: Optional[str] = None) -> str:
+    """Public URL prefix of a shard's photo bucket, with a trailing slash"""
+    shard_config = get_shard(shard)
+    return f"{shard_config.public_url}/{shard_config.bucket}/"
+
+
+def build_public_url(object_name: str, shard: Optional[str] = None) -> str:
+    """Public URL of an object in a shard's photo bucket"""
+    return f"{public_base_url(shard)}{object_name}"
+
+
+def resolve_object_names(
+    project_id,
+    filename: str,
+    version: VersionType,
+    photo_version: Optional[PhotoVersion] = None,
+) -> tuple[str, str]:
+    """
+    Resolve the (source, webp) object keys for a photo version.
+
+    Versions uploaded before content addressing have no content_hash and
+    live under the legacy {project_id}/{version}/{filename} keys.
+    """
+    if photo_version is not None and photo_version.content_hash:
+        return (
+            object_name_for_hash(photo_version.content_hash),
+            webp_object_name_for_hash(photo_version.content_hash),
+        )
+
+    legacy_path = f"{project_id}/{version.value}/{filename}"
+    legacy_webp_path = f"{project_id}/{version.value}/{filename.rsplit('.', 1)[0]}.webp"
+    return legacy_path, legacy_webp_path
+
+
+async def store_content(
+    db: Session,
+    project: Project,
+    file_bytes: bytes,
+    content_type: Optional[str] = None,
+) -> Optional[StoredObject]:
+    """
+    Store bytes under their content address and take a reference on them.
+
+    Duplicate content on the same shard only gains a reference: the MinIO
+    write and the WebP derivative are skipped entirely. Hashing and the
+    WebP encode run in worker threads, off the event loop.
+
+    New content takes its stored_object row (and the row lock) in a
+    savepoint before the objects are written. Storage GC removes objects
+    only while holding the locks of the rows it deletes, so it cannot
+    remove content an upload in flight is about to reference.
+
+    The project row is share-locked until the caller commits and
+    project.storage_shard is refreshed, so the content is written to the
+    project's current shard and a rebalance cannot switch the shard
+    before the new reference is committed.
+
+    Args:
+        db: Database session (caller commits)
+        project: Owning project (storage_shard is refreshed under the lock)
+        file_bytes: Object content
+        content_type: Content type of the source object
+
+    Returns:
+        StoredObject holding the reference, or None if the upload failed
+    """
+    content_hash = await asyncio.to_thread(compute_content_hash, file_bytes)
+    if project_crud.lock_for_storage_write(db, project.id) is None:
+        return None
+    shard = get_shard(project.storage_shard).name
+
+    # Already stored: only add a reference (row may vanish under GC, then re-upload)
+    stored_object = stored_object_crud.get_by_hash(db, content_hash, shard)
+    if stored_object and stored_object_crud.increment_ref(db, content_hash, shard):
+        logger.info(f"Deduplicated upload {content_hash}")
+        return stored_object
+
+    async def upload_webp() -> bool:
+        webp_bytes = await asyncio.to_thread(convert_to_webp, file_bytes, 85)
+        return await storage.upload_object(
+            webp_object_name_for_hash(content_hash),
+            webp_bytes,
+            content_type="image/webp",
+            cache_control=IMMUTABLE_CACHE_CONTROL,
+            shard=shard,
+        )
+
+    object_name = object_name_for_hash(content_hash)
+    savepoint = db.begin_nested()
+    try:
+        stored_object_crud.upsert_with_ref(
+            db,
+            content_hash=content_hash,
+            object_name=object_name,
+            size=len(file_bytes),
+            content_type=content_type,
+            shard=shard,
+        )
+        success, webp_success = await asyncio.gather(
+            storage.upload_object(
+                object_name,
+                file_bytes,
+                content_type=content_type,
+                cache_control=IMMUTABLE_CACHE_CONTROL,
+                shard=shard,
+            ),
+            upload_webp(),
+        )
+    except BaseException:
+        savepoint.rollback()
+        raise
+
+    if not success or not webp_success:
+        savepoint.rollback()
+        return None
+    savepoint.commit()
+    return stored_object_crud.get_by_hash(db, content_hash, shard)
+
+
+def release_content(db: Session, content_hash: Optional[str], shard: Optional[str] = None) -> None:
+    """Drop a reference taken by store_content (no-op for legacy versions)"""
+    if content_hash:
+        stored_object_crud.decrement_ref(db, content_hash, get_shard(shard).name)
+
+
+async def adopt_legacy_content(
+    db: Session,
+    version_id: UUID,
+    project_id: UUID,
+    filename: str,
+    version_type: str,
+) -> bool:
+    """
+    Move a legacy version to its content address (backfill of content_hash).
+
+    The legacy object is read and stored through store_content, so content
+    already on the shard only gains a reference. The legacy keys are left
+    in place: they become orphans removed by the reconcile repair or the
+    project purge.
+
+    Args:
+        db: Database session (caller commits)
+        version_id: PhotoVersion ID
+        project_id: Project of the photo
+        filename: Photo filename
+        version_type: Version type of the row
+
+    Returns:
+        True if the version now has a content hash, False if the legacy
+        object is missing or the version was replaced concurrently
+    """
+    # Locked before reading: the legacy object is read from the shard the content is stored on
+    project = project_crud.lock_for_storage_write(db, project_id)
+    if project is None:
+        return False
+    legacy_path, _ = resolve_object_names(project_id, filename, VersionType(version_type))
+    file_bytes = await storage.download_object(legacy_path, shard=project.storage_shard)
+    if file_bytes is None:
+        logger.warning(f"Legacy object {legacy_path} not found, version {version_id} left as is")
+        return False
+
+    stored_object = await store_content(db, project, file_bytes, mimetypes.guess_type(filename)[0])
+    if stored_object is None:
+        return False
+
+    image_url = build_public_url(stored_object.object_name, project.storage_shard)
+    if not photo_version_crud.adopt_content(db, version_id, image_url, stored_object.content_hash):
+        release_content(db, stored_object.content_hash, project.storage_shard)
+        return False
+    return True
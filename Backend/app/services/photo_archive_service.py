@@ -0,0 +1,298 @@
+"""Photo archive service - background-built, cached selected-photo archives"""
+
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.constant.messages import MessageConstants
+from app.models.project import Project
+from app.models.user import User
+from app.schemas.photo_download import PhotoArchiveJobResponse, PhotoArchiveSpec
+from app.services.photo_download_service import PhotoArchive, prepare_photo_archive
+from app.utils import common_utils, storage
+from app.utils.http_range import parse_range_header
+from app.utils.logging import logger
+from app.utils.redis import get_async_redis_client, publish_to_user_channel
+from app.utils.storage_backend import StorageBackend
+
+# Finished archives live at archives/{project_id}/{selection_hash}.zip on the project's shard
+ARCHIVE_PREFIX = "archives/"
+# Job state follows the task progress convention (replayed to reconnecting clients)
+ARCHIVE_JOB_KEY = "task_progress:{job_id}:{user_id}"
+ACTIVE_JOB_STATUSES = ("pending", "running", "retrying")
+
+
+def archive_object_name(project_id: UUID, selection_hash: str) -> str:
+    """Object key of a project's cached archive for a selection"""
+    return f"{ARCHIVE_PREFIX}{project_id}/{selection_hash}.zip"
+
+
+def archive_download_url(project_id: UUID, job_id: str) -> str:
+    """API path serving a finished archive"""
+    return f"{settings.API_V1_STR}/photos/{project_id}/download-photos/archive/{job_id}/download"
+
+
+def remove_project_archives(
+    backend: StorageBackend,
+    project_id,
+    keep: Optional[str] = None,
+    modified_before: Optional[datetime] = None,
+) -> int:
+    """
+    Delete cached archives of a project from a shard.
+
+    Args:
+        backend: Backend of the shard holding the archives
+        project_id: Project ID
+        keep: Object name to keep (the archive just built)
+        modified_before: Only delete archives last written before this time
+
+    Returns:
+        Number of archives deleted
+    """
+    object_names = [
+        info.object_name
+        for info in backend.list_objects(backend.bucket_name, prefix=f"{ARCHIVE_PREFIX}{project_id}/")
+        if info.object_name != keep
+        and (modified_before is None or info.last_modified is None or info.last_modified < modified_before)
+    ]
+    if not object_names:
+        return 0
+    errors = backend.remove_objects(backend.bucket_name, object_names)
+    return len(object_names) - len(errors)
+
+
+def _get_owned_project(db: Session, user: User, project_id: UUID) -> Project:
+    """
+    Get a project owned by the user.
+
+    Raises:
+        HTTPException: If the project does not exist or belongs to someone else
+    """
+    project = db.get(Project, project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=MessageConstants.PROJECT_NOT_FOUND,
+        )
+    if project.owner_id != user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=MessageConstants.PROJECT_PERMISSION_DENIED,
+        )
+    return project
+
+
+def _job_response(project_id: UUID, job_id: str, state: dict) -> PhotoArchiveJobResponse:
+    job_status = state.get("status", "pending")
+    return PhotoArchiveJobResponse(
+        job_id=job_id,
+        status=job_status,
+        progress=int(state.get("progress", 0)),
+        size=int(state["size"]) if state.get("size") else None,
+        error=state.get("error") or None,
+        download_url=archive_download_url(project_id, job_id) if job_status == "completed" else None,
+    )
+
+
+async def _record_job(client, user_id: UUID, job_id: str, job_status: str, progress: int, **fields) -> dict:
+    """Write the job state hash and notify the user, as report_task_progress does from workers"""
+    data = {
+        "status": job_status,
+        "progress": str(progress),
+        "last_update": common_utils.get_utc_now().isoformat(),
+        **{key: str(value) for key, value in fields.items()},
+    }
+    key = ARCHIVE_JOB_KEY.format(job_id=job_id, user_id=user_id)
+    await client.hset(key, mapping=data)
+    await client.expire(key, settings.TASK_PROGRESS_TTL_SECONDS)
+    await publish_to_user_channel(str(user_id), {"type": "task_progress", "data": {**data, "task_id": job_id}})
+    return data
+
+
+async def start_photo_archive_job(
+    db: Session,
+    user: User,
+    project_id: UUID,
+    spec: Optional[PhotoArchiveSpec] = None,
+) -> PhotoArchiveJobResponse:
+    """
+    Start building the selected-photo archive in the background.
+
+    The job ID is the digest of the selection (photos, their content, the
+    CSV and the content spec), so an unchanged selection maps to the same
+    job: a finished archive is returned as completed right away, and a
+    build in progress is shared.
+
+    Args:
+        db: Database session
+        user: Authenticated user
+        project_id: Project ID
+        spec: Version, rendition size and layout (default: originals by extension)
+
+    Returns:
+        PhotoArchiveJobResponse: Job state
+
+    Raises:
+        HTTPException: If the project is not accessible or the job cannot be queued
+    """
+    from app.jobs.archive_tasks import build_photo_archive
+
+    _get_owned_project(db, user, project_id)
+    archive = prepare_photo_archive(db, project_id, user.id, spec)
+    job_id = archive.selection_hash
+    object_name = archive_object_name(project_id, job_id)
+
+    info = await storage.stat_object(object_name, shard=archive.shard)
+    if info is not None:
+        return _job_response(project_id, job_id, {"status": "completed", "progress": 100, "size": info.size})
+
+    client = await get_async_redis_client()
+    key = ARCHIVE_JOB_KEY.format(job_id=job_id, user_id=user.id)
+    # Claim the build: concurrent requests for the same selection share one job
+    if not await client.hsetnx(key, "status", "pending"):
+        state = await client.hgetall(key)
+        if state.get("status") in ACTIVE_JOB_STATUSES:
+            return _job_response(project_id, job_id, state)
+        # Failed, or completed and removed since: build again
+
+    state = await _record_job(client, user.id, job_id, "pending", 0, project_id=project_id, object_name=object_name)
+    try:
+        build_photo_archive.delay(str(project_id), str(user.id), job_id, archive.spec.model_dump(mode="json"))
+    except Exception as e:
+        logger.exception(f"Failed to schedule archive job for project {project_id}: {e}")
+        await client.delete(key)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=MessageConstants.ARCHIVE_JOB_UNAVAILABLE,
+        )
+    return _job_response(project_id, job_id, state)
+
+
+async def get_photo_archive_job(db: Session, user: User, project_id: UUID, job_id: str) -> PhotoArchiveJobResponse:
+    """
+    Get the state of an archive job.
+
+    Archives outlive their job state: once the state has expired a finished
+    archive is still reported as completed.
+
+    Raises:
+        HTTPException: If the project is not accessible or the job is unknown
+    """
+    project = _get_owned_project(db, user, project_id)
+    client = await get_async_redis_client()
+    state = await client.hgetall(ARCHIVE_JOB_KEY.format(job_id=job_id, user_id=user.id))
+    if state:
+        return _job_response(project_id, job_id, state)
+
+    info = await storage.stat_object(archive_object_name(project_id, job_id), shard=project.storage_shard)
+    if info is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=MessageConstants.ARCHIVE_NOT_FOUND,
+        )
+    return _job_response(project_id, job_id, {"status": "completed", "progress": 100, "size": info.size})
+
+
+async def _iter_archive_range(object_name: str, shard: Optional[str], start: int, end: int) -> AsyncIterator[bytes]:
+    """Stream bytes start..end (inclusive) of an archive in ranged reads"""
+    offset = start
+    while offset <= end:
+        length = min(settings.ARCHIVE_DOWNLOAD_CHUNK_SIZE, end - offset + 1)
+        chunk = await storage.download_object_range(object_name, offset, length, shard=shard)
+        if not chunk:
+            # Abort the response rather than send a silently truncated archive
+            raise OSError(f"Archive {object_name} could not be read at offset {offset}")
+        offset += len(chunk)
+        yield chunk
+
+
+async def _open_archive(object_name: str, shard: Optional[str], size: int, range_header: Optional[str] = None) -> dict:
+    """
+    Local file path of an archive, or a stream of the requested range.
+
+    Raises:
+        HTTPException: If the range is unsatisfiable
+    """
+    file_path = await storage.local_path(object_name, shard=shard)
+    if file_path:
+        return {"path": file_path}
+
+    try:
+        byte_range = parse_range_header(range_header, size)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail=MessageConstants.INVALID_RANGE,
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    start, end = byte_range or (0, size - 1)
+    return {
+        "stream": _iter_archive_range(object_name, shard, start, end),
+        "size": size,
+        "range": byte_range,
+    }
+
+
+async def open_photo_archive(
+    db: Session,
+    user: User,
+    project_id: UUID,
+    job_id: str,
+    range_header: Optional[str] = None,
+) -> dict:
+    """
+    Open a finished archive for download, honouring a single byte range.
+
+    Args:
+        db: Database session
+        user: Authenticated user
+        project_id: Project ID
+        job_id: Archive job ID
+        range_header: Range request header, if any
+
+    Returns:
+        Dict with filename, and either path (local file, served with its own
+        range handling) or stream, size and range (inclusive start/end, None
+        for the whole archive)
+
+    Raises:
+        HTTPException: If the archive is missing, not finished yet or the range is unsatisfiable
+    """
+    project = _get_owned_project(db, user, project_id)
+    object_name = archive_object_name(project_id, job_id)
+    filename = f"{project.title.replace(' ', '_')}_selected_photos.zip"
+
+    info = await storage.stat_object(object_name, shard=project.storage_shard)
+    if info is None:
+        client = await get_async_redis_client()
+        state = await client.hgetall(ARCHIVE_JOB_KEY.format(job_id=job_id, user_id=user.id))
+        if state.get("status") in ACTIVE_JOB_STATUSES:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=MessageConstants.ARCHIVE_NOT_READY,
+            )
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=MessageConstants.ARCHIVE_NOT_FOUND,
+        )
+
+    return {**await _open_archive(object_name, project.storage_shard, info.size, range_header), "filename": filename}
+
+
+async def open_ready_archive(archive: PhotoArchive) -> Optional[dict]:
+    """
+    Open the finished archive of the current selection (pre-built or built by an earlier job).
+
+    Returns:
+        Dict with path or stream and size, None if the selection has not been built
+    """
+    object_name = archive_object_name(archive.project_id, archive.selection_hash)
+    info = await storage.stat_object(object_name, shard=archive.shard)
+    if info is None:
+        return None
+    return await _open_archive(object_name, archive.shard, info.size)
@@ -1,61 +1,141 @@
 """Photo download service - manifest and script generation"""
 
+import asyncio
 import csv
+import hashlib
 import io
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import AsyncIterator, Callable, List, Optional
 from uuid import UUID
-from zipfile import ZipFile
 
-from sqlmodel import Session, select
+from sqlalchemy.engine import Row
+from sqlmodel import Session
 
-from app.crud.photo_crud import get_selected_by_project
-from app.models.photo import Photo
-from app.models.photo_comment import PhotoComment
+from app.core.config import settings
+from app.crud import photo_crud
+from app.models.photo_version import VersionType
 from app.models.project import Project
 from app.schemas.photo_download import (
+    ArchiveLayout,
+    ArchiveVersion,
+    PhotoArchiveSpec,
     PhotoDownloadScriptsResponse,
     PhotoManifest,
     PhotoManifestItem,
     ScriptTemplate,
 )
-from app.utils.minio import download_file_from_minio
-
-
-def get_selected_photos_with_comments(db: Session, project_id: UUID) -> List[Tuple[Photo, Optional[PhotoComment]]]:
-    """Get all selected photos with their latest comments"""
-    statement = select(Photo).where((Photo.project_id == project_id) & (Photo.is_selected == True))
-    selected_photos = db.exec(statement).all()
-
-    result = []
-    for photo in selected_photos:
-        # Get latest comment for this photo
-        comment_statement = select(PhotoComment).where(PhotoComment.photo_id == photo.id).order_by(PhotoComment.created_at.desc())
-        latest_comment = db.exec(comment_statement).first()
-        result.append((photo, latest_comment))
-
-    return result
-
-
-def build_photo_manifest(db: Session, project_id: UUID, current_user_id: UUID) -> PhotoManifest:
-    """Build manifest with selected photos and metadata"""
-    # Get project and verify ownership
+from app.services.object_store_service import resolve_object_names
+from app.services.rendition_cache_service import get_rendition, put_rendition, rendition_key
+from app.utils import storage
+from app.utils.image_utils import resize_image
+from app.utils.logging import logger
+from app.utils.prefetch import prefetch_ordered
+from app.utils.storage_shards import get_shard
+from app.utils.zip_stream import ZipStreamWriter
+
+# Bump when the archive layout changes, so cached archives are rebuilt
+ARCHIVE_FORMAT_VERSION = 1
+
+# Entry listing the photos that could not be read, in archives streamed without them
+MISSING_ENTRIES_FILENAME = "MISSING.txt"
+
+# Version looked up first, and the one used for photos without it
+_ARCHIVE_VERSION_TYPES = {
+    ArchiveVersion.ORIGINAL: (VersionType.ORIGINAL, None),
+    ArchiveVersion.EDITED: (VersionType.EDITED, None),
+    ArchiveVersion.EDITED_OR_ORIGINAL: (VersionType.EDITED, VersionType.ORIGINAL),
+}
+
+
+class ArchiveEntryMissingError(Exception):
+    """A photo of the archive could not be read from storage"""
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    """A photo to put into an archive, resolved before streaming starts"""
+
+    object_name: str
+    zip_path: str
+    modified_at: datetime
+    size: Optional[int] = None
+    # Cache key of the resized rendition, for web-size archives
+    rendition_key: Optional[str] = None
+
+
+@dataclass
+class PhotoArchive:
+    """Everything needed to write a project's selected-photo archive"""
+
+    project_id: UUID
+    project_title: str
+    shard: Optional[str]
+    entries: List[ArchiveEntry]
+    csv_content: str
+    spec: PhotoArchiveSpec = field(default_factory=PhotoArchiveSpec)
+
+    @property
+    def selection_hash(self) -> str:
+        """
+        Digest of the archive content: changes whenever a photo is selected,
+        deselected, re-uploaded or renamed, the CSV (comments, notes) changes,
+        or a different content spec is requested.
+        """
+        spec = f"{self.spec.version.value}:{self.spec.size or 0}:{self.spec.layout.value}"
+        digest = hashlib.sha256(f"v{ARCHIVE_FORMAT_VERSION}:{self.project_id}:{spec}\n".encode())
+        for entry in self.entries:
+            digest.update(f"{entry.zip_path}\0{entry.object_name}\0{entry.modified_at.isoformat()}\n".encode())
+        digest.update(self.csv_content.encode("utf-8"))
+        return digest.hexdigest()
+
+
+def _get_owned_project(db: Session, project_id: UUID, current_user_id: UUID) -> Project:
+    """
+    Get the project and verify ownership.
+
+    Raises:
+        ValueError: If the project does not exist or is not owned by the user
+    """
     project = db.get(Project, project_id)
     if not project or project.owner_id != current_user_id:
         raise ValueError("Project not found or access denied")
+    return project
+
+
+def _get_selection_rows(db: Session, project: Project, spec: Optional[PhotoArchiveSpec] = None) -> List[Row]:
+    """Selected photos with the spec's version, latest comment and stored size (single query)"""
+    version_type, fallback_version_type = _ARCHIVE_VERSION_TYPES[(spec or PhotoArchiveSpec()).version]
+    return photo_crud.get_selection_manifest(
+        db,
+        project.id,
+        get_shard(project.storage_shard).name,
+        version_type,
+        fallback_version_type,
+    )
+
+
+def _archive_path(layout: ArchiveLayout, filename: str, version_type: VersionType) -> str:
+    """Path of a photo inside the archive"""
+    if layout == ArchiveLayout.FLAT:
+        return filename
+    if layout == ArchiveLayout.BY_VERSION:
+        return f"{version_type.value.capitalize()}/{filename}"
+    # Extract extension from filename
+    file_ext = filename.split(".")[-1].upper()
+    return f"Selected/{file_ext}/{filename}"
 
-    # Get selected photos with comments
-    photos_with_comments = get_selected_photos_with_comments(db, project_id)
 
-    # Build manifest items
-    manifest_items = []
-    for photo, comment in photos_with_comments:
-        item = PhotoManifestItem(
+def _manifest_from_rows(project: Project, rows: List[Row]) -> PhotoManifest:
+    """Build the manifest from selection rows"""
+    manifest_items = [
+        PhotoManifestItem(
             filename=photo.filename,
-            photo_comment=comment.content if comment else None,
+            photo_comment=latest_comment,
             project_notes=project.client_notes,
         )
-        manifest_items.append(item)
+        for photo, _, latest_comment, _ in rows
+    ]
 
     # Sort by filename for consistency
     manifest_items.sort(key=lambda x: x.filename)
@@ -68,6 +148,12 @@ def build_photo_manifest(db: Session, project_id: UUID, current_user_id: UUID) -
     )
 
 
+def build_photo_manifest(db: Session, project_id: UUID, current_user_id: UUID) -> PhotoManifest:
+    """Build manifest with selected photos and metadata"""
+    project = _get_owned_project(db, project_id, current_user_id)
+    return _manifest_from_rows(project, _get_selection_rows(db, project))
+
+
 def generate_csv_content(manifest: PhotoManifest) -> str:
     """Generate CSV content from manifest"""
     output = io.StringIO()
@@ -89,27 +175,52 @@ def generate_csv_content(manifest: PhotoManifest) -> str:
     return output.getvalue()
 
 
+# Characters PowerShell accepts as single quotes (doubled to escape inside a literal)
+_POWERSHELL_QUOTES = "'\u2018\u2019\u201a\u201b"
+
+
+def _sh_quote(value: str) -> str:
+    """Single-quoted POSIX shell word (bash and zsh)"""
+    return "'" + value.replace("'", "'\\''") + "'"
+
+
+def _powershell_quote(value: str) -> str:
+    """Single-quoted PowerShell string literal"""
+    for quote in _POWERSHELL_QUOTES:
+        value = value.replace(quote, quote * 2)
+    return "'" + value + "'"
+
+
 def _build_powershell_script(selected_filenames: List[str]) -> str:
-    """Build PowerShell script template"""
-    selected_str = '", "'.join(selected_filenames)
+    """Build PowerShell script template (selection looked up in a HashSet)"""
+    selected_items = ",\n".join(f"    {_powershell_quote(filename)}" for filename in selected_filenames)
 
     return f"""# Auto-generated script - move photos by selection status
 # Project: {{PROJECT_TITLE}}
-# Selected photos: {", ".join(selected_filenames) if selected_filenames else "none"}
-
-$selectedPhotos = @("{selected_str}")
+# Selected photos: {len(selected_filenames)}
+
+# Case-insensitive like the Windows file system
+$selectedPhotos = [System.Collections.Generic.HashSet[string]]::new([System.StringComparer]::OrdinalIgnoreCase)
+foreach ($name in [string[]]@(
+{selected_items}
+)) {{
+    [void]$selectedPhotos.Add($name)
+}}
+$createdDirs = [System.Collections.Generic.HashSet[string]]::new([System.StringComparer]::OrdinalIgnoreCase)
 
 foreach ($file in Get-ChildItem -File) {{
     $ext = $file.Extension.ToUpper().TrimStart('.')
 
-    if ($selectedPhotos -contains $file.Name) {{
+    if ($selectedPhotos.Contains($file.Name)) {{
         $targetDir = "Selected\\$ext"
     }} else {{
         $targetDir = "NotSelected\\$ext"
     }}
 
-    New-Item -ItemType Directory -Path $targetDir -Force | Out-Null
-    Move-Item -Path $file.FullName -Destination "$targetDir\\$($file.Name)" -Force
+    if ($createdDirs.Add($targetDir)) {{
+        New-Item -ItemType Directory -Path $targetDir -Force | Out-Null
+    }}
+    Move-Item -LiteralPath $file.FullName -Destination "$targetDir\\$($file.Name)" -Force
 }}
 
 Write-Host "Organization complete!"
@@ -117,15 +228,23 @@ Write-Host "Organization complete!"
 
 
 def _build_bash_script(selected_filenames: List[str]) -> str:
-    """Build Bash script template"""
-    selected_arr = " ".join(f'"{f}"' for f in selected_filenames)
+    """Build Bash script template (selection looked up in an associative array)"""
+    selected_items = "\n".join(f"    [{_sh_quote(filename)}]=1" for filename in selected_filenames)
 
     return f"""#!/bin/bash
 # Auto-generated script - move photos by selection status
 # Project: {{PROJECT_TITLE}}
-# Selected photos: {", ".join(selected_filenames) if selected_filenames else "none"}
+# Selected photos: {len(selected_filenames)}
+
+if ((BASH_VERSINFO[0] < 4)); then
+    echo "Bash 4 or newer is required (on macOS use the zsh script)" >&2
+    exit 1
+fi
 
-selected_photos=({selected_arr})
+declare -A selected_photos=(
+{selected_items}
+)
+declare -A created_dirs=()
 
 for file in *; do
     [ -f "$file" ] || continue
@@ -133,14 +252,17 @@ for file in *; do
     ext="${{file##*.}}"
     ext="${{ext^^}}"
 
-    if [[ " ${{selected_photos[@]}} " =~ " ${{file}} " ]]; then
+    if [[ -n "${{selected_photos[$file]+x}}" ]]; then
         target_dir="Selected/$ext"
     else
         target_dir="NotSelected/$ext"
     fi
 
-    mkdir -p "$target_dir"
-    mv "$file" "$target_dir/$file"
+    if [[ -z "${{created_dirs[$target_dir]+x}}" ]]; then
+        mkdir -p "$target_dir"
+        created_dirs[$target_dir]=1
+    fi
+    mv -- "$file" "$target_dir/$file"
 done
 
 echo "Organization complete!"
@@ -148,15 +270,18 @@ echo "Organization complete!"
 
 
 def _build_zsh_script(selected_filenames: List[str]) -> str:
-    """Build Zsh script template"""
-    selected_arr = " ".join(f'"{f}"' for f in selected_filenames)
+    """Build Zsh script template (selection looked up in an associative array)"""
+    selected_items = "\n".join(f"    {_sh_quote(filename)} 1" for filename in selected_filenames)
 
     return f"""#!/bin/zsh
 # Auto-generated script - move photos by selection status
 # Project: {{PROJECT_TITLE}}
-# Selected photos: {", ".join(selected_filenames) if selected_filenames else "none"}
+# Selected photos: {len(selected_filenames)}
 
-selected_photos=({selected_arr})
+typeset -A selected_photos created_dirs
+selected_photos=(
+{selected_items}
+)
 
 for file in *(D); do
     [[ -f "$file" ]] || continue
@@ -164,14 +289,17 @@ for file in *(D); do
     ext="${{file##*.}}"
     ext="${{ext:u}}"
 
-    if (( ${{+selected_photos[(r)${{file}}]}} )); then
+    if (( ${{+selected_photos[$file]}} )); then
         target_dir="Selected/$ext"
     else
         target_dir="NotSelected/$ext"
     fi
 
-    mkdir -p "$target_dir"
-    mv "$file" "$target_dir/$file"
+    if (( ! ${{+created_dirs[$target_dir]}} )); then
+        mkdir -p "$target_dir"
+        created_dirs[$target_dir]=1
+    fi
+    mv -- "$file" "$target_dir/$file"
 done
 
 echo "Organization complete!"
@@ -189,9 +317,10 @@ def generate_script_templates(manifest: PhotoManifest) -> List[ScriptTemplate]:
         "zsh": _build_zsh_script(selected_filenames),
     }
 
-    # Replace project title placeholder in all scripts
+    # Replace project title placeholder in all scripts (kept on its comment line)
+    project_title = " ".join(manifest.project_title.splitlines())
     for lang in scripts_content:
-        scripts_content[lang] = scripts_content[lang].replace("{PROJECT_TITLE}", manifest.project_title)
+        scripts_content[lang] = scripts_content[lang].replace("{PROJECT_TITLE}", project_title)
 
     return [
         ScriptTemplate(name="powershell", content=scripts_content["powershell"], extension=".ps1"),
@@ -211,44 +340,146 @@ def build_photo_download_scripts_response(manifest: PhotoManifest, csv_url: str)
     )
 
 
-def build_photo_manifest_zip(db: Session, project_id: UUID, current_user_id: UUID) -> io.BytesIO:
-    """Build ZIP with selected photos organized by extension + CSV"""
-    # Get project and verify ownership
-    project = db.get(Project, project_id)
-    if not project or project.owner_id != current_user_id:
-        raise ValueError("Project not found or access denied")
-
-    # Get selected photos from CRUD
-    selected_photos = get_selected_by_project(db, project_id)
-
-    # Create ZIP buffer
-    zip_buffer = io.BytesIO()
-
-    with ZipFile(zip_buffer, "w") as zip_file:
-        # Add each selected photo to ZIP
-        for photo in selected_photos:
-            # Construct MinIO object path: project_id/original/filename
-            object_name = f"{project_id}/original/{photo.filename}"
-
-            # Download file from MinIO using the correct path
-            file_bytes = download_file_from_minio(
-                bucket_name="photos",
+def prepare_photo_archive(
+    db: Session,
+    project_id: UUID,
+    current_user_id: UUID,
+    spec: Optional[PhotoArchiveSpec] = None,
+) -> PhotoArchive:
+    """
+    Resolve everything the selected-photo archive needs from the database.
+
+    Args:
+        db: Database session
+        project_id: Project ID
+        current_user_id: Authenticated user ID
+        spec: Version, rendition size and layout (default: originals by extension)
+
+    Raises:
+        ValueError: If the project does not exist or is not owned by the user
+    """
+    return build_project_archive(db, _get_owned_project(db, project_id, current_user_id), spec)
+
+
+def build_project_archive(db: Session, project: Project, spec: Optional[PhotoArchiveSpec] = None) -> PhotoArchive:
+    """
+    Resolve the selected-photo archive of a project the caller is already authorized for.
+
+    Args:
+        db: Database session
+        project: Project (ownership or project token checked by the caller)
+        spec: Version, rendition size and layout (default: originals by extension)
+    """
+    spec = spec or PhotoArchiveSpec()
+    project_id = project.id
+    requested_version_type, fallback_version_type = _ARCHIVE_VERSION_TYPES[spec.version]
+
+    # One query feeds both the entries and the CSV
+    rows = _get_selection_rows(db, project, spec)
+    entries = []
+    for photo, photo_version, _, object_size in rows:
+        if photo_version is None and spec.version == ArchiveVersion.EDITED:
+            # Not edited yet: nothing to ship
+            continue
+        if photo_version is not None:
+            version_type = VersionType(photo_version.version_type)
+        else:
+            version_type = fallback_version_type or requested_version_type
+        # Resolve MinIO object path (content-addressed or legacy project_id/version/filename)
+        object_name, _ = resolve_object_names(project_id, photo.filename, version_type, photo_version)
+        entries.append(
+            ArchiveEntry(
                 object_name=object_name,
+                zip_path=_archive_path(spec.layout, photo.filename, version_type),
+                modified_at=photo.updated_at,
+                size=object_size,
+                # Same key as the photo endpoint's ?w= renditions, so either fills the other's cache
+                rendition_key=rendition_key(object_name, photo_version, spec.size, None) if spec.size else None,
             )
+        )
 
-            if file_bytes:
-                # Extract extension from filename
-                file_ext = photo.filename.split(".")[-1].upper()
-                folder_path = f"Selected/{file_ext}"
+    # Generate CSV
+    csv_content = generate_csv_content(_manifest_from_rows(project, rows))
 
-                # Add to ZIP
-                zip_path = f"{folder_path}/{photo.filename}"
-                zip_file.writestr(zip_path, file_bytes)
+    return PhotoArchive(
+        project_id=project_id,
+        project_title=project.title,
+        shard=project.storage_shard,
+        entries=entries,
+        csv_content=csv_content,
+        spec=spec,
+    )
 
-        # Generate and add CSV
-        manifest = build_photo_manifest(db, project_id, current_user_id)
-        csv_content = generate_csv_content(manifest)
-        zip_file.writestr("photos.csv", csv_content)
 
-    zip_buffer.seek(0)
-    return zip_buffer
+async def stream_photo_archive(
+    archive: PhotoArchive,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    fail_on_missing: bool = False,
+) -> AsyncIterator[bytes]:
+    """
+    Stream photos out as ZIP entries (JPEGs stored, not deflated).
+
+    For a spec with a rendition size, each photo is taken from the
+    rendition cache when present and resized from the stored object otherwise.
+
+    Downloads run ARCHIVE_PREFETCH_CONCURRENCY ahead of the writer within
+    ARCHIVE_PREFETCH_MAX_BYTES; entries are still written in selection order.
+
+    Photos that cannot be read are listed in a MISSING.txt entry, since a
+    streamed response can no longer fail with an error status.
+
+    Args:
+        archive: Archive resolved by prepare_photo_archive
+        on_progress: Called with (entries written, total entries) after each photo
+        fail_on_missing: Raise instead of listing unreadable photos (archives
+            that are stored and reused must be complete)
+
+    Raises:
+        ArchiveEntryMissingError: If a photo cannot be read and fail_on_missing is set
+    """
+    writer = ZipStreamWriter()
+    total = len(archive.entries)
+
+    async def fetch(entry: ArchiveEntry) -> Optional[bytes]:
+        if entry.rendition_key:
+            # Web-size bundles reuse cached renditions, encoding only on a miss
+            rendition = await get_rendition(entry.rendition_key)
+            if rendition is not None:
+                return rendition
+        # Download file from MinIO using the correct path
+        file_bytes = await storage.download_object(entry.object_name, shard=archive.shard)
+        if file_bytes and entry.rendition_key:
+            file_bytes = await asyncio.to_thread(resize_image, file_bytes, archive.spec.size, None)
+            await put_rendition(entry.rendition_key, file_bytes)
+        return file_bytes
+
+    prefetched = prefetch_ordered(
+        archive.entries,
+        fetch,
+        concurrency=settings.ARCHIVE_PREFETCH_CONCURRENCY,
+        max_bytes=settings.ARCHIVE_PREFETCH_MAX_BYTES,
+        size_hint=lambda entry: entry.size,
+        default_size=settings.UPLOAD_MAX_FILE_SIZE,
+    )
+    written = 0
+    missing: List[str] = []
+    async for entry, file_bytes in prefetched:
+        written += 1
+        if file_bytes:
+            for chunk in writer.write_entry(entry.zip_path, file_bytes, modified_at=entry.modified_at):
+                yield chunk
+        elif fail_on_missing:
+            raise ArchiveEntryMissingError(f"Could not read {entry.object_name} for {entry.zip_path}")
+        else:
+            logger.warning(f"Archive of project {archive.project_id}: could not read {entry.object_name}, listed in {MISSING_ENTRIES_FILENAME}")
+            missing.append(entry.zip_path)
+        if on_progress:
+            on_progress(written, total)
+
+    if missing:
+        note = "These photos could not be read from storage and are not in this archive:\n" + "".join(f"{path}\n" for path in missing)
+        for chunk in writer.write_entry(MISSING_ENTRIES_FILENAME, note.encode("utf-8"), compress=True):
+            yield chunk
+    for chunk in writer.write_entry("photos.csv", archive.csv_content.encode("utf-8"), compress=True):
+        yield chunk
+    yield writer.close()
@@ -0,0 +1,158 @@
+"""Photo export service - streamed CSV and NDJSON manifests"""
+
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from itertools import groupby
+from typing import Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.engine import Row
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.crud import photo_crud
+from app.db.manager import DatabaseManager
+from app.models.project import Project
+
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+@dataclass
+class ExportedPhoto:
+    """A photo with its comments, oldest first"""
+
+    filename: str
+    is_selected: bool
+    comments: List[dict] = field(default_factory=list)
+
+    @property
+    def latest_comment(self) -> Optional[str]:
+        return self.comments[-1]["content"] if self.comments else None
+
+
+def _group_photos(rows: Iterable[Row]) -> Iterator[ExportedPhoto]:
+    """Fold adjacent photo/comment rows into one ExportedPhoto per photo"""
+    for _, photo_rows in groupby(rows, key=lambda row: row.photo_id):
+        photo = None
+        for row in photo_rows:
+            if photo is None:
+                photo = ExportedPhoto(filename=row.filename, is_selected=row.is_selected)
+            if row.comment_content is not None:
+                photo.comments.append(
+                    {
+                        "author_type": row.comment_author_type,
+                        "content": row.comment_content,
+                        "created_at": row.comment_created_at,
+                    }
+                )
+        yield photo
+
+
+def _format_history(comments: List[dict]) -> str:
+    return "\n".join(f"{comment['created_at']:%Y-%m-%d %H:%M} {comment['content']}" for comment in comments)
+
+
+def _csv_rows(photos: Iterable[ExportedPhoto], project_notes: Optional[str], with_history: bool) -> Iterator[list]:
+    if with_history:
+        yield ["filename", "is_selected", "photo_comment", "comment_history", "project_notes"]
+        for photo in photos:
+            yield [
+                photo.filename,
+                "true" if photo.is_selected else "false",
+                photo.latest_comment or "",
+                _format_history(photo.comments),
+                project_notes or "",
+            ]
+        return
+
+    # Same columns as the photos.csv in the archive
+    yield ["filename", "photo_comment", "project_notes"]
+    for photo in photos:
+        yield [photo.filename, photo.latest_comment or "", project_notes or ""]
+
+
+def _ndjson_record(photo: ExportedPhoto, project_notes: Optional[str], with_history: bool) -> str:
+    record = {
+        "filename": photo.filename,
+        "is_selected": photo.is_selected,
+        "photo_comment": photo.latest_comment,
+        "project_notes": project_notes,
+    }
+    if with_history:
+        record["comments"] = [{**comment, "created_at": comment["created_at"].isoformat()} for comment in photo.comments]
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def _stream_export(
+    project_id: UUID,
+    project_notes: Optional[str],
+    export_format: str,
+    selected_only: bool,
+    with_history: bool,
+) -> Iterator[str]:
+    """
+    Generate the export in chunks of about MANIFEST_EXPORT_CHUNK_BYTES.
+
+    Rows come from a server-side cursor in a session owned by the
+    generator (closed when the response finishes or the client goes away),
+    so memory stays bounded by one batch and one photo's comments.
+    """
+    with DatabaseManager.get_session() as db:
+        rows = photo_crud.stream_with_comments(db, project_id, selected_only, settings.MANIFEST_EXPORT_BATCH_SIZE)
+        photos = _group_photos(rows)
+        buffer = io.StringIO()
+
+        if export_format == "csv":
+            writer = csv.writer(buffer, quoting=csv.QUOTE_MINIMAL)
+            lines = _csv_rows(photos, project_notes, with_history)
+            write = writer.writerow
+        else:
+            lines = (_ndjson_record(photo, project_notes, with_history) for photo in photos)
+            write = buffer.write
+
+        for line in lines:
+            write(line)
+            if buffer.tell() >= settings.MANIFEST_EXPORT_CHUNK_BYTES:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+
+def open_manifest_export(
+    db: Session,
+    project_id: UUID,
+    current_user_id: UUID,
+    export_format: str = "csv",
+    selected_only: bool = True,
+    with_history: bool = False,
+) -> Tuple[str, Iterator[str]]:
+    """
+    Check access and return a streamed manifest export.
+
+    Args:
+        db: Database session (only used for the access check)
+        project_id: Project ID
+        current_user_id: Authenticated user ID
+        export_format: "csv" or "ndjson"
+        selected_only: Only export selected photos
+        with_history: Include every comment, not only the latest
+
+    Returns:
+        Tuple of project title and an iterator of text chunks
+
+    Raises:
+        ValueError: If the project does not exist, is not owned by the user or the format is unknown
+    """
+    if export_format not in EXPORT_CONTENT_TYPES:
+        raise ValueError(f"Unknown export format: {export_format}")
+    project = db.get(Project, project_id)
+    if not project or project.owner_id != current_user_id:
+        raise ValueError("Project not found or access denied")
+    return project.title, _stream_export(project_id, project.client_notes, export_format, selected_only, with_history)
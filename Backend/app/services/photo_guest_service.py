@@ -1,19 +1,24 @@
 """Service layer for Guest Photo operations"""
 
+import hashlib
 from typing import Optional
 from uuid import UUID
 
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.constant.messages import MessageConstants
 from app.crud import client_session_crud, photo_comment_crud, photo_crud, photo_version_crud
 from app.models.photo import PhotoStatus
 from app.models.photo_version import PhotoVersion, VersionType
 from app.schemas.common import PaginationSortSearchSchema
 from app.schemas.photo import PhotoCommentResponse, PhotoListResponse, PhotoMetaResponse
+from app.schemas.photo_download import ArchiveLayout, ArchiveVersion, PhotoArchiveSpec
+from app.services.photo_download_service import PhotoArchive, build_project_archive
 from app.services.photo_service import _download_and_process_photo_image
 from app.utils.logging import logger
+from app.utils.rate_limit import hit_rate_limit
 
 
 async def get_photo_image_guest(
@@ -73,6 +78,8 @@ async def get_photo_image_guest(
         width=width,
         height=height,
         is_thumbnail=is_thumbnail,
+        photo_version=photo_version,
+        shard=client_session.project.storage_shard,
     )
 
 
@@ -350,3 +357,54 @@ def get_photo_meta_by_id_guest(
     photo_meta.comments = [PhotoCommentResponse.model_validate(comment) for comment in comments]
 
     return photo_meta
+
+
+async def prepare_selection_archive_guest(db: Session, project_token: str) -> PhotoArchive:
+    """
+    Resolve the guest's selected photos as a preview-size archive (guest access).
+
+    Photos are the edited version when there is one, the original otherwise,
+    resized to GUEST_ARCHIVE_PREVIEW_WIDTH and laid out flat. Renditions
+    share the cache of the photo endpoint's ?w= resizing, so photos the guest
+    has already browsed at that width are not encoded again. Downloads are
+    limited to GUEST_ARCHIVE_RATE_LIMIT per token and window.
+
+    Args:
+        db: Database session
+        project_token: Project access token for authorization
+
+    Returns:
+        PhotoArchive: Archive to stream with stream_photo_archive
+
+    Raises:
+        HTTPException: If token is invalid or the token's download limit is reached
+    """
+    # 1. Verify project token
+    client_session = client_session_crud.get_by_token(db, project_token)
+    if not client_session or client_session.is_expired():
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=MessageConstants.INVALID_PROJECT_TOKEN,
+        )
+
+    # 2. Rate limit per token (keyed by digest, tokens are not stored in Redis)
+    token_digest = hashlib.sha256(project_token.encode()).hexdigest()
+    retry_after = await hit_rate_limit(
+        f"guest_archive:{token_digest}",
+        settings.GUEST_ARCHIVE_RATE_LIMIT,
+        settings.GUEST_ARCHIVE_RATE_WINDOW_SECONDS,
+    )
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=MessageConstants.RATE_LIMIT_EXCEEDED,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    # 3. Resolve the selection at preview size
+    spec = PhotoArchiveSpec(
+        version=ArchiveVersion.EDITED_OR_ORIGINAL,
+        size=settings.GUEST_ARCHIVE_PREVIEW_WIDTH,
+        layout=ArchiveLayout.FLAT,
+    )
+    return build_project_archive(db, client_session.project, spec)
@@ -1,5 +1,6 @@
 """Service layer for Photo operations"""
 
+import asyncio
 from typing import Optional
 from uuid import UUID
 
@@ -14,21 +15,29 @@ from app.models.photo_version import PhotoVersion, VersionType
 from app.models.user import User
 from app.schemas.common import PaginationSortSearchSchema
 from app.schemas.photo import (
+    BulkEditedUploadResponse,
+    EditedUploadResult,
     PhotoCommentResponse,
     PhotoCreate,
     PhotoDetailResponse,
     PhotoMetaResponse,
 )
-from app.utils.image_utils import convert_to_webp, resize_image
-from app.utils.logging import logger
-from app.utils.minio import (
-    delete_file_from_minio,
-    download_file_from_minio,
-    upload_bytes_to_minio,
+from app.services.object_store_service import (
+    build_public_url,
+    object_name_for_hash,
+    release_content,
+    resolve_object_names,
+    store_content,
 )
+from app.services.rendition_cache_service import get_rendition, put_rendition, rendition_key
+from app.utils import storage
+from app.utils.circuit_breaker import CircuitOpenError
+from app.utils.disk_cache import iter_file
+from app.utils.image_utils import convert_to_webp, is_jpeg_header, resize_image, sniff_jpeg_dimensions
+from app.utils.logging import logger
 
 # Constants
-MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
+MAX_FILE_SIZE = settings.UPLOAD_MAX_FILE_SIZE  # 10 MB
 ALLOWED_MIME_TYPES = {"image/jpeg"}
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg"}
 
@@ -39,6 +48,8 @@ async def _download_and_process_photo_image(
     width: Optional[int] = None,
     height: Optional[int] = None,
     is_thumbnail: bool = False,
+    photo_version: Optional[PhotoVersion] = None,
+    shard: Optional[str] = None,
 ) -> Optional[dict]:
     """
     Download and process photo image from MinIO with optional resizing and WebP conversion.
@@ -49,9 +60,11 @@ async def _download_and_process_photo_image(
         width: Optional width for resizing
         height: Optional height for resizing (maintains aspect ratio)
         is_thumbnail: Flag to indicate if this is a thumbnail request (returns WebP format)
+        photo_version: PhotoVersion row, used to resolve content-addressed keys
+        shard: Storage shard of the photo's project (None for the default shard)
 
     Returns:
-        Dict with stream, content_type, filename or None if not found
+        Dict with stream (or path of a local file), content_type, filename or None if not found
     """
     from io import BytesIO
 
@@ -62,40 +75,64 @@ async def _download_and_process_photo_image(
             if not is_thumbnail
             else f"{photo.filename.rsplit('.', 1)[0]}.webp"
         )
-        minio_path = f"{photo.project_id}/{version.value}/{photo_filename}"
-        file_bytes = download_file_from_minio(
-            bucket_name=settings.MINIO_BUCKET_NAME,
-            object_name=minio_path,
+        source_path, webp_path = resolve_object_names(
+            photo.project_id, photo.filename, version, photo_version
         )
+        minio_path = webp_path if is_thumbnail else source_path
+        content_type = "image/webp" if is_thumbnail else "image/jpeg"
+
+        # Small renditions (thumbnails, resized previews) are served from memory or Redis;
+        # full-size originals never fit those caches, so they skip the lookup
+        cache_key = rendition_key(minio_path, photo_version, width, height) if is_thumbnail or width or height else None
+        cached_rendition = await get_rendition(cache_key) if cache_key else None
+        if cached_rendition is not None:
+            return {
+                "stream": iter((cached_rendition,)),
+                "content_type": content_type,
+                "filename": photo_filename,
+            }
+
+        # Unresized reads are served from a local file (filesystem backend) or the disk cache
+        if not width and not height:
+            file_path = await storage.local_path(minio_path, shard=shard)
+            if file_path:
+                return {
+                    "path": file_path,
+                    "content_type": content_type,
+                    "filename": photo_filename,
+                }
+
+            cached_file = await storage.open_cached(minio_path, shard=shard)
+            if cached_file:
+                return {
+                    "stream": iter_file(cached_file),
+                    "content_type": content_type,
+                    "filename": photo_filename,
+                }
+
+        # Thumbnails sit on the page-load critical path: hedge slow reads
+        download = storage.download_object_hedged if is_thumbnail else storage.download_object
+        file_bytes = await download(minio_path, shard=shard)
 
         if not file_bytes:
             if is_thumbnail:
                 # Fallback to original JPEG if WebP thumbnail not found
-                minio_path = f"{photo.project_id}/{version.value}/{photo.filename}"
-                file_bytes = download_file_from_minio(
-                    bucket_name=settings.MINIO_BUCKET_NAME,
-                    object_name=minio_path,
-                )
+                file_bytes = await storage.download_object(source_path, shard=shard)
                 if not file_bytes:
                     return None
-                file_bytes = convert_to_webp(
-                    file_bytes, quality=85
-                )  # Convert to WebP on-the-fly
+                file_bytes = await asyncio.to_thread(
+                    convert_to_webp, file_bytes, 85
+                )  # Convert to WebP on-the-fly, off the event loop
                 # upload webp to minio for future requests
-                webp_path = f"{photo.project_id}/{version.value}/{photo.filename.rsplit('.', 1)[0]}.webp"
-                upload_bytes_to_minio(
-                    file_bytes=file_bytes,
-                    bucket_name=settings.MINIO_BUCKET_NAME,
-                    object_name=webp_path,
-                    content_type="image/webp",
-                )
+                await storage.upload_object(webp_path, file_bytes, content_type="image/webp", shard=shard)
             else:
                 return None
 
-        # Resize if parameters provided
-        file_bytes = resize_image(file_bytes, width, height, photo.id)
-
-        content_type = "image/webp" if is_thumbnail else "image/jpeg"
+        # Resize if parameters provided (decoding runs off the event loop)
+        if width or height:
+            file_bytes = await asyncio.to_thread(resize_image, file_bytes, width, height, photo.id)
+        if cache_key:
+            await put_rendition(cache_key, file_bytes)
 
         # Create stream
         stream = BytesIO(file_bytes)
@@ -106,6 +143,9 @@ async def _download_and_process_photo_image(
             "filename": photo_filename,
         }
 
+    except CircuitOpenError:
+        # Storage is failing fast: answer 503 instead of a misleading 404
+        raise
     except Exception as e:
         logger.exception(f"Error retrieving photo image {photo.id}: {e}")
         return None
@@ -147,6 +187,34 @@ def validate_file(file: UploadFile) -> None:
         )
 
 
+async def validate_file_content(file: UploadFile) -> None:
+    """
+    Validate the leading bytes of an uploaded file (the part Content-Type
+    is client-supplied). Used where the upload guard middleware does not
+    inspect file parts, so a bad file is rejected on its own.
+
+    Args:
+        file: UploadFile to validate (rewound afterwards)
+
+    Raises:
+        HTTPException: If the file is not a JPEG or its dimensions are too large
+    """
+    header = await file.read(settings.UPLOAD_SNIFF_BYTES)
+    await file.seek(0)
+    if not is_jpeg_header(header):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=MessageConstants.INVALID_FILE_TYPE,
+        )
+
+    dimensions = sniff_jpeg_dimensions(header)
+    if dimensions and max(dimensions) > settings.UPLOAD_MAX_IMAGE_DIMENSION:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=MessageConstants.IMAGE_DIMENSIONS_TOO_LARGE,
+        )
+
+
 async def upload_photo(
     db: Session,
     user: User,
@@ -203,25 +271,11 @@ async def upload_photo(
         photo = photo_crud.create(db, photo_data)
         db.flush()  # Get the photo.id without committing
 
-        # 5. Upload file to MinIO
+        # 5. Store file content (deduplicated by SHA-256)
         file_bytes = await file.read()
-        minio_path = f"{project_id}/original/{file.filename}"
-        webp_path = f"{project_id}/original/{file.filename.rsplit('.', 1)[0]}.webp"
-
-        success = upload_bytes_to_minio(
-            file_bytes=file_bytes,
-            bucket_name=settings.MINIO_BUCKET_NAME,
-            object_name=minio_path,
-            content_type=file.content_type,
-        )
-        webp_success = upload_bytes_to_minio(
-            file_bytes=convert_to_webp(file_bytes, quality=85),
-            bucket_name=settings.MINIO_BUCKET_NAME,
-            object_name=webp_path,
-            content_type="image/webp",
-        )
+        stored_object = await store_content(db, project, file_bytes, file.content_type)
 
-        if not success or not webp_success:
+        if not stored_object:
             db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -229,13 +283,11 @@ async def upload_photo(
             )
 
         # 6. Create PhotoVersion for original
-        image_url = (
-            f"{settings.MINIO_PUBLIC_URL}/{settings.MINIO_BUCKET_NAME}/{minio_path}"
-        )
         photo_version = PhotoVersion(
             photo_id=photo.id,
             version_type=VersionType.ORIGINAL.value,
-            image_url=image_url,
+            image_url=build_public_url(stored_object.object_name, project.storage_shard),
+            content_hash=stored_object.content_hash,
         )
         db.add(photo_version)
 
@@ -252,6 +304,9 @@ async def upload_photo(
 
     except HTTPException:
         raise
+    except CircuitOpenError:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         logger.exception(f"Error uploading photo to project {project_id}: {e}")
@@ -317,48 +372,35 @@ async def upload_edited_photo(
         )
 
     try:
-        # 5. Upload file to MinIO
+        # 5. Store file content (deduplicated by SHA-256, keys are immutable)
         file_bytes = await file.read()
-        minio_path = f"{project_id}/{VersionType.EDITED.value}/{file.filename}"
-        webp_path = f"{project_id}/{VersionType.EDITED.value}/{file.filename.rsplit('.', 1)[0]}.webp"
-
-        # Delete existing files before uploading
-        delete_file_from_minio(
-            bucket_name=settings.MINIO_BUCKET_NAME,
-            object_name=minio_path,
-        )
-        delete_file_from_minio(
-            bucket_name=settings.MINIO_BUCKET_NAME,
-            object_name=webp_path,
+        existing_version = photo_version_crud.get_by_photo_and_version_type(
+            db, related_photo.id, VersionType.EDITED
         )
+        stored_object = await store_content(db, project, file_bytes, file.content_type)
 
-        success = upload_bytes_to_minio(
-            file_bytes=file_bytes,
-            bucket_name=settings.MINIO_BUCKET_NAME,
-            object_name=minio_path,
-            content_type=file.content_type,
-        )
-        webp_success = upload_bytes_to_minio(
-            file_bytes=convert_to_webp(file_bytes, quality=85),
-            bucket_name=settings.MINIO_BUCKET_NAME,
-            object_name=webp_path,
-            content_type="image/webp",
-        )
-
-        if not success or not webp_success:
+        if not stored_object:
             db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=MessageConstants.MINIO_UPLOAD_ERROR,
             )
 
-        # 6. Create PhotoVersion for original
-        image_url = (
-            f"{settings.MINIO_PUBLIC_URL}/{settings.MINIO_BUCKET_NAME}/{minio_path}"
-        )
-        photo_version = photo_version_crud.create_photo_version(
-            db, related_photo.id, VersionType.EDITED, image_url
-        )
+        # 6. Create or repoint the edited PhotoVersion
+        image_url = build_public_url(stored_object.object_name, project.storage_shard)
+        if existing_version:
+            release_content(db, existing_version.content_hash, project.storage_shard)
+            photo_version = photo_version_crud.update_content(
+                db, existing_version, image_url, stored_object.content_hash
+            )
+        else:
+            photo_version = photo_version_crud.create_photo_version(
+                db,
+                related_photo.id,
+                VersionType.EDITED,
+                image_url,
+                content_hash=stored_object.content_hash,
+            )
         db.flush()  # Get the photo.id without committing
 
         # 7. Commit transaction
@@ -373,6 +415,9 @@ async def upload_edited_photo(
 
     except HTTPException:
         raise
+    except CircuitOpenError:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         logger.exception(f"Error uploading photo to project {project_id}: {e}")
@@ -382,6 +427,130 @@ async def upload_edited_photo(
         )
 
 
+async def upload_edited_photos_bulk(
+    db: Session,
+    user: User,
+    project_id: UUID,
+    files: list[UploadFile],
+) -> BulkEditedUploadResponse:
+    """
+    Upload many edited photos to a project.
+
+    The project's filenames are loaded once into an in-memory index, so
+    matching a file to its original (exact or <Name>_<postfix> variant)
+    costs no queries. All PhotoVersion rows are written in one batched
+    upsert.
+
+    Args:
+        db: Database session
+        user: Authenticated user (must be project owner)
+        project_id: Project ID
+        files: JPEG files to upload
+
+    Returns:
+        BulkEditedUploadResponse with per-file match results
+
+    Raises:
+        HTTPException: On permission errors or if the batch cannot be saved
+    """
+    # 1. Check project exists and user is owner
+    project = project_crud.get_by_id(db, project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=MessageConstants.PROJECT_NOT_FOUND,
+        )
+
+    if project.owner_id != user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=MessageConstants.PROJECT_PERMISSION_DENIED,
+        )
+
+    # 2. Resolve every file against the preloaded filename index
+    filename_index = photo_crud.get_filename_index(db, project_id)
+    results: list[EditedUploadResult] = []
+    matched: list[tuple[UploadFile, EditedUploadResult]] = []
+    for file in files:
+        result = EditedUploadResult(filename=file.filename or "", status="invalid_file")
+        results.append(result)
+        try:
+            validate_file(file)
+            await validate_file_content(file)
+        except HTTPException:
+            continue
+
+        photo, matched_filename = filename_index.resolve(file.filename)
+        if not photo:
+            result.status = "not_found"
+            continue
+        result.photo_id = photo.id
+        result.matched_filename = matched_filename
+        if not photo.is_selected:
+            result.status = "not_selected"
+            continue
+        matched.append((file, result))
+
+    # 3. Store contents and collect version rows (last file wins per photo, earlier ones are superseded)
+    existing_versions = photo_version_crud.get_by_photos_and_version_type(
+        db, [result.photo_id for _, result in matched], VersionType.EDITED
+    )
+    pending: dict[UUID, EditedUploadResult] = {}
+    try:
+        for file, result in matched:
+            file_bytes = await file.read()
+            stored_object = await store_content(db, project, file_bytes, file.content_type)
+            if not stored_object:
+                result.status = "upload_failed"
+                continue
+
+            result.status = "uploaded"
+            result.content_hash = stored_object.content_hash
+            previous = pending.get(result.photo_id)
+            if previous:
+                release_content(db, previous.content_hash, project.storage_shard)
+                previous.status = "superseded"
+            pending[result.photo_id] = result
+
+        for photo_id in pending:
+            existing_version = existing_versions.get(photo_id)
+            if existing_version:
+                release_content(db, existing_version.content_hash, project.storage_shard)
+
+        # 4. Create or repoint all edited PhotoVersions in one statement
+        photo_version_crud.bulk_upsert_photo_versions(
+            db,
+            VersionType.EDITED,
+            [
+                {
+                    "photo_id": photo_id,
+                    "image_url": build_public_url(object_name_for_hash(result.content_hash), project.storage_shard),
+                    "content_hash": result.content_hash,
+                }
+                for photo_id, result in pending.items()
+            ],
+        )
+        db.commit()
+    except CircuitOpenError:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        logger.exception(f"Error bulk uploading edited photos to project {project_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=MessageConstants.MINIO_UPLOAD_ERROR,
+        )
+
+    uploaded = sum(1 for result in results if result.status == "uploaded")
+    superseded = sum(1 for result in results if result.status == "superseded")
+    return BulkEditedUploadResponse(
+        uploaded=uploaded,
+        failed=len(results) - uploaded - superseded,
+        results=results,
+    )
+
+
 def get_photo_by_id(
     db: Session,
     user: User,
@@ -547,6 +716,8 @@ async def get_photo_image(
         width=width,
         height=height,
         is_thumbnail=is_thumbnail,
+        photo_version=photo_version,
+        shard=project.storage_shard,
     )
 
 
@@ -0,0 +1,90 @@
+"""Service layer for delta sync of photographer desktop clients"""
+
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.constant.messages import MessageConstants
+from app.crud import photo_crud, project_crud
+from app.models.user import User
+from app.schemas.photo_sync import (
+    PhotoSyncChanged,
+    PhotoSyncRequest,
+    PhotoSyncResponse,
+    PhotoSyncVariant,
+)
+from app.utils.storage_shards import get_shard
+
+
+def sync_project_photos(
+    db: Session,
+    user: User,
+    project_id: UUID,
+    sync_request: PhotoSyncRequest,
+) -> PhotoSyncResponse:
+    """
+    Diff a client's file list against a project.
+
+    Every entry is classified as missing (upload as original), changed
+    (same filename, different content), variant (upload as edited version)
+    or unchanged. Photos stored before content hashing can only be matched
+    by filename and are reported as unverified.
+
+    Args:
+        db: Database session
+        user: Authenticated user (must be project owner)
+        project_id: Project ID
+        sync_request: Client file entries (filename, size, sha256)
+
+    Returns:
+        PhotoSyncResponse with the per-category file lists
+
+    Raises:
+        HTTPException: If project not found or user is not the owner
+    """
+    project = project_crud.get_by_id(db, project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=MessageConstants.PROJECT_NOT_FOUND,
+        )
+
+    if project.owner_id != user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=MessageConstants.PROJECT_PERMISSION_DENIED,
+        )
+
+    entries = sync_request.files
+    filenames = [entry.filename for entry in entries]
+    base_filenames = [photo_crud.variant_base_filename(filename) for filename in filenames]
+    rows = photo_crud.diff_against_project(db, project_id, filenames, base_filenames, get_shard(project.storage_shard).name)
+
+    response = PhotoSyncResponse(project_id=project_id)
+    for entry, base_filename, row in zip(entries, base_filenames, rows, strict=True):
+        content_hash = entry.sha256.lower()
+
+        if row.photo_id:
+            if row.original_hash is None and row.edited_hash is None:
+                response.unverified.append(entry.filename)
+            elif content_hash == row.edited_hash or (content_hash == row.original_hash and row.original_size in (None, entry.size)):
+                response.unchanged += 1
+            else:
+                response.changed.append(PhotoSyncChanged(filename=entry.filename, photo_id=row.photo_id))
+        elif row.base_photo_id:
+            if content_hash == row.edited_hash:
+                response.unchanged += 1
+            else:
+                response.variants.append(
+                    PhotoSyncVariant(
+                        filename=entry.filename,
+                        photo_id=row.base_photo_id,
+                        base_filename=base_filename,
+                        is_selected=row.base_is_selected,
+                    )
+                )
+        else:
+            response.missing.append(entry.filename)
+
+    return response
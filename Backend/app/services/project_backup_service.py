@@ -0,0 +1,715 @@
+"""
+Project backup service - self-describing project archives for moving
+projects between environments or storage shards.
+
+A backup is a ZIP written in one streaming pass:
+
+    project.ndjson                   the project row
+    photos/000001.ndjson             rows of each table, PROJECT_BACKUP_BATCH_SIZE per part,
+    photo_versions/000001.ndjson     in foreign key order (versions carry the size and
+    photo_comments/000001.ndjson     content type of their stored object)
+    client_sessions/000001.ndjson
+    objects/<object name>            content-addressed objects, WebP derivatives and legacy
+                                     {project_id}/ objects, under their storage keys
+    manifest.json                    format, source shard and URL, parts with row counts
+                                     (written last, readers find it in the central directory)
+
+Restoring keeps every ID, so a backup restores into the same project
+wherever it goes. Each NDJSON part is inserted in one transaction with
+conflicting rows skipped, and committed parts are checkpointed in Redis:
+an interrupted restore resumes after the last committed part, and
+objects already present on the target shard are not written again.
+"""
+
+import asyncio
+import json
+import mimetypes
+import re
+import tempfile
+from collections import Counter
+from itertools import islice
+from typing import AsyncIterator, Callable, Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID, uuid4
+from zipfile import BadZipFile, ZipFile, ZipInfo
+
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.constant.messages import MessageConstants
+from app.crud import project_backup_crud, stored_object_crud
+from app.models.client_session import ClientSession
+from app.models.photo import Photo
+from app.models.photo_comment import PhotoComment
+from app.models.photo_version import PhotoVersion
+from app.models.project import Project
+from app.models.user import User
+from app.schemas.project import ProjectBackupJobResponse
+from app.services.object_store_service import (
+    IMMUTABLE_CACHE_CONTROL,
+    compute_content_hash,
+    object_name_for_hash,
+    public_base_url,
+    webp_object_name_for_hash,
+)
+from app.services.photo_archive_service import ACTIVE_JOB_STATUSES, _get_owned_project, _open_archive, _record_job
+from app.utils import common_utils, storage
+from app.utils.logging import logger
+from app.utils.prefetch import prefetch_ordered
+from app.utils.redis import get_async_redis_client
+from app.utils.storage_backend import StorageBackend, get_storage_backend
+from app.utils.storage_shards import get_shard, shard_for_project
+from app.utils.zip_stream import ZipStreamWriter
+
+# Finished backups live at backups/{project_id}/{job_id}.zip on the project's shard,
+# uploads waiting to be restored at backups/restore/{job_id}.zip on the default shard
+BACKUP_PREFIX = "backups/"
+RESTORE_UPLOAD_PREFIX = f"{BACKUP_PREFIX}restore/"
+# Job state follows the task progress convention (replayed to reconnecting clients)
+BACKUP_JOB_KEY = "task_progress:{job_id}:{user_id}"
+# Resume point of a restore: number of NDJSON parts committed
+RESTORE_STATE_KEY = "project_restore:{job_id}"
+
+BACKUP_FORMAT = "project-backup"
+BACKUP_FORMAT_VERSION = 1
+MANIFEST_ENTRY = "manifest.json"
+PROJECT_ENTRY = "project.ndjson"
+OBJECTS_DIR = "objects/"
+
+# Tables written after the project row, in foreign key order
+BACKUP_TABLES = {
+    "photos": Photo,
+    "photo_versions": PhotoVersion,
+    "photo_comments": PhotoComment,
+    "client_sessions": ClientSession,
+}
+
+_CONTENT_OBJECT_PATTERN = re.compile(r"^objects/[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})(\.webp)?$")
+
+
+class BackupRestoreError(Exception):
+    """The backup cannot be restored (not a backup, or the project belongs to someone else)"""
+
+
+def backup_object_name(project_id: UUID, job_id: str) -> str:
+    """Object key of a finished project backup"""
+    return f"{BACKUP_PREFIX}{project_id}/{job_id}.zip"
+
+
+def restore_upload_object_name(job_id: str) -> str:
+    """Object key of an uploaded backup waiting to be restored"""
+    return f"{RESTORE_UPLOAD_PREFIX}{job_id}.zip"
+
+
+def backup_download_url(project_id: UUID, job_id: str) -> str:
+    """API path serving a finished backup"""
+    return f"{settings.API_V1_STR}/projects/{project_id}/backup/{job_id}/download"
+
+
+def remove_project_backups(
+    backend: StorageBackend,
+    project_id,
+    keep: Optional[str] = None,
+    modified_before=None,
+) -> int:
+    """
+    Delete backups of a project from a shard.
+
+    Args:
+        backend: Backend of the shard holding the backups
+        project_id: Project ID
+        keep: Object name to keep (the backup just written)
+        modified_before: Only delete backups last written before this time
+
+    Returns:
+        Number of backups deleted
+    """
+    object_names = [
+        info.object_name
+        for info in backend.list_objects(backend.bucket_name, prefix=f"{BACKUP_PREFIX}{project_id}/")
+        if info.object_name != keep
+        and (modified_before is None or info.last_modified is None or info.last_modified < modified_before)
+    ]
+    if not object_names:
+        return 0
+    errors = backend.remove_objects(backend.bucket_name, object_names)
+    return len(object_names) - len(errors)
+
+
+def _batched(records: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    iterator = iter(records)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _ndjson(records: Iterable[dict]) -> bytes:
+    return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode("utf-8")
+
+
+def _version_record(version: PhotoVersion, size: Optional[int], content_type: Optional[str]) -> dict:
+    """Version row plus the stored object metadata the target shard needs to take references"""
+    record = version.model_dump(mode="json")
+    record["stored_object"] = {"size": size, "content_type": content_type} if size is not None else None
+    return record
+
+
+async def stream_project_backup(
+    db: Session,
+    project: Project,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    on_missing: Optional[Callable[[str], None]] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Stream a project backup as ZIP chunks.
+
+    Rows are read through server-side cursors and written in parts, and
+    objects are downloaded PROJECT_BACKUP_OBJECT_CONCURRENCY ahead of the
+    writer within ARCHIVE_PREFETCH_MAX_BYTES, so memory stays constant
+    whatever the project size.
+
+    Args:
+        db: Database session (kept for the whole stream)
+        project: Project to back up
+        on_progress: Called with (rows and objects written, expected total)
+        on_missing: Called with the name of each object that could not be
+            read (also listed in the manifest), the backup is then partial
+    """
+    shard = get_shard(project.storage_shard).name
+    batch_size = settings.PROJECT_BACKUP_BATCH_SIZE
+    writer = ZipStreamWriter()
+    manifest = {
+        "format": BACKUP_FORMAT,
+        "format_version": BACKUP_FORMAT_VERSION,
+        "exported_at": common_utils.get_utc_now().isoformat(),
+        "project_id": str(project.id),
+        "source_shard": shard,
+        "source_base_url": public_base_url(shard),
+        "entries": [],
+        "objects": 0,
+        "missing_objects": 0,
+        "missing_object_names": [],
+    }
+
+    row_counts = {table: project_backup_crud.count_project_rows(db, model, project.id) for table, model in BACKUP_TABLES.items()}
+    # Each version has an object and its WebP derivative (shared content makes this an upper bound)
+    total = sum(row_counts.values()) + 2 * row_counts["photo_versions"]
+    written = 0
+
+    def report(count: int) -> None:
+        nonlocal written
+        written += count
+        if on_progress:
+            on_progress(written, total)
+
+    for chunk in writer.write_entry(PROJECT_ENTRY, _ndjson([project.model_dump(mode="json")]), compress=True):
+        yield chunk
+
+    # 1. Table rows, one NDJSON part per batch
+    for table, model in BACKUP_TABLES.items():
+        if model is PhotoVersion:
+            records = (
+                _version_record(version, size, content_type)
+                for version, size, content_type in project_backup_crud.stream_project_versions(db, project.id, shard, batch_size)
+            )
+        else:
+            records = (row.model_dump(mode="json") for row in project_backup_crud.stream_project_rows(db, model, project.id, batch_size))
+
+        for part, batch in enumerate(_batched(records, batch_size), start=1):
+            entry_name = f"{table}/{part:06d}.ndjson"
+            for chunk in writer.write_entry(entry_name, _ndjson(batch), compress=True):
+                yield chunk
+            manifest["entries"].append({"name": entry_name, "table": table, "rows": len(batch)})
+            report(len(batch))
+
+    # 2. Objects, downloaded ahead of the writer
+    def object_names() -> Iterator[str]:
+        for content_hash in project_backup_crud.stream_project_content_hashes(db, project.id, batch_size):
+            yield object_name_for_hash(content_hash)
+            yield webp_object_name_for_hash(content_hash)
+        # Legacy objects are keyed by project
+        backend = get_storage_backend(shard)
+        for info in backend.list_objects(backend.bucket_name, prefix=f"{project.id}/"):
+            yield info.object_name
+
+    async def fetch(object_name: str) -> Optional[bytes]:
+        # Ranged read from offset 0 bypasses the read cache, a backup must not flush it
+        return await storage.download_object_range(object_name, 0, shard=shard)
+
+    prefetched = prefetch_ordered(
+        object_names(),
+        fetch,
+        concurrency=settings.PROJECT_BACKUP_OBJECT_CONCURRENCY,
+        max_bytes=settings.ARCHIVE_PREFETCH_MAX_BYTES,
+        default_size=settings.UPLOAD_MAX_FILE_SIZE,
+    )
+    async for object_name, file_bytes in prefetched:
+        if file_bytes is None:
+            logger.warning(f"Object {object_name} of project {project.id} missing on shard {shard}, not backed up")
+            manifest["missing_objects"] += 1
+            manifest["missing_object_names"].append(object_name)
+            if on_missing:
+                on_missing(object_name)
+            continue
+        # Images are already compressed
+        for chunk in writer.write_entry(f"{OBJECTS_DIR}{object_name}", file_bytes, compress=False):
+            yield chunk
+        manifest["objects"] += 1
+        report(1)
+
+    for chunk in writer.write_entry(MANIFEST_ENTRY, json.dumps(manifest, indent=2).encode("utf-8"), compress=True):
+        yield chunk
+    yield writer.close()
+
+
+def read_backup_manifest(zip_file: ZipFile) -> dict:
+    """
+    Read and check the manifest of a backup.
+
+    Raises:
+        BackupRestoreError: If the archive is not a backup this version can restore
+    """
+    try:
+        manifest = json.loads(zip_file.read(MANIFEST_ENTRY))
+        UUID(manifest["project_id"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise BackupRestoreError(f"Not a project backup: {e}")
+    if manifest.get("format") != BACKUP_FORMAT or manifest.get("format_version") != BACKUP_FORMAT_VERSION:
+        raise BackupRestoreError(f"Unsupported backup format {manifest.get('format')} v{manifest.get('format_version')}")
+    return manifest
+
+
+def _read_ndjson(zip_file: ZipFile, entry_name: str) -> List[dict]:
+    with zip_file.open(entry_name) as entry:
+        return [json.loads(line) for line in entry if line.strip()]
+
+
+def _to_row(model, record: dict) -> dict:
+    """Validate an exported record and convert it back to column values"""
+    return model.model_validate(record).model_dump()
+
+
+def _restore_project_row(db: Session, zip_file: ZipFile, project_id: UUID, owner_id: UUID) -> Project:
+    """
+    Insert the project row for the restoring user, placed by the current shard ring.
+
+    Raises:
+        BackupRestoreError: If the project exists and belongs to another user
+    """
+    project = db.get(Project, project_id)
+    if project is None:
+        record = _read_ndjson(zip_file, PROJECT_ENTRY)[0]
+        record.update(owner_id=str(owner_id), storage_shard=shard_for_project(project_id))
+        project_backup_crud.insert_ignore_existing(db, Project, [_to_row(Project, record)])
+        db.commit()
+        project = db.get(Project, project_id)
+    if project.owner_id != owner_id:
+        raise BackupRestoreError(f"Project {project_id} already exists and belongs to another user")
+    return project
+
+
+def _restore_rows(db: Session, project_id: UUID, model, records: List[dict], shard: str, base_urls: Tuple[str, str]) -> None:
+    """
+    Insert one NDJSON part (caller commits).
+
+    Rows are pinned to the project: photo and session rows take its ID,
+    and version and comment rows must reference one of its photos.
+
+    Raises:
+        BackupRestoreError: If a row references a photo of another project
+    """
+    if model in (Photo, ClientSession):
+        for record in records:
+            record["project_id"] = str(project_id)
+        project_backup_crud.insert_ignore_existing(db, model, [_to_row(model, record) for record in records])
+        return
+
+    photo_ids = {UUID(record["photo_id"]) for record in records}
+    if project_backup_crud.get_project_photo_ids(db, project_id, photo_ids) != photo_ids:
+        raise BackupRestoreError(f"Backup rows reference photos outside project {project_id}")
+    if model is PhotoComment:
+        project_backup_crud.insert_ignore_existing(db, model, [_to_row(model, record) for record in records])
+        return
+
+    # Versions: rebase image URLs onto the target shard and take references for inserted rows only
+    old_base, new_base = base_urls
+    stored_objects = {}
+    rows = []
+    for record in records:
+        stored_object = record.pop("stored_object", None)
+        if record["image_url"].startswith(old_base):
+            record["image_url"] = new_base + record["image_url"][len(old_base):]
+        if record.get("content_hash") and stored_object:
+            stored_objects[record["content_hash"]] = stored_object
+        rows.append(_to_row(PhotoVersion, record))
+
+    inserted_hashes = project_backup_crud.insert_versions_ignore_existing(db, rows)
+    for content_hash, ref_total in Counter(inserted_hashes).items():
+        stored_object = stored_objects.get(content_hash)
+        if stored_object is None:
+            logger.warning(f"Backup has no stored object metadata for {content_hash}, reference not taken")
+            continue
+        stored_object_crud.add_refs(
+            db,
+            content_hash,
+            object_name_for_hash(content_hash),
+            stored_object["size"],
+            stored_object["content_type"],
+            ref_total,
+            shard,
+        )
+
+
+def _object_write_options(db: Session, project_id: UUID, shard: str, object_name: str) -> Optional[dict]:
+    """
+    How to write an object from a backup, None if it does not belong to the project.
+
+    Content-addressed objects are checked against their hash and keep
+    the content type of their stored object; legacy objects must live
+    under the project's prefix.
+    """
+    match = _CONTENT_OBJECT_PATTERN.match(object_name)
+    if match:
+        content_hash, is_webp = match.groups()
+        if is_webp:
+            return {"content_type": "image/webp", "cache_control": IMMUTABLE_CACHE_CONTROL, "content_hash": None}
+        stored_object = stored_object_crud.get_by_hash(db, content_hash, shard)
+        return {
+            "content_type": stored_object.content_type if stored_object else None,
+            "cache_control": IMMUTABLE_CACHE_CONTROL,
+            "content_hash": content_hash,
+        }
+    if object_name.startswith(f"{project_id}/") and ".." not in object_name.split("/"):
+        return {"content_type": mimetypes.guess_type(object_name)[0], "cache_control": None, "content_hash": None}
+    return None
+
+
+async def _restore_objects(
+    db: Session,
+    zip_file: ZipFile,
+    project_id: UUID,
+    shard: str,
+    on_progress: Callable[[int], None],
+) -> Counter:
+    """Write the backup's objects missing on the target shard, PROJECT_BACKUP_OBJECT_CONCURRENCY at a time"""
+    counts = Counter()
+    pending = set()
+
+    async def restore(info: ZipInfo, object_name: str, options: dict) -> None:
+        if await storage.object_exists(object_name, shard=shard):
+            counts["existing"] += 1
+            return
+        # ZipFile serializes member reads on the shared file
+        file_bytes = await asyncio.to_thread(zip_file.read, info)
+        if options["content_hash"] and compute_content_hash(file_bytes) != options["content_hash"]:
+            logger.warning(f"Backup object {object_name} does not match its content hash, skipped")
+            counts["rejected"] += 1
+            return
+        success = await storage.upload_object(
+            object_name,
+            file_bytes,
+            content_type=options["content_type"],
+            cache_control=options["cache_control"],
+            shard=shard,
+        )
+        if not success:
+            raise OSError(f"Failed to restore object {object_name} to shard {shard}")
+        counts["written"] += 1
+
+    try:
+        processed = 0
+        for info in zip_file.infolist():
+            if not info.filename.startswith(OBJECTS_DIR) or info.is_dir():
+                continue
+            object_name = info.filename[len(OBJECTS_DIR):]
+            options = _object_write_options(db, project_id, shard, object_name)
+            if options is None:
+                logger.warning(f"Backup object {object_name} is outside project {project_id}, skipped")
+                counts["rejected"] += 1
+                continue
+
+            if len(pending) >= settings.PROJECT_BACKUP_OBJECT_CONCURRENCY:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()
+            pending.add(asyncio.ensure_future(restore(info, object_name, options)))
+            processed += 1
+            on_progress(processed)
+
+        if pending:
+            await asyncio.gather(*pending)
+            pending = set()
+    finally:
+        for task in pending:
+            task.cancel()
+    return counts
+
+
+def restore_project_backup(
+    db: Session,
+    zip_file: ZipFile,
+    owner_id: UUID,
+    entries_done: int = 0,
+    on_checkpoint: Optional[Callable[[int], None]] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> dict:
+    """
+    Restore a project from a backup for the given owner.
+
+    Every ID is kept: restoring the same backup again, or resuming an
+    interrupted restore, skips rows that already exist. References on
+    stored objects are taken only for versions actually inserted, in the
+    same transaction, so reference counts stay exact across resumes.
+
+    Args:
+        db: Database session (committed per NDJSON part)
+        zip_file: Backup opened for reading (any seekable source)
+        owner_id: User the restored project belongs to
+        entries_done: NDJSON parts committed by an earlier attempt
+        on_checkpoint: Called with the number of parts committed after each commit
+        on_progress: Called with (rows and objects processed, total)
+
+    Returns:
+        Dict with the project ID, target shard and row/object counts
+
+    Raises:
+        BackupRestoreError: If the archive is not a backup or the project belongs to another user
+    """
+    manifest = read_backup_manifest(zip_file)
+    project_id = UUID(manifest["project_id"])
+    project = _restore_project_row(db, zip_file, project_id, owner_id)
+    shard = get_shard(project.storage_shard).name
+    base_urls = (manifest["source_base_url"], public_base_url(shard))
+
+    entries = manifest["entries"]
+    total = sum(entry["rows"] for entry in entries) + manifest["objects"]
+    processed = sum(entry["rows"] for entry in entries[:entries_done])
+
+    def report(count: int) -> None:
+        if on_progress:
+            on_progress(count, total)
+
+    # 1. Rows, one transaction per part
+    for index, entry in enumerate(entries[entries_done:], start=entries_done + 1):
+        model = BACKUP_TABLES.get(entry["table"])
+        if model is None:
+            raise BackupRestoreError(f"Unknown backup table {entry['table']}")
+        _restore_rows(db, project_id, model, _read_ndjson(zip_file, entry["name"]), shard, base_urls)
+        db.commit()
+        if on_checkpoint:
+            on_checkpoint(index)
+        processed += entry["rows"]
+        report(processed)
+
+    # 2. Objects (the target shard is the checkpoint: existing objects are skipped)
+    rows_processed = processed
+    counts = asyncio.run(_restore_objects(db, zip_file, project_id, shard, lambda count: report(rows_processed + count)))
+    db.rollback()  # End the read transaction of the content type lookups
+
+    logger.info(
+        f"Restored project {project_id} on shard {shard}: {len(entries)} parts, "
+        f"{counts['written']} objects written, {counts['existing']} existing, {counts['rejected']} rejected"
+    )
+    return {
+        "project_id": str(project_id),
+        "shard": shard,
+        "parts": len(entries),
+        "objects_written": counts["written"],
+        "objects_existing": counts["existing"],
+        "objects_rejected": counts["rejected"],
+    }
+
+
+def _job_response(job_id: str, state: dict) -> ProjectBackupJobResponse:
+    job_status = state.get("status", "pending")
+    project_id = UUID(state["project_id"]) if state.get("project_id") else None
+    is_backup = state.get("kind") == "backup"
+    return ProjectBackupJobResponse(
+        job_id=job_id,
+        status=job_status,
+        progress=int(state.get("progress", 0)),
+        project_id=project_id,
+        size=int(state["size"]) if state.get("size") else None,
+        missing_objects=int(state["missing_objects"]) if state.get("missing_objects") else None,
+        error=state.get("error") or None,
+        download_url=backup_download_url(project_id, job_id) if is_backup and job_status in ("completed", "partial") else None,
+    )
+
+
+async def start_project_backup_job(db: Session, user: User, project_id: UUID) -> ProjectBackupJobResponse:
+    """
+    Start writing a project backup in the background.
+
+    Args:
+        db: Database session
+        user: Authenticated user
+        project_id: Project ID
+
+    Returns:
+        ProjectBackupJobResponse: Job state
+
+    Raises:
+        HTTPException: If the project is not accessible or the job cannot be queued
+    """
+    from app.jobs.backup_tasks import backup_project
+
+    _get_owned_project(db, user, project_id)
+    job_id = uuid4().hex
+    client = await get_async_redis_client()
+    state = await _record_job(client, user.id, job_id, "pending", 0, kind="backup", project_id=project_id)
+    try:
+        backup_project.delay(str(project_id), str(user.id), job_id)
+    except Exception as e:
+        logger.exception(f"Failed to schedule backup job for project {project_id}: {e}")
+        await client.delete(BACKUP_JOB_KEY.format(job_id=job_id, user_id=user.id))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=MessageConstants.PROJECT_BACKUP_JOB_UNAVAILABLE,
+        )
+    return _job_response(job_id, state)
+
+
+async def _get_job_state(user: User, job_id: str, kind: str) -> dict:
+    """
+    Job state hash of one of the user's backup or restore jobs.
+
+    Raises:
+        HTTPException: If the job is unknown (or expired)
+    """
+    client = await get_async_redis_client()
+    state = await client.hgetall(BACKUP_JOB_KEY.format(job_id=job_id, user_id=user.id))
+    if state.get("kind") != kind:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=MessageConstants.PROJECT_BACKUP_NOT_FOUND,
+        )
+    return state
+
+
+async def get_project_backup_job(db: Session, user: User, project_id: UUID, job_id: str) -> ProjectBackupJobResponse:
+    """
+    Get the state of a backup job.
+
+    Raises:
+        HTTPException: If the project is not accessible or the job is unknown
+    """
+    _get_owned_project(db, user, project_id)
+    state = await _get_job_state(user, job_id, "backup")
+    if state.get("project_id") != str(project_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=MessageConstants.PROJECT_BACKUP_NOT_FOUND,
+        )
+    return _job_response(job_id, state)
+
+
+async def open_project_backup(
+    db: Session,
+    user: User,
+    project_id: UUID,
+    job_id: str,
+    range_header: Optional[str] = None,
+) -> dict:
+    """
+    Open a finished backup for download, honouring a single byte range.
+
+    Returns:
+        Dict with filename, and either path or stream, size and range (see open_photo_archive)
+
+    Raises:
+        HTTPException: If the backup is missing, not finished yet or the range is unsatisfiable
+    """
+    project = _get_owned_project(db, user, project_id)
+    object_name = backup_object_name(project_id, job_id)
+    filename = f"{project.title.replace(' ', '_')}_backup.zip"
+
+    info = await storage.stat_object(object_name, shard=project.storage_shard)
+    if info is None:
+        client = await get_async_redis_client()
+        state = await client.hgetall(BACKUP_JOB_KEY.format(job_id=job_id, user_id=user.id))
+        if state.get("status") in ACTIVE_JOB_STATUSES:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=MessageConstants.PROJECT_BACKUP_NOT_READY,
+            )
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=MessageConstants.PROJECT_BACKUP_NOT_FOUND,
+        )
+
+    return {**await _open_archive(object_name, project.storage_shard, info.size, range_header), "filename": filename}
+
+
+async def start_project_restore_job(db: Session, user: User, backup_file: UploadFile) -> ProjectBackupJobResponse:
+    """
+    Stage an uploaded backup and restore it in the background.
+
+    The upload is copied to a temporary file in chunks, checked (manifest,
+    ownership of an existing project with the same ID) and uploaded to
+    the default shard, where the restore job reads it with ranged reads.
+
+    Args:
+        db: Database session
+        user: Authenticated user, owner of the restored project
+        backup_file: Backup ZIP written by a backup job
+
+    Returns:
+        ProjectBackupJobResponse: Job state
+
+    Raises:
+        HTTPException: If the file is not a backup, the project belongs to
+            another user, or the job cannot be queued
+    """
+    from app.jobs.backup_tasks import restore_project
+
+    job_id = uuid4().hex
+    object_name = restore_upload_object_name(job_id)
+    with tempfile.NamedTemporaryFile(dir=settings.ARCHIVE_TEMP_DIR or None, prefix="restore-", suffix=".zip") as tmp_file:
+        while chunk := await backup_file.read(settings.ARCHIVE_DOWNLOAD_CHUNK_SIZE):
+            tmp_file.write(chunk)
+        tmp_file.flush()
+
+        try:
+            with ZipFile(tmp_file.name) as zip_file:
+                project_id = UUID(read_backup_manifest(zip_file)["project_id"])
+        except (BadZipFile, BackupRestoreError) as e:
+            logger.warning(f"Rejected project backup upload from user {user.id}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=MessageConstants.INVALID_PROJECT_BACKUP,
+            )
+        existing = db.get(Project, project_id)
+        if existing is not None and existing.owner_id != user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=MessageConstants.PROJECT_PERMISSION_DENIED,
+            )
+
+        if not await storage.upload_file(object_name, tmp_file.name, "application/zip"):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=MessageConstants.STORAGE_UNAVAILABLE,
+            )
+
+    client = await get_async_redis_client()
+    state = await _record_job(client, user.id, job_id, "pending", 0, kind="restore", project_id=project_id)
+    try:
+        restore_project.delay(str(user.id), job_id)
+    except Exception as e:
+        logger.exception(f"Failed to schedule restore job {job_id}: {e}")
+        await client.delete(BACKUP_JOB_KEY.format(job_id=job_id, user_id=user.id))
+        await storage.delete_object(object_name)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=MessageConstants.PROJECT_BACKUP_JOB_UNAVAILABLE,
+        )
+    return _job_response(job_id, state)
+
+
+async def get_project_restore_job(user: User, job_id: str) -> ProjectBackupJobResponse:
+    """
+    Get the state of a restore job.
+
+    Raises:
+        HTTPException: If the job is unknown
+    """
+    return _job_response(job_id, await _get_job_state(user, job_id, "restore"))
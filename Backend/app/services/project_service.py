@@ -6,10 +6,11 @@ from uuid import UUID
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.constant.messages import MessageConstants
-from app.crud import project_crud
+from app.crud import photo_version_crud, project_crud, stored_object_crud
 from app.db.manager import DatabaseManager as db_manager
-from app.models.project import ProjectStatus
+from app.models.project import Project, ProjectStatus
 from app.models.user import User
 from app.schemas.common import PaginationSortSearchSchema, create_pagination_meta
 from app.schemas.project import (
@@ -21,6 +22,7 @@ from app.schemas.project import (
     VerifyProjectToken,
 )
 from app.services import client_session_service
+from app.utils.logging import logger
 
 
 def create_project(
@@ -234,9 +236,13 @@ def update_project_status(
             detail=MessageConstants.PROJECT_UPDATE_DENIED,
         )
 
+    previous_status = project.status
     try:
         updated_project = project_crud.update_status(db, project_id, new_status)
         db_manager.commit(db)
+        # The photographer downloads the selection next: have the archive ready by then
+        if new_status == ProjectStatus.PENDING_EDIT and previous_status != ProjectStatus.PENDING_EDIT:
+            _schedule_archive_prebuild(project_id, user.id)
         project_response = ProjectResponse.model_validate(updated_project)
         project_response.owner_info = OwnerInfo.model_validate(updated_project.owner)
         return project_response
@@ -267,7 +273,8 @@ def delete_project(
     Returns:
         bool: True if deleted, False if not found
     """
-    project = project_crud.get_by_id(db, project_id)
+    # Plain lookup: the photo list is not needed and can be large
+    project = db.get(Project, project_id)
 
     if not project:
         return False
@@ -279,14 +286,45 @@ def delete_project(
             detail=MessageConstants.PROJECT_DELETE_DENIED,
         )
 
+    # Legacy per-project objects (two keys per version) are removed by the purge job
+    expected_objects = 2 * photo_version_crud.count_legacy_by_project(db, project_id)
+
     try:
-        result = project_crud.delete(db, project_id)
+        stored_object_crud.release_project_refs(db, [project_id])
+        result = project_crud.delete_tree(db, [project_id]) > 0
         db_manager.commit(db)
-        return result
     except Exception as e:
         db_manager.rollback(db)
         raise e
 
+    if result:
+        _schedule_storage_purge({project_id: project.storage_shard}, user.id, expected_objects)
+    return result
+
+
+def _schedule_archive_prebuild(project_id: UUID, user_id: UUID) -> None:
+    """Enqueue a background build of the selected-photo archive (downloads fall back to building it inline)"""
+    if not settings.ARCHIVE_PREBUILD_ON_PENDING_EDIT:
+        return
+    from app.jobs.archive_tasks import build_photo_archive
+
+    try:
+        build_photo_archive.delay(str(project_id), str(user_id))
+    except Exception as e:
+        logger.exception(f"Failed to schedule archive pre-build for project {project_id}: {e}")
+
+
+def _schedule_storage_purge(project_shards: Dict[UUID, Optional[str]], user_id: UUID, expected_objects: int = 0) -> None:
+    """Enqueue background removal of the storage objects of deleted projects (project ID -> storage shard)"""
+    from app.jobs.storage_tasks import purge_project_storage
+
+    for project_id, shard in project_shards.items():
+        try:
+            purge_project_storage.delay(str(project_id), str(user_id), expected_objects, shard)
+        except Exception as e:
+            # Rows are already gone: log the project so its prefix can be purged later
+            logger.exception(f"Failed to schedule storage purge for project {project_id}: {e}")
+
 
 def soft_delete_project(
     db: Session,
@@ -360,7 +398,7 @@ def get_expired_projects_for_cleanup(
     return [ProjectResponse.model_validate(project).model_copy(update={"owner_info": OwnerInfo.model_validate(project.owner)}) for project in projects]
 
 
-def cleanup_expired_projects(db: Session, user: User) -> int:  # noqa: ARG001
+def cleanup_expired_projects(db: Session, user: User) -> int:
     """
     Delete all expired projects (admin only)
 
@@ -372,19 +410,22 @@ def cleanup_expired_projects(db: Session, user: User) -> int:  # noqa: ARG001
         int: Number of projects deleted
     """
     # TODO: Add admin permission check if needed
-    expired_projects = project_crud.get_expired_projects(db)
-    count = 0
+    expired_project_shards = project_crud.get_expired_project_shards(db)
+    if not expired_project_shards:
+        return 0
+    expired_project_ids = list(expired_project_shards)
 
     try:
-        for project in expired_projects:
-            if project_crud.delete(db, project.id):
-                count += 1
+        stored_object_crud.release_project_refs(db, expired_project_ids)
+        count = project_crud.delete_tree(db, expired_project_ids)
         db_manager.commit(db)
-        return count
     except Exception as e:
         db_manager.rollback(db)
         raise e
 
+    _schedule_storage_purge(expired_project_shards, user.id)
+    return count
+
 
 def create_project_token(
     db: Session,
@@ -0,0 +1,109 @@
+"""Service layer for caching encoded photo renditions (thumbnails, resized images)"""
+
+import time
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.models.photo_version import PhotoVersion
+from app.utils import metrics
+from app.utils.logging import logger
+from app.utils.memory_cache import ByteLRUCache
+from app.utils.redis import get_async_cache_redis_client
+
+# L1: per-process memory, L2: Redis shared by all workers and nodes
+_memory_cache = ByteLRUCache(
+    "memory",
+    max_bytes=settings.RENDITION_MEMORY_CACHE_MAX_BYTES,
+    max_entry_bytes=settings.RENDITION_MEMORY_CACHE_MAX_ENTRY_BYTES,
+)
+
+# After a Redis error the L2 is skipped for a while instead of paying a timeout per request
+REDIS_RETRY_AFTER_SECONDS = 30
+_redis_retry_at = 0.0
+
+
+def _redis_available() -> bool:
+    return time.monotonic() >= _redis_retry_at
+
+
+def _mark_redis_failed(error: Exception) -> None:
+    global _redis_retry_at
+    _redis_retry_at = time.monotonic() + REDIS_RETRY_AFTER_SECONDS
+    logger.warning(f"Rendition cache Redis unavailable, skipping it for {REDIS_RETRY_AFTER_SECONDS}s: {error}")
+
+
+def rendition_key(
+    object_name: str,
+    photo_version: Optional[PhotoVersion],
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+) -> str:
+    """
+    Cache key of one rendition of a stored object.
+
+    The key carries the version token (content hash, or updated_at for
+    legacy keys that are overwritten in place), so replacing a version
+    makes its old renditions unreachable instead of stale.
+    """
+    if photo_version is None:
+        version_token = "-"
+    elif photo_version.content_hash:
+        version_token = photo_version.content_hash
+    else:
+        version_token = photo_version.updated_at.isoformat()
+    return f"rendition:{object_name}:{version_token}:{width or 0}x{height or 0}"
+
+
+async def get_rendition(key: str) -> Optional[bytes]:
+    """Get a cached rendition from memory, then Redis, None on a miss"""
+    renditions = await get_renditions([key])
+    return renditions.get(key)
+
+
+async def get_renditions(keys: List[str]) -> Dict[str, bytes]:
+    """
+    Get several cached renditions, returning only the keys that hit.
+
+    Keys missing from memory are fetched from Redis in a single MGET and
+    promoted into the memory cache.
+    """
+    found: Dict[str, bytes] = {}
+    remote_keys = []
+    for key in keys:
+        value = _memory_cache.get(key)
+        if value is not None:
+            found[key] = value
+        else:
+            remote_keys.append(key)
+
+    if not remote_keys or not _redis_available():
+        return found
+
+    try:
+        client = get_async_cache_redis_client()
+        values = await client.mget(remote_keys)
+    except Exception as e:
+        _mark_redis_failed(e)
+        return found
+
+    for key, value in zip(remote_keys, values, strict=True):
+        if value is None:
+            metrics.increment("storage_cache_misses_total", layer="redis")
+            continue
+        metrics.increment("storage_cache_hits_total", layer="redis")
+        _memory_cache.put(key, value)
+        found[key] = value
+    return found
+
+
+async def put_rendition(key: str, data: bytes) -> None:
+    """Cache a rendition in memory and Redis (each ignores entries above its size limit)"""
+    _memory_cache.put(key, data)
+    if len(data) > settings.RENDITION_REDIS_CACHE_MAX_ENTRY_BYTES or not _redis_available():
+        return
+
+    try:
+        client = get_async_cache_redis_client()
+        await client.set(key, data, ex=settings.RENDITION_REDIS_CACHE_TTL_SECONDS)
+    except Exception as e:
+        _mark_redis_failed(e)
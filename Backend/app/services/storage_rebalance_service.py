@@ -0,0 +1,184 @@
+"""Service layer for moving projects between storage shards"""
+
+import mimetypes
+import shutil
+import tempfile
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud import photo_version_crud, stored_object_crud
+from app.models.project import Project
+from app.services.object_store_service import (
+    IMMUTABLE_CACHE_CONTROL,
+    public_base_url,
+    webp_object_name_for_hash,
+)
+from app.services.project_backup_service import BACKUP_PREFIX
+from app.utils.logging import logger
+from app.utils.object_reader import open_object_reader
+from app.utils.storage_backend import StorageBackend, get_storage_backend
+from app.utils.storage_shards import DEFAULT_SHARD
+
+
+class ShardCopyError(Exception):
+    """An object could not be copied to the target shard"""
+
+
+def _copy_object(
+    source: StorageBackend,
+    target: StorageBackend,
+    object_name: str,
+    content_type: Optional[str] = None,
+    cache_control: Optional[str] = None,
+) -> bool:
+    """Copy one object unless the target already has it; False if the source object is missing"""
+    if target.exists(target.bucket_name, object_name):
+        return True
+    # Ranged read from offset 0 bypasses the read cache, a migration must not flush it
+    file_bytes = source.download_range(source.bucket_name, object_name, 0)
+    if file_bytes is None:
+        return False
+    if not target.upload(target.bucket_name, object_name, file_bytes, content_type, cache_control):
+        raise ShardCopyError(f"Failed to copy {object_name} to shard bucket {target.bucket_name}")
+    return True
+
+
+def _copy_object_via_file(source: StorageBackend, target: StorageBackend, object_name: str, content_type: Optional[str] = None) -> bool:
+    """Copy one large object through a temporary file (backups may not fit in memory); False if the source object is missing"""
+    if target.exists(target.bucket_name, object_name):
+        return True
+    info = source.stat(source.bucket_name, object_name)
+    if info is None:
+        return False
+    with tempfile.NamedTemporaryFile(dir=settings.ARCHIVE_TEMP_DIR or None, prefix="shard-copy-") as tmp_file:
+        with open_object_reader(source, object_name, info.size) as reader:
+            shutil.copyfileobj(reader, tmp_file, settings.ARCHIVE_DOWNLOAD_CHUNK_SIZE)
+        tmp_file.flush()
+        if not target.upload_file(target.bucket_name, object_name, tmp_file.name, content_type):
+            raise ShardCopyError(f"Failed to copy {object_name} to shard bucket {target.bucket_name}")
+    return True
+
+
+def _copy_content(db: Session, source: StorageBackend, target: StorageBackend, source_shard: str, content_hash: str) -> None:
+    """Copy a content-addressed object and its WebP derivative"""
+    stored_object = stored_object_crud.get_by_hash(db, content_hash, source_shard)
+    if stored_object is None:
+        return
+    if not _copy_object(source, target, stored_object.object_name, stored_object.content_type, IMMUTABLE_CACHE_CONTROL):
+        logger.warning(f"Content object {stored_object.object_name} missing on shard {source_shard}, not copied")
+    _copy_object(source, target, webp_object_name_for_hash(content_hash), "image/webp", IMMUTABLE_CACHE_CONTROL)
+
+
+def _move_versions(db: Session, project_id: UUID, source_shard: str, target_shard: str, copied: set) -> int:
+    """
+    Move the references and image URLs of the project's versions still
+    pointing at the source shard.
+
+    References move before the copy is checked: taking the target row
+    waits for a storage GC run collecting the same content on the target
+    shard, so an object GC removed after the bulk copy is copied again.
+
+    Returns:
+        Number of content objects whose references were moved
+    """
+    source = get_storage_backend(source_shard)
+    target = get_storage_backend(target_shard)
+    old_base = public_base_url(source_shard)
+    refs = stored_object_crud.get_project_refs(db, project_id, image_url_prefix=old_base)
+    for row in refs:
+        stored_object_crud.move_refs(db, row.content_hash, row.ref_total, source_shard, target_shard)
+        # Existing copies are only checked (one HEAD per object)
+        _copy_content(db, source, target, source_shard, row.content_hash)
+        copied.add(row.content_hash)
+    if old_base != public_base_url(target_shard):
+        photo_version_crud.rebase_image_urls(db, project_id, old_base, public_base_url(target_shard))
+    return len(refs)
+
+
+def migrate_project(db: Session, project_id: UUID, target_shard: str) -> Optional[dict]:
+    """
+    Move a project's objects to another storage shard.
+
+    1. legacy objects under "{project_id}/" and the project's
+       content-addressed objects are copied while the project keeps
+       serving from its current shard
+    2. with the project row locked, references move to the target shard,
+       image URLs are rebased and Project.storage_shard is switched
+    3. finished backups under "backups/{project_id}/" are copied, since
+       they are served from the project's shard (a backup job still
+       writing to the old shard retries on the new one)
+
+    Uploads hold a share lock on the project row until they commit
+    (store_content), so the switch waits for uploads in flight on the
+    old shard and moves their versions too; later uploads read the new
+    shard once the switch commits.
+
+    Copies on the source shard are not deleted here: content objects are
+    left for storage GC (their references dropped to zero) and the caller
+    purges the legacy prefix and the backups.
+
+    Args:
+        db: Database session (committed by this function)
+        project_id: Project to move
+        target_shard: Destination shard name
+
+    Returns:
+        Dict with the source shard and copy counts, or None if the project is gone or already there
+
+    Raises:
+        ShardCopyError: If an object cannot be written to the target shard
+    """
+    project = db.get(Project, project_id)
+    if project is None:
+        return None
+    source_shard = project.storage_shard or DEFAULT_SHARD
+    if source_shard == target_shard:
+        return None
+
+    source = get_storage_backend(source_shard)
+    target = get_storage_backend(target_shard)
+
+    # 1. Bulk copy, no locks held
+    legacy_copied = 0
+    for info in source.list_objects(source.bucket_name, prefix=f"{project_id}/"):
+        if _copy_object(source, target, info.object_name, mimetypes.guess_type(info.object_name)[0]):
+            legacy_copied += 1
+
+    copied: set = set()
+    for row in stored_object_crud.get_project_refs(db, project_id):
+        _copy_content(db, source, target, source_shard, row.content_hash)
+        copied.add(row.content_hash)
+    db.rollback()  # End the read transaction before taking the lock
+
+    # 2. Switch the project
+    project = db.scalars(select(Project).where(Project.id == project_id).with_for_update()).first()
+    if project is None:
+        db.rollback()
+        return None
+    moved = _move_versions(db, project_id, source_shard, target_shard, copied)
+    project.storage_shard = target_shard
+    db.commit()
+
+    # 3. Backups (cached archives are rebuilt on demand)
+    backups_copied = 0
+    for info in source.list_objects(source.bucket_name, prefix=f"{BACKUP_PREFIX}{project_id}/"):
+        if _copy_object_via_file(source, target, info.object_name, "application/zip"):
+            backups_copied += 1
+
+    logger.info(
+        f"Moved project {project_id} from shard {source_shard} to {target_shard}: "
+        f"{legacy_copied} legacy objects, {len(copied)} content objects, {backups_copied} backups"
+    )
+    return {
+        "project_id": str(project_id),
+        "source_shard": source_shard,
+        "target_shard": target_shard,
+        "legacy_objects": legacy_copied,
+        "content_objects": len(copied),
+        "backups": backups_copied,
+        "moved_objects": moved,
+    }
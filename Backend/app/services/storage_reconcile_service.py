@@ -0,0 +1,166 @@
+"""Service layer for reconciling object storage with database references"""
+
+import heapq
+from datetime import timedelta
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud import photo_version_crud, stored_object_crud
+from app.schemas.storage_reconcile import StorageReconcileReport
+from app.services.object_store_service import CONTENT_PREFIX, IMMUTABLE_CACHE_CONTROL
+from app.services.photo_archive_service import ARCHIVE_PREFIX
+from app.services.project_backup_service import BACKUP_PREFIX
+from app.utils import common_utils
+from app.utils.image_utils import convert_to_webp
+from app.utils.logging import logger
+from app.utils.minio import REMOVE_BATCH_SIZE
+from app.utils.storage_backend import ObjectInfo, StorageBackend, get_storage_backend
+from app.utils.storage_shards import DEFAULT_SHARD
+
+# Keys under these prefixes are owned by other features and never reported
+IGNORED_PREFIXES: Tuple[str, ...] = (ARCHIVE_PREFIX, BACKUP_PREFIX)
+SAMPLE_LIMIT = 100
+PROGRESS_EVERY = 10000
+
+# (object_name, source_object_name): the source is set for WebP derivatives
+ExpectedKey = Tuple[str, Optional[str]]
+
+
+def _stored_object_keys(db: Session, shard: str) -> Iterator[ExpectedKey]:
+    """Content-addressed keys; "X.webp" sorts right after "X" since all hashes have the same length"""
+    for object_name in stored_object_crud.stream_object_names(db, shard):
+        yield object_name, None
+        yield f"{object_name}.webp", object_name
+
+
+def iter_expected_keys(db: Session, shard: str = DEFAULT_SHARD) -> Iterator[ExpectedKey]:
+    """
+    Merge every key the database places on a shard into one sorted stream.
+
+    Each source is already sorted in byte order by the database, so
+    heapq.merge keeps a single row per stream in memory. Duplicate keys
+    (legacy "a.jpg" and "a.jpeg" share "a.webp") are collapsed.
+    """
+    merged = heapq.merge(
+        _stored_object_keys(db, shard),
+        photo_version_crud.stream_legacy_object_names(db, shard=shard),
+        photo_version_crud.stream_legacy_object_names(db, webp=True, shard=shard),
+        key=lambda expected: expected[0],
+    )
+    previous = None
+    for expected in merged:
+        if expected[0] != previous:
+            previous = expected[0]
+            yield expected
+
+
+def _iter_storage_objects(backend: StorageBackend) -> Iterator[ObjectInfo]:
+    for obj in backend.list_objects(backend.bucket_name):
+        if not obj.object_name.startswith(IGNORED_PREFIXES):
+            yield obj
+
+
+def reconcile_storage(
+    db: Session,
+    shard: str = DEFAULT_SHARD,
+    repair: bool = False,
+    on_progress: Optional[Callable[[StorageReconcileReport], None]] = None,
+) -> StorageReconcileReport:
+    """
+    Merge-join a shard's bucket listing with the database references.
+
+    Both sides are streamed in byte order, so memory stays constant with
+    millions of objects. In repair mode missing WebP derivatives are
+    regenerated from their source, and orphans older than
+    STORAGE_GC_GRACE_SECONDS (so in-flight uploads are spared) are deleted.
+
+    Args:
+        db: Database session (read only, kept open for the whole scan)
+        shard: Storage shard to scan
+        repair: Apply repairs instead of only reporting
+        on_progress: Called with the running report every PROGRESS_EVERY objects
+
+    Returns:
+        StorageReconcileReport with counts and capped key samples
+    """
+    backend = get_storage_backend(shard)
+    report = StorageReconcileReport(shard=shard, repair=repair)
+    orphan_cutoff = common_utils.get_utc_now() - timedelta(seconds=settings.STORAGE_GC_GRACE_SECONDS)
+    orphans_to_delete: List[str] = []
+
+    def flush_orphans() -> None:
+        failed = backend.remove_objects(backend.bucket_name, orphans_to_delete)
+        report.deleted_orphans += len(orphans_to_delete) - len(failed)
+        orphans_to_delete.clear()
+
+    def handle_orphan(obj: ObjectInfo) -> None:
+        report.orphan_count += 1
+        if len(report.orphan_samples) < SAMPLE_LIMIT:
+            report.orphan_samples.append(obj.object_name)
+        if repair and obj.last_modified and obj.last_modified < orphan_cutoff:
+            orphans_to_delete.append(obj.object_name)
+            if len(orphans_to_delete) >= REMOVE_BATCH_SIZE:
+                flush_orphans()
+
+    def handle_missing(object_name: str, source_name: Optional[str]) -> None:
+        if len(report.missing_samples) < SAMPLE_LIMIT:
+            report.missing_samples.append(object_name)
+        if source_name is None:
+            report.missing_count += 1
+            return
+
+        report.missing_derivative_count += 1
+        if repair and _regenerate_derivative(backend, source_name, object_name):
+            report.repaired_derivatives += 1
+
+    storage_objects = _iter_storage_objects(backend)
+    expected_keys = iter_expected_keys(db, shard)
+    obj = next(storage_objects, None)
+    expected = next(expected_keys, None)
+    next_progress = PROGRESS_EVERY
+
+    while obj is not None or expected is not None:
+        if expected is None or (obj is not None and obj.object_name < expected[0]):
+            handle_orphan(obj)
+            report.scanned_objects += 1
+            obj = next(storage_objects, None)
+        elif obj is None or expected[0] < obj.object_name:
+            handle_missing(*expected)
+            report.expected_objects += 1
+            expected = next(expected_keys, None)
+        else:
+            report.matched += 1
+            report.scanned_objects += 1
+            report.expected_objects += 1
+            obj = next(storage_objects, None)
+            expected = next(expected_keys, None)
+
+        if on_progress and report.scanned_objects >= next_progress:
+            next_progress += PROGRESS_EVERY
+            on_progress(report)
+
+    if orphans_to_delete:
+        flush_orphans()
+
+    report.finished_at = common_utils.get_utc_now()
+    logger.info(
+        f"Storage reconciliation of shard {shard}: {report.matched} matched, {report.orphan_count} orphans, "
+        f"{report.missing_count} missing, {report.missing_derivative_count} missing derivatives"
+    )
+    return report
+
+
+def _regenerate_derivative(backend: StorageBackend, source_name: str, webp_name: str) -> bool:
+    """Rebuild a missing WebP derivative from its source object"""
+    file_bytes = backend.download(backend.bucket_name, source_name)
+    if not file_bytes:
+        return False
+    return backend.upload(
+        backend.bucket_name,
+        webp_name,
+        convert_to_webp(file_bytes, quality=85),
+        content_type="image/webp",
+        cache_control=IMMUTABLE_CACHE_CONTROL if webp_name.startswith(f"{CONTENT_PREFIX}/") else None,
+    )
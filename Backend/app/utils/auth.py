@@ -1,3 +1,4 @@
+import secrets
 import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
@@ -144,3 +145,14 @@ def get_current_user(token: str = Depends(jwt_bearer), db: Session = Depends(get
         raise
     except Exception as e:
         raise HTTPException(status_code=401, detail=MessageConstants.TOKEN_VERIFICATION_FAILED) from e
+
+
+def verify_metrics_token(token: str = Depends(jwt_bearer)) -> None:
+    """
+    Check the metrics scraper's bearer token against METRICS_TOKEN.
+
+    Metrics expose storage host names and breaker state, so they are
+    closed to everyone while no token is configured.
+    """
+    if not settings.METRICS_TOKEN or not secrets.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail=MessageConstants.METRICS_ACCESS_DENIED)
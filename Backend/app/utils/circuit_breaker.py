@@ -0,0 +1,155 @@
+"""
+Circuit breaker for calls to a remote dependency.
+
+While closed, calls pass through and consecutive failures are counted per
+operation type (a stream of fast successful stats does not hide failing
+gets). When one operation reaches failure_threshold the breaker opens and
+every call fails immediately with CircuitOpenError instead of waiting on
+timeouts and retries. After reset_timeout it turns half-open and lets a
+single probe through: success closes it, failure opens it again.
+
+State is exposed as the circuit_breaker_state gauge (0 closed,
+1 half-open, 2 open).
+
+Usage:
+    breaker = CircuitBreaker("minio:9000", failure_threshold=5, reset_timeout=30)
+
+    with breaker.guard("get", is_failure=lambda error: isinstance(error, OSError)):
+        ...
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator
+
+from app.utils import metrics
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"Circuit breaker {name} is open, retry in {retry_after:.0f}s")
+
+
+class CircuitBreaker:
+    """Thread-safe circuit breaker with per-operation failure counts"""
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._failures: Dict[str, int] = {}
+        metrics.register_collector(self.stats)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        """State with the open -> half-open timeout applied (lock held)"""
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: str) -> None:
+        """Change state (lock held)"""
+        self._state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state != HALF_OPEN:
+            self._probe_in_flight = False
+        if state == CLOSED:
+            self._failures.clear()
+        metrics.increment("circuit_breaker_transitions_total", breaker=self.name, state=state)
+
+    def before_call(self) -> bool:
+        """
+        Admit a call, returns True if it is the half-open probe.
+
+        Raises:
+            CircuitOpenError: If the breaker is open, or half-open with the probe in flight
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return False
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            retry_after = max(self.reset_timeout - (time.monotonic() - self._opened_at), 1.0)
+
+        metrics.increment("circuit_breaker_rejected_total", breaker=self.name)
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self, operation: str) -> None:
+        """The dependency answered: reset the operation's count, close after a probe"""
+        with self._lock:
+            self._failures.pop(operation, None)
+            if self._state == HALF_OPEN:
+                self._transition(CLOSED)
+
+    def record_failure(self, operation: str) -> None:
+        """The dependency failed: count it and open at the threshold (or after a failed probe)"""
+        metrics.increment("circuit_breaker_failures_total", breaker=self.name, operation=operation)
+        with self._lock:
+            failures = self._failures.get(operation, 0) + 1
+            self._failures[operation] = failures
+            if self._state == HALF_OPEN or (self._state == CLOSED and failures >= self.failure_threshold):
+                self._transition(OPEN)
+
+    def release_probe(self) -> None:
+        """Free the probe slot of a call that ended without an outcome"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    @contextmanager
+    def guard(self, operation: str, is_failure: Callable[[Exception], bool] = lambda error: True) -> Iterator[None]:
+        """
+        Run the wrapped call through the breaker.
+
+        Exceptions for which is_failure returns False (e.g. a missing
+        object) mean the dependency answered and count as a success.
+
+        Raises:
+            CircuitOpenError: If the call is rejected
+        """
+        is_probe = self.before_call()
+        recorded = False
+        try:
+            yield
+        except Exception as error:
+            recorded = True
+            if is_failure(error):
+                self.record_failure(operation)
+            else:
+                self.record_success(operation)
+            raise
+        else:
+            recorded = True
+            self.record_success(operation)
+        finally:
+            if is_probe and not recorded:
+                self.release_probe()
+
+    def stats(self) -> dict:
+        """Current state and per-operation failure counts"""
+        with self._lock:
+            gauges = {metrics.metric_key("circuit_breaker_state", breaker=self.name): _STATE_VALUES[self._current_state()]}
+            for operation, failures in self._failures.items():
+                gauges[metrics.metric_key("circuit_breaker_consecutive_failures", breaker=self.name, operation=operation)] = failures
+        return gauges
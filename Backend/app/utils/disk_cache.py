@@ -0,0 +1,205 @@
+"""
+Node-local disk cache for object storage reads.
+
+A read-through tier under app.utils.minio: objects fetched from MinIO are
+written to STORAGE_DISK_CACHE_DIR and later reads are served from disk.
+The cache is bounded by STORAGE_DISK_CACHE_MAX_BYTES and evicts the least
+recently used files first. It is disabled when the directory is not set.
+
+- writes go to a temporary file in the same directory and are published
+  with os.replace, so readers never see a partial file
+- open handles stay valid after eviction (the file is only unlinked), so a
+  response streaming from the cache is never cut short
+- the directory is shared by every uvicorn and Celery process of the node,
+  so it is its own index: a hit bumps the file's mtime, and eviction sweeps
+  re-measure the whole directory under an exclusive file lock
+- each process sweeps after writing 1% of the budget, so the directory
+  exceeds STORAGE_DISK_CACHE_MAX_BYTES by at most that slice per process
+"""
+
+import fcntl
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from typing import BinaryIO, Iterator, Optional
+
+from app.core.config import settings
+from app.utils import metrics
+from app.utils.logging import logger
+
+READ_CHUNK_SIZE = 64 * 1024
+LOCK_FILENAME = ".lock"
+# Temporary files older than this belong to an interrupted write
+STALE_TEMP_SECONDS = 60 * 60
+
+
+class DiskCache:
+    """Byte-bounded LRU cache of objects stored as files, shared by the node's processes"""
+
+    def __init__(self, directory: str, max_bytes: int, max_object_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_object_bytes = max_object_bytes
+        self._sweep_after_bytes = max(1, max_bytes // 100)
+        self._lock = threading.Lock()
+        self._written_bytes = 0
+        self._total_bytes = 0
+        self._entry_count = 0
+        os.makedirs(directory, exist_ok=True)
+        self._sweep()
+
+    def _path_for(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        """
+        Open a cached object for reading, None on a miss.
+
+        Only hits are counted here; a miss is counted by the read that
+        falls through to storage (get), so one request is not counted twice.
+        """
+        path = self._path_for(key)
+        try:
+            handle = open(path, "rb")
+        except OSError:
+            return None
+
+        try:
+            # Recency for the LRU sweeps of every process
+            os.utime(path)
+        except OSError:
+            pass
+        metrics.increment("storage_cache_hits_total", layer="disk")
+        return handle
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Read a cached object, None on a miss"""
+        handle = self.open(key)
+        if handle is None:
+            metrics.increment("storage_cache_misses_total", layer="disk")
+            return None
+        with handle:
+            return handle.read()
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store an object, replacing any previous version atomically"""
+        if len(data) > self.max_object_bytes:
+            return
+
+        path = self._path_for(key)
+        shard_dir = os.path.dirname(path)
+        try:
+            os.makedirs(shard_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=shard_dir, prefix=".")
+            try:
+                with os.fdopen(fd, "wb") as tmp_file:
+                    tmp_file.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                _remove_quietly(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"Disk cache write failed for {key}: {e}")
+            return
+
+        with self._lock:
+            self._written_bytes += len(data)
+            should_sweep = self._written_bytes >= self._sweep_after_bytes
+        if should_sweep:
+            self._sweep()
+
+    def invalidate(self, key: str) -> None:
+        """Drop an object after it was overwritten or deleted in storage"""
+        _remove_quietly(self._path_for(key))
+
+    def _sweep(self) -> None:
+        """
+        Measure the directory and remove least recently used files until
+        the budget is met. Skipped when another process is sweeping.
+        """
+        with open(os.path.join(self.directory, LOCK_FILENAME), "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return
+
+            with self._lock:
+                self._written_bytes = 0
+
+            stale_before = time.time() - STALE_TEMP_SECONDS
+            files = []
+            total_bytes = 0
+            for root, _, names in os.walk(self.directory):
+                for name in names:
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    if name.startswith("."):
+                        # Lock file, a write in progress, or one left by an interrupted write
+                        if name != LOCK_FILENAME and stat.st_mtime < stale_before:
+                            _remove_quietly(path)
+                        continue
+                    files.append((stat.st_mtime, path, stat.st_size))
+                    total_bytes += stat.st_size
+
+            files.sort()
+            evicted = 0
+            while total_bytes > self.max_bytes and evicted < len(files):
+                _, path, size = files[evicted]
+                _remove_quietly(path)
+                total_bytes -= size
+                evicted += 1
+            if evicted:
+                metrics.increment("storage_cache_evictions_total", evicted, layer="disk")
+
+            with self._lock:
+                self._total_bytes = total_bytes
+                self._entry_count = len(files) - evicted
+
+    def stats(self) -> dict:
+        """Size of the cache as measured by the last sweep of this process"""
+        with self._lock:
+            return {
+                metrics.metric_key("storage_cache_bytes", layer="disk"): self._total_bytes,
+                metrics.metric_key("storage_cache_entries", layer="disk"): self._entry_count,
+            }
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def iter_file(handle: BinaryIO, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield a file in chunks and close it, for streaming responses"""
+    with handle:
+        while chunk := handle.read(chunk_size):
+            yield chunk
+
+
+_disk_cache: Optional[DiskCache] = None
+_disk_cache_lock = threading.Lock()
+
+
+def get_disk_cache() -> Optional[DiskCache]:
+    """Get the process-wide disk cache, None when it is not configured"""
+    global _disk_cache
+    if not settings.STORAGE_DISK_CACHE_DIR:
+        return None
+    if _disk_cache is None:
+        with _disk_cache_lock:
+            if _disk_cache is None:
+                _disk_cache = DiskCache(
+                    settings.STORAGE_DISK_CACHE_DIR,
+                    settings.STORAGE_DISK_CACHE_MAX_BYTES,
+                    settings.STORAGE_DISK_CACHE_MAX_OBJECT_BYTES,
+                )
+                metrics.register_collector(_disk_cache.stats)
+    return _disk_cache
@@ -0,0 +1,62 @@
+"""
+HTTP Range request parsing.
+
+Only single byte ranges are served partially ("bytes=0-1023",
+"bytes=1024-", "bytes=-500"); a header with several ranges or another
+unit is ignored and the whole body is sent, as RFC 9110 allows.
+
+Usage:
+    try:
+        byte_range = parse_range_header(request.headers.get("range"), size)
+    except ValueError:
+        ...  # 416 Range Not Satisfiable
+"""
+
+from typing import Optional, Tuple
+
+
+def parse_range_header(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a Range header into an inclusive (start, end) byte pair.
+
+    Args:
+        range_header: Value of the Range header, if any
+        size: Total size of the resource
+
+    Returns:
+        (start, end) clamped to the resource, or None to send the whole body
+
+    Raises:
+        ValueError: If the range cannot be satisfied
+    """
+    if not range_header or size <= 0:
+        return None
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, separator, last = spec.strip().partition("-")
+    first, last = first.strip(), last.strip()
+    if not separator or not (first or last) or not all(part.isdigit() for part in (first, last) if part):
+        return None
+
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError(f"Unsatisfiable range: {range_header}")
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        # Invalid range syntax: ignored like an unknown unit
+        return None
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        raise ValueError(f"Unsatisfiable range: {range_header}")
+    return start, end
+
+
+def content_range(start: int, end: int, size: int) -> str:
+    """Content-Range header value of a partial response"""
+    return f"bytes {start}-{end}/{size}"
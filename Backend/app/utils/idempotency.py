@@ -0,0 +1,182 @@
+"""
+ASGI middleware implementing Idempotency-Key support for mutating requests.
+
+A client that retries a POST/PUT/PATCH/DELETE with the same
+Idempotency-Key header gets the stored result of the first attempt
+instead of re-running the handler (no repeated MinIO writes or WebP
+conversion, no 409 for work that already succeeded).
+
+Records live in Redis under idempotency:{fingerprint}, where the
+fingerprint covers the key, method, path and caller credentials:
+
+- while the first request runs, the record is an "in_progress" marker
+  (SET NX) and concurrent retries get 409; the marker's TTL is refreshed
+  until the handler returns, so a long bulk upload keeps its key
+- responses with status < 500 are stored with a TTL and replayed, along
+  with the SHA-256 of the request body
+- a retry whose body digest differs from the stored one gets 422 (the
+  key was reused for another payload)
+- 5xx responses, exceptions and requests whose body was not fully read
+  drop the marker so the client can retry
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.constant.messages import MessageConstants
+from app.schemas.common import ApiResponse
+from app.utils.logging import logger
+from app.utils.redis import get_async_redis_client
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+IN_PROGRESS = "in_progress"
+
+
+def _fingerprint(scope, headers: Headers, idempotency_key: str) -> str:
+    """Scope the key to the endpoint and the caller's credentials"""
+    parts = [
+        idempotency_key,
+        scope["method"],
+        scope["path"],
+        scope.get("query_string", b"").decode("latin-1"),
+        headers.get("authorization", ""),
+    ]
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+async def _read_body_digest(receive) -> Optional[str]:
+    """SHA-256 of the request body, read to the end; None if the client disconnected"""
+    digest = hashlib.sha256()
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            return None
+        digest.update(message.get("body", b""))
+        if not message.get("more_body", False):
+            return digest.hexdigest()
+
+
+class IdempotencyMiddleware:
+    """Middleware that stores and replays responses keyed by Idempotency-Key"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in MUTATING_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get(IDEMPOTENCY_HEADER)
+        if not idempotency_key or len(idempotency_key) > 255:
+            await self.app(scope, receive, send)
+            return
+
+        record_key = f"idempotency:{_fingerprint(scope, headers, idempotency_key)}"
+        try:
+            client = await get_async_redis_client()
+            acquired = await client.set(record_key, IN_PROGRESS, nx=True, ex=settings.IDEMPOTENCY_LOCK_TTL_SECONDS)
+            stored = None if acquired else await client.get(record_key)
+        except Exception as e:
+            logger.warning(f"Idempotency store unavailable, processing request without it: {e}")
+            await self.app(scope, receive, send)
+            return
+
+        if not acquired:
+            if stored and stored != IN_PROGRESS:
+                record = json.loads(stored)
+                if record.get("body_digest") == await _read_body_digest(receive):
+                    await self._replay(record, send)
+                    return
+                status_code, message = 422, MessageConstants.IDEMPOTENCY_KEY_REUSED
+            else:
+                status_code, message = 409, MessageConstants.IDEMPOTENCY_REQUEST_IN_PROGRESS
+            response = JSONResponse(
+                status_code=status_code,
+                content=ApiResponse(message=message, success=False, data=None).model_dump(),
+            )
+            await response(scope, receive, send)
+            return
+
+        body_digest = hashlib.sha256()
+        body_complete = False
+
+        async def hashing_receive():
+            nonlocal body_complete
+            message = await receive()
+            if message["type"] == "http.request":
+                body_digest.update(message.get("body", b""))
+                body_complete = not message.get("more_body", False)
+            return message
+
+        captured = {"status": None, "headers": [], "body": bytearray(), "too_large": False}
+
+        async def capturing_send(message):
+            if message["type"] == "http.response.start":
+                captured["status"] = message["status"]
+                captured["headers"] = [[name.decode("latin-1"), value.decode("latin-1")] for name, value in message.get("headers", [])]
+            elif message["type"] == "http.response.body" and not captured["too_large"]:
+                captured["body"] += message.get("body", b"")
+                if len(captured["body"]) > settings.IDEMPOTENCY_MAX_BODY_BYTES:
+                    captured["too_large"] = True
+                    captured["body"] = bytearray()
+            await send(message)
+
+        refresher = asyncio.create_task(self._keep_marker(client, record_key))
+        try:
+            await self.app(scope, hashing_receive, capturing_send)
+        except Exception:
+            refresher.cancel()
+            await self._release(client, record_key)
+            raise
+        refresher.cancel()
+
+        # A response to a partly read body (e.g. rejected upload) is not tied to the full payload
+        if captured["status"] is None or captured["status"] >= 500 or captured["too_large"] or not body_complete:
+            await self._release(client, record_key)
+            return
+
+        record = {
+            "status": captured["status"],
+            "headers": captured["headers"],
+            "body": base64.b64encode(bytes(captured["body"])).decode("ascii"),
+            "body_digest": body_digest.hexdigest(),
+        }
+        try:
+            await client.set(record_key, json.dumps(record), ex=settings.IDEMPOTENCY_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"Failed to store idempotent response {record_key}: {e}")
+
+    @staticmethod
+    async def _keep_marker(client, record_key: str) -> None:
+        """Refresh the in-progress marker's TTL until cancelled"""
+        interval = max(1, settings.IDEMPOTENCY_LOCK_TTL_SECONDS // 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await client.expire(record_key, settings.IDEMPOTENCY_LOCK_TTL_SECONDS)
+            except Exception as e:
+                logger.warning(f"Failed to refresh idempotency key {record_key}: {e}")
+
+    @staticmethod
+    async def _release(client, record_key: str) -> None:
+        try:
+            await client.delete(record_key)
+        except Exception as e:
+            logger.warning(f"Failed to release idempotency key {record_key}: {e}")
+
+    @staticmethod
+    async def _replay(record: dict, send) -> None:
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in record["headers"]]
+        headers.append((b"idempotency-replayed", b"true"))
+        await send({"type": "http.response.start", "status": record["status"], "headers": headers})
+        await send({"type": "http.response.body", "body": base64.b64decode(record["body"])})
@@ -129,3 +129,53 @@ def resize_image(
     except Exception as e:
         logger.exception(f"Error resizing photo {photo_id or 'unknown'}: {e}")
         return file_bytes
+
+
+# JPEG start-of-frame markers that carry the image dimensions
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# Markers without a length field
+_JPEG_STANDALONE_MARKERS = {0x01, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7, 0xD8}
+
+
+def is_jpeg_header(header: bytes) -> bool:
+    """Check the JPEG magic bytes (SOI marker followed by another marker)"""
+    return header[:3] == b"\xff\xd8\xff"
+
+
+def sniff_jpeg_dimensions(header: bytes) -> Optional[tuple[int, int]]:
+    """
+    Read (width, height) from the first bytes of a JPEG without decoding it.
+
+    Walks the marker segments up to the first start-of-frame marker.
+
+    Args:
+        header: Leading bytes of the file
+
+    Returns:
+        (width, height), or None if the frame header is not within the given bytes
+    """
+    if not is_jpeg_header(header):
+        return None
+
+    position = 2
+    while position + 4 <= len(header):
+        if header[position] != 0xFF:
+            return None
+        marker = header[position + 1]
+        if marker == 0xFF:  # Fill byte
+            position += 1
+            continue
+        if marker in _JPEG_STANDALONE_MARKERS:
+            position += 2
+            continue
+
+        segment_length = int.from_bytes(header[position + 2 : position + 4], "big")
+        if marker in _JPEG_SOF_MARKERS:
+            if position + 9 > len(header):
+                return None
+            height = int.from_bytes(header[position + 5 : position + 7], "big")
+            width = int.from_bytes(header[position + 7 : position + 9], "big")
+            return width, height
+        position += 2 + segment_length
+
+    return None
@@ -0,0 +1,205 @@
+"""
+Local filesystem storage backend.
+
+Objects live at {STORAGE_LOCAL_ROOT}/{bucket}/{object_name}. Intended for
+single-node installs and development without a MinIO server.
+
+- writes go to a temporary file in the target directory and are published
+  with os.replace, so readers never see a partial object
+- reads can be served straight from the file (FileResponse), no copy
+  through Python memory
+- listings walk the tree in UTF-8 byte order like S3 (a directory "a" sorts
+  as "a/"), so merge-based jobs work unchanged
+- deletes prune the directories they leave empty, as S3 has no directories
+"""
+
+import mimetypes
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, List, Optional
+
+from app.utils import metrics
+from app.utils.logging import logger
+from app.utils.storage_backend import ObjectInfo, StorageBackend
+
+
+class LocalFileSystemStorageBackend(StorageBackend):
+    """Backend storing objects as files under a root directory"""
+
+    name = "local"
+
+    def __init__(self, root: str, bucket_name: str):
+        self.root = os.path.abspath(root)
+        self.bucket_name = bucket_name
+
+    def _path(self, bucket_name: str, object_name: str) -> str:
+        """Resolve an object path, refusing names that escape the bucket directory"""
+        bucket_dir = self._bucket_dir(bucket_name)
+        path = os.path.normpath(os.path.join(bucket_dir, object_name))
+        if not path.startswith(bucket_dir + os.sep):
+            raise ValueError(f"Invalid object name: {object_name}")
+        return path
+
+    def _bucket_dir(self, bucket_name: str) -> str:
+        return os.path.join(self.root, bucket_name)
+
+    def init(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        logger.info(f"Local storage backend ready at {self.root}")
+
+    def upload(self, bucket_name, object_name, file_bytes, content_type=None, cache_control=None) -> bool:
+        try:
+            path = self._path(bucket_name, object_name)
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            with metrics.timed("storage_operation_seconds", operation="put"):
+                fd, tmp_path = _make_temp_file(directory)
+                try:
+                    with os.fdopen(fd, "wb") as tmp_file:
+                        tmp_file.write(file_bytes)
+                    os.replace(tmp_path, path)
+                except BaseException:
+                    _remove_quietly(tmp_path)
+                    raise
+            return True
+        except (OSError, ValueError) as e:
+            logger.exception(f"Local storage upload error: {e}")
+            return False
+
+    def upload_file(self, bucket_name, object_name, file_path, content_type=None) -> bool:
+        try:
+            path = self._path(bucket_name, object_name)
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            with metrics.timed("storage_operation_seconds", operation="put"):
+                fd, tmp_path = _make_temp_file(directory)
+                os.close(fd)
+                try:
+                    shutil.copyfile(file_path, tmp_path)
+                    os.replace(tmp_path, path)
+                except BaseException:
+                    _remove_quietly(tmp_path)
+                    raise
+            return True
+        except (OSError, ValueError) as e:
+            logger.exception(f"Local storage file upload error: {e}")
+            return False
+
+    def download(self, bucket_name, object_name) -> Optional[bytes]:
+        return self.download_range(bucket_name, object_name, 0)
+
+    def download_range(self, bucket_name, object_name, offset, length=None) -> Optional[bytes]:
+        try:
+            with metrics.timed("storage_operation_seconds", operation="get"):
+                with open(self._path(bucket_name, object_name), "rb") as file:
+                    file.seek(offset)
+                    return file.read() if length is None else file.read(length)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.exception(f"Local storage download error: {e}")
+            return None
+
+    def stat(self, bucket_name, object_name) -> Optional[ObjectInfo]:
+        try:
+            stat = os.stat(self._path(bucket_name, object_name))
+        except (OSError, ValueError):
+            return None
+        return _object_info(object_name, stat)
+
+    def delete(self, bucket_name, object_name) -> bool:
+        try:
+            path = self._path(bucket_name, object_name)
+            os.remove(path)
+        except FileNotFoundError:
+            # S3 semantics: deleting a missing object succeeds
+            return True
+        except (OSError, ValueError) as e:
+            logger.exception(f"Local storage delete error: {e}")
+            return False
+        _prune_empty_dirs(os.path.dirname(path), self._bucket_dir(bucket_name))
+        return True
+
+    def list_objects(self, bucket_name, prefix=None, start_after=None) -> Iterator[ObjectInfo]:
+        bucket_dir = self._bucket_dir(bucket_name)
+        prefix = prefix or ""
+        # Only walk the deepest directory fully covered by the prefix
+        base_key = prefix.rsplit("/", 1)[0] + "/" if "/" in prefix else ""
+        start_dir = os.path.join(bucket_dir, base_key)
+        if not os.path.isdir(start_dir):
+            return
+
+        for object_name, stat in self._walk(start_dir, base_key, prefix, start_after):
+            yield _object_info(object_name, stat)
+
+    def _walk(self, directory: str, key_prefix: str, prefix: str, start_after: Optional[str]):
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return
+
+        # Sort as S3 would: a directory "a" holds keys "a/...", which sort as "a/"
+        entries.sort(key=lambda entry: entry.name + "/" if entry.is_dir(follow_symlinks=False) else entry.name)
+        for entry in entries:
+            key = key_prefix + entry.name
+            if entry.is_dir(follow_symlinks=False):
+                dir_key = key + "/"
+                # Skip subtrees entirely before the cursor or outside the prefix
+                if start_after and dir_key < start_after and not start_after.startswith(dir_key):
+                    continue
+                if not (dir_key.startswith(prefix) or prefix.startswith(dir_key)):
+                    continue
+                yield from self._walk(entry.path, dir_key, prefix, start_after)
+            elif not entry.name.startswith(".upload-") and key.startswith(prefix):
+                if start_after and key <= start_after:
+                    continue
+                yield key, entry.stat(follow_symlinks=False)
+
+    def remove_objects(self, bucket_name, object_names: Iterable[str]) -> List[str]:
+        return [object_name for object_name in object_names if not self.delete(bucket_name, object_name)]
+
+    def local_path(self, bucket_name, object_name) -> Optional[str]:
+        try:
+            path = self._path(bucket_name, object_name)
+        except ValueError:
+            return None
+        return path if os.path.isfile(path) else None
+
+
+def _object_info(object_name: str, stat: os.stat_result) -> ObjectInfo:
+    return ObjectInfo(
+        object_name=object_name,
+        size=stat.st_size,
+        last_modified=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+        content_type=mimetypes.guess_type(object_name)[0],
+    )
+
+
+def _make_temp_file(directory: str) -> tuple[int, str]:
+    """Create a temporary upload file in a directory created beforehand"""
+    try:
+        return tempfile.mkstemp(dir=directory, prefix=".upload-")
+    except FileNotFoundError:
+        # Pruned by a concurrent delete between makedirs and mkstemp
+        os.makedirs(directory, exist_ok=True)
+        return tempfile.mkstemp(dir=directory, prefix=".upload-")
+
+
+def _prune_empty_dirs(directory: str, bucket_dir: str) -> None:
+    """Remove empty directories from directory up to (excluding) the bucket directory"""
+    while directory.startswith(bucket_dir + os.sep):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            # Not empty (or already gone): parents are not empty either
+            return
+        directory = os.path.dirname(directory)
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
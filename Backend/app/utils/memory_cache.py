@@ -0,0 +1,65 @@
+"""
+In-process LRU cache bounded by total bytes.
+
+Values are immutable bytes and are returned as-is, so a hit is served
+without copying. Entries larger than max_entry_bytes are never stored.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from app.utils import metrics
+
+
+class ByteLRUCache:
+    """Thread-safe LRU of bytes values with a total byte budget"""
+
+    def __init__(self, name: str, max_bytes: int, max_entry_bytes: int):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._total_bytes = 0
+        metrics.register_collector(self.stats)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Get a value and mark it recently used, None on a miss"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+        metrics.increment("storage_cache_hits_total" if value is not None else "storage_cache_misses_total", layer=self.name)
+        return value
+
+    def put(self, key: str, value: bytes) -> None:
+        """Store a value, evicting least recently used entries over the budget"""
+        value = bytes(value)
+        if len(value) > self.max_entry_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= len(previous)
+            self._entries[key] = value
+            self._total_bytes += len(value)
+            while self._total_bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= len(evicted)
+                metrics.increment("storage_cache_evictions_total", layer=self.name)
+
+    def invalidate(self, key: str) -> None:
+        """Drop a value"""
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= len(previous)
+
+    def stats(self) -> dict:
+        """Current size of the cache"""
+        with self._lock:
+            return {
+                metrics.metric_key("storage_cache_bytes", layer=self.name): self._total_bytes,
+                metrics.metric_key("storage_cache_entries", layer=self.name): len(self._entries),
+            }
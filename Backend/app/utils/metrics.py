@@ -0,0 +1,96 @@
+"""
+In-process metrics registry.
+
+Counters, gauges and latency summaries kept per worker process and exposed
+through the metrics endpoint. Metric names follow name{label=value,...}.
+
+Usage:
+    from app.utils import metrics
+
+    metrics.increment("storage_cache_hits_total", layer="disk")
+    with metrics.timed("storage_operation_seconds", operation="put"):
+        ...
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = {}
+_gauges: Dict[str, float] = {}
+_timings: Dict[str, Dict[str, float]] = {}
+_collectors: List[Callable[[], Dict[str, float]]] = []
+
+
+def metric_key(name: str, **labels) -> str:
+    """Flatten a metric name and its labels into the stored key"""
+    if not labels:
+        return name
+    label_str = ",".join(f"{label}={value}" for label, value in sorted(labels.items()))
+    return f"{name}{{{label_str}}}"
+
+
+def increment(name: str, value: float = 1, **labels) -> None:
+    """Add to a counter"""
+    key = metric_key(name, **labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    """Set a gauge to its current value"""
+    with _lock:
+        _gauges[metric_key(name, **labels)] = value
+
+
+def observe(name: str, seconds: float, **labels) -> None:
+    """Record one latency sample"""
+    key = metric_key(name, **labels)
+    with _lock:
+        timing = _timings.setdefault(key, {"count": 0, "sum": 0.0, "max": 0.0})
+        timing["count"] += 1
+        timing["sum"] += seconds
+        timing["max"] = max(timing["max"], seconds)
+
+
+@contextmanager
+def timed(name: str, **labels) -> Iterator[None]:
+    """Record the duration of the wrapped block, failures are labelled separately"""
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        observe(name, time.perf_counter() - start, outcome=outcome, **labels)
+
+
+def register_collector(collector: Callable[[], Dict[str, float]]) -> None:
+    """Register a callable returning gauges that are sampled at snapshot time"""
+    with _lock:
+        _collectors.append(collector)
+
+
+def snapshot() -> dict:
+    """Current values of all metrics"""
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        timings = {
+            key: {**timing, "avg": timing["sum"] / timing["count"] if timing["count"] else 0.0}
+            for key, timing in _timings.items()
+        }
+        collectors = list(_collectors)
+
+    for collector in collectors:
+        try:
+            gauges.update(collector())
+        except Exception:
+            # A broken collector must not take the endpoint down
+            continue
+
+    return {"counters": counters, "gauges": gauges, "timings": timings}
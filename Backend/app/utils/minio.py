@@ -1,8 +1,15 @@
 import io
-from typing import Optional
+import os
+import threading
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional
 
+import certifi
+import urllib3
 from minio import Minio
-from minio.error import S3Error
+from minio.datatypes import Object
+from minio.deleteobjects import DeleteObject
+from minio.error import S3Error, ServerError
 from tenacity import (
     retry,
     retry_if_exception_type,
@@ -11,48 +18,171 @@ from tenacity import (
 )
 
 from app.core.config import settings
+from app.utils import metrics
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.utils.disk_cache import get_disk_cache
 from app.utils.logging import logger
 
 minio_client = None
+_client_lock = threading.Lock()
+# Every client created by this process (default and shard clients), for pool metrics
+_clients: List[Minio] = []
+
+# Buckets verified to exist (and configured) by this process, per client
+_known_buckets: set[tuple[int, str]] = set()
+# One circuit breaker per client (storage endpoint)
+_breakers: Dict[int, CircuitBreaker] = {}
+
+# S3 error codes meaning the server is struggling, not that the request was wrong
+_SERVER_ERROR_CODES = {"InternalError", "ServiceUnavailable", "SlowDown", "RequestTimeout", "XMinioServerNotInitialized"}
+
+
+def _build_http_client() -> urllib3.PoolManager:
+    """Connection pool sized to the storage thread pool so workers never queue for a socket"""
+    return urllib3.PoolManager(
+        timeout=urllib3.Timeout(connect=settings.MINIO_CONNECT_TIMEOUT, read=settings.MINIO_READ_TIMEOUT),
+        maxsize=settings.MINIO_POOL_MAXSIZE,
+        block=False,
+        cert_reqs="CERT_REQUIRED",
+        ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+        retries=urllib3.Retry(
+            total=settings.MINIO_HTTP_RETRIES,
+            backoff_factor=0.2,
+            status_forcelist=[500, 502, 503, 504],
+        ),
+    )
 
 
 def get_minio_client() -> Minio:
     global minio_client
     if minio_client is None:
-        try:
-            # Try the newer MinIO client constructor format
-            try:
-                minio_client = Minio(
-                    endpoint=settings.MINIO_ENDPOINT,
-                    access_key=settings.MINIO_ACCESS_KEY,
-                    secret_key=settings.MINIO_SECRET_KEY,
-                    secure=settings.MINIO_SECURE,
-                )
-            except TypeError:
-                # Fallback to older constructor format if the above fails
-                minio_client = Minio(
-                    settings.MINIO_ENDPOINT,
-                    access_key=settings.MINIO_ACCESS_KEY,
-                    secret_key=settings.MINIO_SECRET_KEY,
-                    secure=settings.MINIO_SECURE,
-                )
-
-            # Cấu hình bucket policy cho public access ngay khi khởi tạo
-            ensure_bucket_public_access(minio_client, settings.MINIO_BUCKET_NAME)
-            ensure_bucket_public_access(minio_client, settings.MINIO_PUBLIC_BUCKET_NAME)
-
-        except Exception as e:
-            logger.exception(f"MinIO client initialization error: {e}")
-            raise
+        with _client_lock:
+            if minio_client is None:
+                minio_client = _create_minio_client()
     return minio_client
 
 
+def create_minio_client(endpoint: str, access_key: str, secret_key: str, secure: bool) -> Minio:
+    """Create a client with its own connection pool (one per storage shard)"""
+    http_client = _build_http_client()
+    # Try the newer MinIO client constructor format
+    try:
+        client = Minio(
+            endpoint=endpoint,
+            access_key=access_key,
+            secret_key=secret_key,
+            secure=secure,
+            http_client=http_client,
+        )
+    except TypeError:
+        # Fallback to older constructor format if the above fails
+        client = Minio(
+            endpoint,
+            access_key=access_key,
+            secret_key=secret_key,
+            secure=secure,
+            http_client=http_client,
+        )
+    _clients.append(client)
+    _breakers[id(client)] = CircuitBreaker(
+        endpoint,
+        failure_threshold=settings.MINIO_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=settings.MINIO_BREAKER_RESET_SECONDS,
+    )
+    return client
+
+
+def _create_minio_client() -> Minio:
+    try:
+        client = create_minio_client(
+            settings.MINIO_ENDPOINT,
+            settings.MINIO_ACCESS_KEY,
+            settings.MINIO_SECRET_KEY,
+            settings.MINIO_SECURE,
+        )
+
+        # Cấu hình bucket policy cho public access ngay khi khởi tạo
+        ensure_bucket_public_access(client, settings.MINIO_BUCKET_NAME)
+        ensure_bucket_public_access(client, settings.MINIO_PUBLIC_BUCKET_NAME)
+        return client
+
+    except Exception as e:
+        logger.exception(f"MinIO client initialization error: {e}")
+        raise
+
+
+def init_minio_client(client: Optional[Minio] = None) -> None:
+    """
+    Create the MinIO client and verify storage at startup.
+
+    Buckets and policies are configured here instead of on the first
+    request.
+
+    Args:
+        client: Shard client to verify (default client if omitted)
+    """
+    client = client or get_minio_client()
+    with _storage_call(client, "list_buckets"):
+        client.list_buckets()
+    buckets = sorted(bucket for client_id, bucket in _known_buckets if client_id == id(client))
+    logger.info(f"MinIO client ready (pool maxsize {settings.MINIO_POOL_MAXSIZE}, buckets {buckets})")
+
+
+def _pool_metrics() -> dict:
+    """Connection pool saturation per MinIO host"""
+    gauges = {}
+    for client in list(_clients):
+        pools = client._http.pools
+        for pool_key in pools.keys():
+            pool = pools.get(pool_key)
+            if pool is None or pool.pool is None:
+                continue
+            # Free slots (idle sockets or unopened) sit in the queue, the rest are checked out
+            in_use = pool.pool.maxsize - pool.pool.qsize()
+            host = f"{pool.host}:{pool.port}"
+            gauges[metrics.metric_key("storage_pool_connections_in_use", host=host)] = in_use
+            gauges[metrics.metric_key("storage_pool_connections_max", host=host)] = pool.pool.maxsize
+            gauges[metrics.metric_key("storage_pool_connections_created", host=host)] = pool.num_connections
+    return gauges
+
+
+metrics.register_collector(_pool_metrics)
+
+
+def _is_unavailable(error: Exception) -> bool:
+    """Transport errors and server-side failures trip the breaker; client errors (NoSuchKey, AccessDenied) do not"""
+    if isinstance(error, S3Error):
+        return error.code in _SERVER_ERROR_CODES
+    return isinstance(error, (ServerError, urllib3.exceptions.HTTPError, OSError))
+
+
+@contextmanager
+def _storage_call(client: Minio, operation: str) -> Iterator[None]:
+    """
+    Time a storage call and run it through the client's circuit breaker.
+
+    Raises:
+        CircuitOpenError: If the endpoint's breaker is open (not retried by tenacity)
+    """
+    with _breakers[id(client)].guard(operation, is_failure=_is_unavailable):
+        with metrics.timed("storage_operation_seconds", operation=operation):
+            yield
+
+
+def ensure_bucket(client: Minio, bucket_name: str) -> None:
+    """Create the bucket once per process and client; later calls are a set lookup"""
+    if (id(client), bucket_name) in _known_buckets:
+        return
+    if not client.bucket_exists(bucket_name=bucket_name):
+        client.make_bucket(bucket_name=bucket_name)
+    _known_buckets.add((id(client), bucket_name))
+
+
 def ensure_bucket_public_access(client: Minio, bucket_name: str) -> None:
     """Đảm bảo bucket có public read access"""
     try:
         # Tạo bucket nếu chưa tồn tại
-        if not client.bucket_exists(bucket_name=bucket_name):
-            client.make_bucket(bucket_name=bucket_name)
+        ensure_bucket(client, bucket_name)
 
         # Cấu hình bucket policy cho public read
         policy = {
@@ -88,6 +218,8 @@ def upload_bytes_to_minio(
     bucket_name: str,
     object_name: str,
     content_type: Optional[str] = None,
+    cache_control: Optional[str] = None,
+    client: Optional[Minio] = None,
 ) -> bool:
     """Upload file bytes directly to MinIO
 
@@ -96,29 +228,37 @@ def upload_bytes_to_minio(
         bucket_name: MinIO bucket name
         object_name: Object name in MinIO
         content_type: Content type (optional)
+        cache_control: Cache-Control header stored with the object (optional)
+        client: Shard client (default client if omitted)
 
     Returns:
         bool: Success status
     """
     try:
-        client = get_minio_client()
+        client = client or get_minio_client()
 
-        # Ensure bucket exists
-        if not client.bucket_exists(bucket_name=bucket_name):
-            client.make_bucket(bucket_name=bucket_name)
+        # Ensure bucket exists (cached after the first check)
+        ensure_bucket(client, bucket_name)
 
         # Upload bytes directly
         file_size = len(file_bytes)
         file_data = io.BytesIO(file_bytes)
-        client.put_object(
-            bucket_name=bucket_name,
-            object_name=object_name,
-            data=file_data,
-            length=file_size,
-            content_type=content_type,
-        )
-
+        with _storage_call(client, "put"):
+            client.put_object(
+                bucket_name=bucket_name,
+                object_name=object_name,
+                data=file_data,
+                length=file_size,
+                content_type=content_type,
+                metadata={"Cache-Control": cache_control} if cache_control else None,
+            )
+
+        disk_cache = get_disk_cache()
+        if disk_cache:
+            disk_cache.invalidate(f"{bucket_name}/{object_name}")
         return True
+    except CircuitOpenError:
+        raise
     except S3Error as e:
         logger.exception(f"MinIO upload error: {e}")
         return False
@@ -127,36 +267,219 @@ def upload_bytes_to_minio(
         return False
 
 
+def upload_file_to_minio(
+    file_path: str,
+    bucket_name: str,
+    object_name: str,
+    content_type: Optional[str] = None,
+    client: Optional[Minio] = None,
+) -> bool:
+    """Upload a local file to MinIO (multipart for large files, constant memory)
+
+    Args:
+        file_path: Path of the file to upload
+        bucket_name: MinIO bucket name
+        object_name: Object name in MinIO
+        content_type: Content type (optional)
+        client: Shard client (default client if omitted)
+
+    Returns:
+        bool: Success status
+    """
+    try:
+        client = client or get_minio_client()
+        ensure_bucket(client, bucket_name)
+        with _storage_call(client, "put"):
+            client.fput_object(
+                bucket_name=bucket_name,
+                object_name=object_name,
+                file_path=file_path,
+                content_type=content_type or "application/octet-stream",
+            )
+
+        disk_cache = get_disk_cache()
+        if disk_cache:
+            disk_cache.invalidate(f"{bucket_name}/{object_name}")
+        return True
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        logger.exception(f"MinIO file upload error: {e}")
+        return False
+
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=0.5, min=0.5, max=5),
     retry=retry_if_exception_type(S3Error),
 )
-def download_file_from_minio(bucket_name: str, object_name: str) -> Optional[bytes]:
+def download_file_from_minio(bucket_name: str, object_name: str, client: Optional[Minio] = None) -> Optional[bytes]:
+    disk_cache = get_disk_cache()
+    if disk_cache:
+        cached = disk_cache.get(f"{bucket_name}/{object_name}")
+        if cached is not None:
+            return cached
+
     try:
-        client = get_minio_client()
-        response = client.get_object(bucket_name=bucket_name, object_name=object_name)
-        return response.read()
+        client = client or get_minio_client()
+        with _storage_call(client, "get"):
+            response = client.get_object(bucket_name=bucket_name, object_name=object_name)
+            try:
+                data = response.read()
+            finally:
+                response.close()
+                response.release_conn()
+
+        if disk_cache:
+            disk_cache.put(f"{bucket_name}/{object_name}", data)
+        return data
     except S3Error as e:
         logger.exception(f"MinIO download error: {e}")
         return None
 
 
+def open_cached_object(bucket_name: str, object_name: str) -> Optional[BinaryIO]:
+    """Open an object from the local disk cache without touching MinIO, None if not cached"""
+    disk_cache = get_disk_cache()
+    if not disk_cache:
+        return None
+    return disk_cache.open(f"{bucket_name}/{object_name}")
+
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=0.5, min=0.5, max=5),
     retry=retry_if_exception_type(S3Error),
 )
-def delete_file_from_minio(bucket_name: str, object_name: str) -> bool:
+def download_range_from_minio(
+    bucket_name: str,
+    object_name: str,
+    offset: int,
+    length: Optional[int] = None,
+    client: Optional[Minio] = None,
+) -> Optional[bytes]:
+    """Download a byte range of an object (length None reads to the end)"""
     try:
-        client = get_minio_client()
-        client.remove_object(bucket_name=bucket_name, object_name=object_name)
+        client = client or get_minio_client()
+        with _storage_call(client, "get_range"):
+            response = client.get_object(bucket_name=bucket_name, object_name=object_name, offset=offset, length=length or 0)
+            try:
+                return response.read()
+            finally:
+                response.close()
+                response.release_conn()
+    except S3Error as e:
+        logger.exception(f"MinIO ranged download error: {e}")
+        return None
+
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=0.5, min=0.5, max=5),
+    retry=retry_if_exception_type(S3Error),
+)
+def stat_object_in_minio(bucket_name: str, object_name: str, client: Optional[Minio] = None) -> Optional[Object]:
+    """Get object metadata (size, etag, content type), None if the object does not exist"""
+    try:
+        client = client or get_minio_client()
+        with _storage_call(client, "stat"):
+            return client.stat_object(bucket_name=bucket_name, object_name=object_name)
+    except S3Error as e:
+        if e.code not in ("NoSuchKey", "NoSuchObject", "NoSuchBucket"):
+            logger.exception(f"MinIO stat error: {e}")
+        return None
+
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=0.5, min=0.5, max=5),
+    retry=retry_if_exception_type(S3Error),
+)
+def delete_file_from_minio(bucket_name: str, object_name: str, client: Optional[Minio] = None) -> bool:
+    try:
+        client = client or get_minio_client()
+        with _storage_call(client, "delete"):
+            client.remove_object(bucket_name=bucket_name, object_name=object_name)
+
+        disk_cache = get_disk_cache()
+        if disk_cache:
+            disk_cache.invalidate(f"{bucket_name}/{object_name}")
         return True
     except S3Error as e:
         logger.exception(f"MinIO delete error: {e}")
         return False
 
 
+# S3 DeleteObjects accepts at most 1000 keys per request
+REMOVE_BATCH_SIZE = 1000
+
+
+def list_objects_in_minio(
+    bucket_name: str,
+    prefix: Optional[str] = None,
+    start_after: Optional[str] = None,
+    client: Optional[Minio] = None,
+) -> Iterator[Object]:
+    """
+    Stream objects under a prefix in lexicographic (UTF-8 byte) order.
+
+    Pages are fetched lazily by the SDK, so memory stays constant no matter
+    how many objects match. start_after resumes an interrupted listing.
+    """
+    client = client or get_minio_client()
+    # Not timed: the listing stays open while the caller works through it
+    with _breakers[id(client)].guard("list", is_failure=_is_unavailable):
+        for obj in client.list_objects(bucket_name=bucket_name, prefix=prefix, recursive=True, start_after=start_after):
+            if not obj.is_dir:
+                yield obj
+
+
+def list_object_names_in_minio(bucket_name: str, prefix: Optional[str] = None, start_after: Optional[str] = None) -> Iterator[str]:
+    """Stream object names under a prefix in lexicographic order"""
+    for obj in list_objects_in_minio(bucket_name, prefix=prefix, start_after=start_after):
+        yield obj.object_name
+
+
+def remove_objects_from_minio(bucket_name: str, object_names: Iterable[str], client: Optional[Minio] = None) -> List[str]:
+    """
+    Delete objects with batched DeleteObjects requests.
+
+    Not retried here: callers pass a possibly one-shot iterable, and the
+    background jobs resume from their own cursor instead.
+
+    Args:
+        bucket_name: MinIO bucket name
+        object_names: Object names, split into batches of REMOVE_BATCH_SIZE
+        client: Shard client (default client if omitted)
+
+    Returns:
+        List of object names that could not be deleted
+    """
+    client = client or get_minio_client()
+    disk_cache = get_disk_cache()
+    failed = []
+    batch: List[str] = []
+
+    def flush() -> None:
+        with _storage_call(client, "remove_batch"):
+            # remove_objects is lazy: errors are only reported while iterating
+            for error in client.remove_objects(bucket_name, (DeleteObject(name) for name in batch)):
+                logger.warning(f"MinIO bulk delete error for {error.name}: {error.message}")
+                failed.append(error.name)
+        if disk_cache:
+            for name in batch:
+                disk_cache.invalidate(f"{bucket_name}/{name}")
+        batch.clear()
+
+    for object_name in object_names:
+        batch.append(object_name)
+        if len(batch) >= REMOVE_BATCH_SIZE:
+            flush()
+    if batch:
+        flush()
+    return failed
+
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=0.5, min=0.5, max=5),
@@ -188,10 +511,11 @@ def generate_presigned_url(bucket_name: str, object_name: str) -> Optional[str]:
     wait=wait_exponential(multiplier=0.5, min=0.5, max=5),
     retry=retry_if_exception_type(S3Error),
 )
-def file_exists_in_minio(bucket_name: str, object_name: str) -> bool:
+def file_exists_in_minio(bucket_name: str, object_name: str, client: Optional[Minio] = None) -> bool:
     try:
-        client = get_minio_client()
-        client.stat_object(bucket_name=bucket_name, object_name=object_name)
+        client = client or get_minio_client()
+        with _storage_call(client, "stat"):
+            client.stat_object(bucket_name=bucket_name, object_name=object_name)
         return True
     except S3Error:
         return False
@@ -0,0 +1,67 @@
+"""
+Seekable file object over ranged storage reads.
+
+Lets stdlib readers that need random access (zipfile reads the central
+directory at the end first) work on a stored object without downloading
+it: every read is a ranged request, and the buffered wrapper keeps small
+header reads from turning into one request each.
+
+Usage:
+    with open_object_reader(backend, object_name, size) as file:
+        with ZipFile(file) as zip_file:
+            ...
+"""
+
+import io
+from typing import BinaryIO
+
+from app.core.config import settings
+from app.utils.storage_backend import StorageBackend
+
+
+class StorageObjectReader(io.RawIOBase):
+    """Raw, seekable reader of one stored object"""
+
+    def __init__(self, backend: StorageBackend, object_name: str, size: int):
+        self._backend = backend
+        self._object_name = object_name
+        self._size = size
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._size
+        if offset < 0:
+            raise ValueError(f"Negative seek position {offset}")
+        self._position = offset
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        length = min(len(buffer), self._size - self._position)
+        if length <= 0:
+            return 0
+        data = self._backend.download_range(self._backend.bucket_name, self._object_name, self._position, length)
+        if not data:
+            raise OSError(f"Object {self._object_name} could not be read at offset {self._position}")
+        buffer[: len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+
+def open_object_reader(backend: StorageBackend, object_name: str, size: int) -> BinaryIO:
+    """Buffered, seekable reader of a stored object (size from stat)"""
+    return io.BufferedReader(
+        StorageObjectReader(backend, object_name, size),
+        buffer_size=settings.ARCHIVE_DOWNLOAD_CHUNK_SIZE,
+    )
@@ -0,0 +1,76 @@
+"""
+Ordered, bounded-concurrency prefetching.
+
+Keeps up to `concurrency` fetches in flight ahead of a sequential consumer
+(e.g. an archive writer), so total time approaches the bandwidth limit
+instead of N round trips. Results come out in input order. A byte budget
+caps the prefetch window: each item reserves its size hint when its fetch
+starts and releases it when handed to the consumer, so fetched-but-not-yet-
+consumed data never exceeds max_bytes (one item is always allowed, even if
+larger than the budget).
+
+Usage:
+    async for name, data in prefetch_ordered(names, storage.download_object, concurrency=8, max_bytes=128 << 20):
+        ...
+"""
+
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Deque, Iterable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_END = object()
+
+
+async def prefetch_ordered(
+    items: Iterable[T],
+    fetch: Callable[[T], Awaitable[R]],
+    concurrency: int,
+    max_bytes: int,
+    size_hint: Callable[[T], Optional[int]] = lambda item: None,
+    default_size: int = 0,
+) -> AsyncIterator[Tuple[T, R]]:
+    """
+    Fetch items concurrently and yield (item, result) pairs in input order.
+
+    Args:
+        items: Items to fetch, consumed lazily
+        fetch: Coroutine function fetching one item
+        concurrency: Maximum fetches in flight
+        max_bytes: Budget for fetched data not yet handed to the consumer
+        size_hint: Expected result size of an item, None if unknown
+        default_size: Size reserved for items without a hint
+
+    Raises:
+        Exception: The first failed fetch, in input order; later fetches are cancelled
+    """
+    iterator = iter(items)
+    window: Deque[Tuple[T, asyncio.Future[R], int]] = deque()
+    reserved = 0
+    next_item = next(iterator, _END)
+
+    try:
+        while True:
+            # Top up the window while both the concurrency and byte budgets allow
+            while next_item is not _END and len(window) < concurrency:
+                size = size_hint(next_item) or default_size
+                if window and reserved + size > max_bytes:
+                    break
+                window.append((next_item, asyncio.ensure_future(fetch(next_item)), size))
+                reserved += size
+                next_item = next(iterator, _END)
+
+            if not window:
+                return
+
+            item, future, size = window.popleft()
+            try:
+                result = await future
+            finally:
+                reserved -= size
+            yield item, result
+    finally:
+        for _, future, _ in window:
+            future.cancel()
@@ -0,0 +1,53 @@
+"""
+Fixed-window rate limiting in Redis.
+
+Each key counts hits with INCR; the first hit of a window sets its expiry,
+so the counter resets window_seconds after it started. Counters are shared
+by every worker and node. If Redis is unavailable the request is let
+through (logged), as the idempotency middleware does.
+
+Usage:
+    retry_after = await hit_rate_limit("guest_archive:<token digest>", limit=5, window_seconds=3600)
+    if retry_after is not None:
+        ...  # 429, Retry-After: retry_after
+"""
+
+from typing import Optional
+
+from app.utils.logging import logger
+from app.utils.redis import get_async_redis_client
+
+RATE_LIMIT_PREFIX = "rate_limit:"
+
+
+async def hit_rate_limit(key: str, limit: int, window_seconds: int) -> Optional[int]:
+    """
+    Count one hit against a key.
+
+    Args:
+        key: Limited subject (prefixed with rate_limit:)
+        limit: Hits allowed per window, 0 disables the limit
+        window_seconds: Window length
+
+    Returns:
+        Seconds until the window resets if the limit is exceeded, None if the hit is allowed
+    """
+    if limit <= 0:
+        return None
+
+    redis_key = f"{RATE_LIMIT_PREFIX}{key}"
+    try:
+        client = await get_async_redis_client()
+        pipeline = client.pipeline()
+        pipeline.incr(redis_key)
+        # NX: only the first hit starts the window
+        pipeline.expire(redis_key, window_seconds, nx=True)
+        pipeline.ttl(redis_key)
+        hits, _, ttl = await pipeline.execute()
+    except Exception as e:
+        logger.warning(f"Rate limit store unavailable, allowing request for {key}: {e}")
+        return None
+
+    if hits <= limit:
+        return None
+    return ttl if ttl and ttl > 0 else window_seconds
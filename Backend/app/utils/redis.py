@@ -1,5 +1,6 @@
 # app/clients/redis_client.py
 import asyncio
+import json
 
 import redis
 from redis import ConnectionPool
@@ -11,6 +12,7 @@ from tenacity import (
 )
 
 from app.core.config import settings
+from app.utils import common_utils
 from app.utils.logging import logger
 
 # Create connection pool for better performance (sync client)
@@ -31,6 +33,7 @@ redis_client = redis.Redis(connection_pool=redis_pool)
 
 # Async Redis client will be created per event loop
 _async_clients = {}  # Store clients per event loop
+_async_cache_clients = {}  # Binary-safe cache clients per event loop
 
 
 @retry(
@@ -117,6 +120,34 @@ async def get_async_redis_client():
         raise
 
 
+def get_async_cache_redis_client():
+    """
+    Get the binary-safe async Redis client for cached blobs.
+
+    Uses REDIS_CACHE_DB and decode_responses=False so values come back as
+    bytes. Created per event loop like get_async_redis_client, but without
+    a ping per call: cache callers treat any Redis error as a miss.
+    """
+    import redis.asyncio as aioredis
+
+    loop_id = id(asyncio.get_running_loop())
+    client = _async_cache_clients.get(loop_id)
+    if client is None:
+        client = aioredis.Redis(
+            host=settings.REDIS_HOST,
+            port=int(settings.REDIS_PORT),
+            db=int(settings.REDIS_CACHE_DB),
+            decode_responses=False,
+            retry_on_timeout=True,
+            socket_timeout=2,
+            socket_connect_timeout=2,
+            health_check_interval=30,
+            max_connections=20,
+        )
+        _async_cache_clients[loop_id] = client
+    return client
+
+
 async def publish_to_user_channel(user_id: str, message: dict) -> bool:
     """
     Publish message to user's Redis channel using hierarchical pattern.
@@ -125,8 +156,6 @@ async def publish_to_user_channel(user_id: str, message: dict) -> bool:
     try:
         client = await get_async_redis_client()
         channel = f"user:{user_id}:{message.get('type', 'notification')}"
-        import json
-
         data = json.dumps(message)
         result = await client.publish(channel, data)
         logger.debug("Published to %s (subscribers=%s): %s", channel, result, message)
@@ -136,6 +165,39 @@ async def publish_to_user_channel(user_id: str, message: dict) -> bool:
         return False
 
 
+def publish_user_message(user_id: str, message: dict) -> None:
+    """Publish on user:{user_id}:{message_type} (sync counterpart of publish_to_user_channel, for Celery workers)"""
+    try:
+        get_redis_client().publish(f"user:{user_id}:{message.get('type', 'notification')}", json.dumps(message))
+    except Exception as e:
+        logger.warning("Failed to publish to user channel %s: %s", user_id, e)
+
+
+def report_task_progress(task_id: str, user_id: str, status: str, progress: int, **fields) -> None:
+    """
+    Record background task progress and notify the user (sync, for Celery workers).
+
+    Progress is stored in the task_progress:{task_id}:{user_id} hash read by
+    get_recent_messages_for_user and published on user:{user_id}:task_progress.
+    """
+    data = {
+        "status": status,
+        "progress": str(progress),
+        "last_update": common_utils.get_utc_now().isoformat(),
+        **{key: str(value) for key, value in fields.items()},
+    }
+    key = f"task_progress:{task_id}:{user_id}"
+    try:
+        client = get_redis_client()
+        pipeline = client.pipeline()
+        pipeline.hset(key, mapping=data)
+        pipeline.expire(key, settings.TASK_PROGRESS_TTL_SECONDS)
+        pipeline.publish(f"user:{user_id}:task_progress", json.dumps({"type": "task_progress", "data": {**data, "task_id": task_id}}))
+        pipeline.execute()
+    except Exception as e:
+        logger.warning("Failed to report progress for task %s: %s", task_id, e)
+
+
 async def get_recent_messages_for_user(user_id: str, limit: int = 10) -> list:
     """
     Get recent messages for a user from Redis for replay functionality.
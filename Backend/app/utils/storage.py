@@ -0,0 +1,144 @@
+"""
+Async object-storage client for the request path.
+
+Storage backends (app.utils.storage_backend) are blocking: the minio SDK
+is synchronous and its tenacity retries sleep in the calling thread.
+Calling them straight from an ``async def`` handler blocks the event loop,
+so one slow storage call stalls every other request. These wrappers run
+the configured backend on a dedicated, bounded thread pool
+(MINIO_IO_THREADS) and await the result.
+
+Every wrapper takes the project's storage shard (None for the default
+shard); bucket_name defaults to the shard's bucket.
+
+Usage:
+    from app.utils import storage
+
+    file_bytes = await storage.download_object(object_name, shard=project.storage_shard)
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable, Optional
+
+from app.core.config import settings
+from app.utils import metrics
+from app.utils.storage_backend import ObjectInfo, StorageBackend, get_storage_backend
+
+_executor = ThreadPoolExecutor(max_workers=settings.MINIO_IO_THREADS, thread_name_prefix="storage-io")
+
+
+async def _run(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking storage call on the storage thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+async def _run_on(shard: Optional[str], bucket_name: Optional[str], method: str, *args: Any) -> Any:
+    """Run a backend method of a shard, on its bucket unless one is given"""
+    backend: StorageBackend = get_storage_backend(shard)
+    return await _run(getattr(backend, method), bucket_name or backend.bucket_name, *args)
+
+
+async def upload_object(
+    object_name: str,
+    file_bytes: bytes,
+    content_type: Optional[str] = None,
+    cache_control: Optional[str] = None,
+    bucket_name: Optional[str] = None,
+    shard: Optional[str] = None,
+) -> bool:
+    """Upload bytes to object storage"""
+    return await _run_on(shard, bucket_name, "upload", object_name, file_bytes, content_type, cache_control)
+
+
+async def upload_file(
+    object_name: str,
+    file_path: str,
+    content_type: Optional[str] = None,
+    bucket_name: Optional[str] = None,
+    shard: Optional[str] = None,
+) -> bool:
+    """Upload a local file to object storage without reading it into memory"""
+    return await _run_on(shard, bucket_name, "upload_file", object_name, file_path, content_type)
+
+
+async def download_object(object_name: str, bucket_name: Optional[str] = None, shard: Optional[str] = None) -> Optional[bytes]:
+    """Download a whole object, None if it cannot be read"""
+    return await _run_on(shard, bucket_name, "download", object_name)
+
+
+async def download_object_hedged(
+    object_name: str,
+    bucket_name: Optional[str] = None,
+    shard: Optional[str] = None,
+) -> Optional[bytes]:
+    """
+    Download a whole object, hedging slow requests (for latency-sensitive reads).
+
+    If the first request has not finished after STORAGE_HEDGE_DELAY_MS, an
+    identical second request is sent and the first successful result wins.
+    The slower call still runs to completion on its thread (blocking calls
+    cannot be cancelled), so the extra load is limited to tail requests.
+    """
+    delay = settings.STORAGE_HEDGE_DELAY_MS / 1000
+    first = asyncio.ensure_future(download_object(object_name, bucket_name, shard))
+    if delay <= 0:
+        return await first
+
+    done, _ = await asyncio.wait({first}, timeout=delay)
+    if done:
+        return first.result()
+
+    metrics.increment("storage_hedged_requests_total")
+    second = asyncio.ensure_future(download_object(object_name, bucket_name, shard))
+    pending = {first, second}
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.exception() is None and task.result() is not None:
+                if task is second:
+                    metrics.increment("storage_hedge_wins_total")
+                for other in pending:
+                    other.cancel()
+                return task.result()
+
+    # Neither request succeeded: surface the first request's outcome
+    return first.result()
+
+
+async def open_cached(object_name: str, bucket_name: Optional[str] = None, shard: Optional[str] = None) -> Optional[BinaryIO]:
+    """Open an object from the node-local disk cache, None if it is not cached"""
+    return await _run_on(shard, bucket_name, "open_cached", object_name)
+
+
+async def local_path(object_name: str, bucket_name: Optional[str] = None, shard: Optional[str] = None) -> Optional[str]:
+    """Filesystem path of the object when the backend stores it locally, None otherwise"""
+    return await _run_on(shard, bucket_name, "local_path", object_name)
+
+
+async def download_object_range(
+    object_name: str,
+    offset: int,
+    length: Optional[int] = None,
+    bucket_name: Optional[str] = None,
+    shard: Optional[str] = None,
+) -> Optional[bytes]:
+    """Download length bytes starting at offset (to the end if length is None)"""
+    return await _run_on(shard, bucket_name, "download_range", object_name, offset, length)
+
+
+async def stat_object(object_name: str, bucket_name: Optional[str] = None, shard: Optional[str] = None) -> Optional[ObjectInfo]:
+    """Get object metadata, None if the object does not exist"""
+    return await _run_on(shard, bucket_name, "stat", object_name)
+
+
+async def object_exists(object_name: str, bucket_name: Optional[str] = None, shard: Optional[str] = None) -> bool:
+    """Check whether an object exists"""
+    return await _run_on(shard, bucket_name, "exists", object_name)
+
+
+async def delete_object(object_name: str, bucket_name: Optional[str] = None, shard: Optional[str] = None) -> bool:
+    """Delete an object"""
+    return await _run_on(shard, bucket_name, "delete", object_name)
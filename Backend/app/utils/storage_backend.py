@@ -0,0 +1,244 @@
+"""
+Storage backend interface.
+
+Object storage is reached through a StorageBackend selected by
+STORAGE_BACKEND ("minio" or "local"), instead of calling app.utils.minio
+directly. There is one backend per storage shard (app.utils.storage_shards);
+its bucket_name is the shard's bucket. All methods are blocking; async code
+goes through app.utils.storage, which runs them on the storage thread pool.
+
+Usage:
+    from app.utils.storage_backend import get_storage_backend
+
+    backend = get_storage_backend(project.storage_shard)
+    for info in backend.list_objects(backend.bucket_name, prefix="objects/"):
+        ...
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+from minio import Minio
+
+from app.core.config import settings
+from app.utils.minio import (
+    create_minio_client,
+    delete_file_from_minio,
+    download_file_from_minio,
+    download_range_from_minio,
+    ensure_bucket_public_access,
+    file_exists_in_minio,
+    get_minio_client,
+    init_minio_client,
+    list_objects_in_minio,
+    open_cached_object,
+    remove_objects_from_minio,
+    stat_object_in_minio,
+    upload_bytes_to_minio,
+    upload_file_to_minio,
+)
+from app.utils.storage_shards import DEFAULT_SHARD, ShardConfig, get_shard
+
+
+@dataclass(frozen=True)
+class ObjectInfo:
+    """Backend-neutral object metadata"""
+
+    object_name: str
+    size: int
+    last_modified: Optional[datetime] = None
+    etag: Optional[str] = None
+    content_type: Optional[str] = None
+
+
+class StorageBackend(ABC):
+    """Blocking object storage operations shared by all backends"""
+
+    name: str
+    # Bucket holding the shard's photo objects
+    bucket_name: str
+
+    @abstractmethod
+    def init(self) -> None:
+        """Create clients and verify buckets at startup"""
+
+    @abstractmethod
+    def upload(
+        self,
+        bucket_name: str,
+        object_name: str,
+        file_bytes: bytes,
+        content_type: Optional[str] = None,
+        cache_control: Optional[str] = None,
+    ) -> bool:
+        """Write an object, replacing any previous content"""
+
+    @abstractmethod
+    def upload_file(self, bucket_name: str, object_name: str, file_path: str, content_type: Optional[str] = None) -> bool:
+        """Write an object from a local file without reading it into memory"""
+
+    @abstractmethod
+    def download(self, bucket_name: str, object_name: str) -> Optional[bytes]:
+        """Read a whole object, None if it cannot be read"""
+
+    @abstractmethod
+    def download_range(self, bucket_name: str, object_name: str, offset: int, length: Optional[int] = None) -> Optional[bytes]:
+        """Read length bytes from offset (to the end if length is None)"""
+
+    @abstractmethod
+    def stat(self, bucket_name: str, object_name: str) -> Optional[ObjectInfo]:
+        """Object metadata, None if the object does not exist"""
+
+    def exists(self, bucket_name: str, object_name: str) -> bool:
+        """Whether the object exists"""
+        return self.stat(bucket_name, object_name) is not None
+
+    @abstractmethod
+    def delete(self, bucket_name: str, object_name: str) -> bool:
+        """Delete an object"""
+
+    @abstractmethod
+    def list_objects(self, bucket_name: str, prefix: Optional[str] = None, start_after: Optional[str] = None) -> Iterator[ObjectInfo]:
+        """Stream objects under a prefix in UTF-8 byte order, starting after start_after"""
+
+    @abstractmethod
+    def remove_objects(self, bucket_name: str, object_names: Iterable[str]) -> List[str]:
+        """Delete many objects, returning the names that could not be deleted"""
+
+    def local_path(self, bucket_name: str, object_name: str) -> Optional[str]:
+        """Filesystem path of the object if the backend stores it locally (served with FileResponse)"""
+        return None
+
+    def open_cached(self, bucket_name: str, object_name: str) -> Optional[BinaryIO]:
+        """Open a node-local cached copy without a remote call, None if not cached"""
+        return None
+
+
+class MinioStorageBackend(StorageBackend):
+    """Backend on the MinIO/S3 helpers of app.utils.minio (with the disk cache tier)"""
+
+    name = "minio"
+
+    def __init__(self, shard: ShardConfig):
+        self.shard = shard
+        self.bucket_name = shard.bucket
+        self._client: Optional[Minio] = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self) -> Minio:
+        """Client of the shard endpoint; the default shard shares the process-wide client"""
+        if self.shard.name == DEFAULT_SHARD:
+            return get_minio_client()
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    client = create_minio_client(
+                        self.shard.endpoint,
+                        self.shard.access_key,
+                        self.shard.secret_key,
+                        self.shard.secure,
+                    )
+                    ensure_bucket_public_access(client, self.bucket_name)
+                    self._client = client
+        return self._client
+
+    def init(self) -> None:
+        init_minio_client(self.client)
+
+    def upload(self, bucket_name, object_name, file_bytes, content_type=None, cache_control=None) -> bool:
+        return upload_bytes_to_minio(
+            file_bytes=file_bytes,
+            bucket_name=bucket_name,
+            object_name=object_name,
+            content_type=content_type,
+            cache_control=cache_control,
+            client=self.client,
+        )
+
+    def upload_file(self, bucket_name, object_name, file_path, content_type=None) -> bool:
+        return upload_file_to_minio(
+            file_path=file_path,
+            bucket_name=bucket_name,
+            object_name=object_name,
+            content_type=content_type,
+            client=self.client,
+        )
+
+    def download(self, bucket_name, object_name) -> Optional[bytes]:
+        return download_file_from_minio(bucket_name=bucket_name, object_name=object_name, client=self.client)
+
+    def download_range(self, bucket_name, object_name, offset, length=None) -> Optional[bytes]:
+        return download_range_from_minio(
+            bucket_name=bucket_name,
+            object_name=object_name,
+            offset=offset,
+            length=length,
+            client=self.client,
+        )
+
+    def stat(self, bucket_name, object_name) -> Optional[ObjectInfo]:
+        obj = stat_object_in_minio(bucket_name=bucket_name, object_name=object_name, client=self.client)
+        return _object_info(obj) if obj is not None else None
+
+    def exists(self, bucket_name, object_name) -> bool:
+        return file_exists_in_minio(bucket_name=bucket_name, object_name=object_name, client=self.client)
+
+    def delete(self, bucket_name, object_name) -> bool:
+        return delete_file_from_minio(bucket_name=bucket_name, object_name=object_name, client=self.client)
+
+    def list_objects(self, bucket_name, prefix=None, start_after=None) -> Iterator[ObjectInfo]:
+        for obj in list_objects_in_minio(bucket_name, prefix=prefix, start_after=start_after, client=self.client):
+            yield _object_info(obj)
+
+    def remove_objects(self, bucket_name, object_names) -> List[str]:
+        return remove_objects_from_minio(bucket_name, object_names, client=self.client)
+
+    def open_cached(self, bucket_name, object_name) -> Optional[BinaryIO]:
+        return open_cached_object(bucket_name, object_name)
+
+
+def _object_info(obj) -> ObjectInfo:
+    return ObjectInfo(
+        object_name=obj.object_name,
+        size=obj.size or 0,
+        last_modified=obj.last_modified,
+        etag=obj.etag,
+        content_type=obj.content_type,
+    )
+
+
+_backends: Dict[str, StorageBackend] = {}
+_backend_lock = threading.Lock()
+
+
+def get_storage_backend(shard: Optional[str] = None) -> StorageBackend:
+    """
+    Get the process-wide backend of a storage shard, selected by STORAGE_BACKEND.
+
+    Args:
+        shard: Shard name (Project.storage_shard), None for the default shard
+
+    Raises:
+        ValueError: If the backend type or the shard is unknown
+    """
+    shard_config = get_shard(shard)
+    backend = _backends.get(shard_config.name)
+    if backend is None:
+        with _backend_lock:
+            backend = _backends.get(shard_config.name)
+            if backend is None:
+                if settings.STORAGE_BACKEND == "local":
+                    from app.utils.local_storage import LocalFileSystemStorageBackend
+
+                    # Shards are separate bucket directories under the same root
+                    backend = LocalFileSystemStorageBackend(settings.STORAGE_LOCAL_ROOT, shard_config.bucket)
+                elif settings.STORAGE_BACKEND == "minio":
+                    backend = MinioStorageBackend(shard_config)
+                else:
+                    raise ValueError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
+                _backends[shard_config.name] = backend
+    return backend
@@ -0,0 +1,140 @@
+"""
+Storage shard registry and placement.
+
+Objects of a project live on one storage shard (a MinIO endpoint and
+bucket). The "default" shard comes from the MINIO_* settings; more are
+declared in MINIO_SHARDS. New projects are placed by consistent hashing
+of the project id, and the chosen shard is recorded on the project
+(Project.storage_shard), so reads never depend on the current ring.
+
+Adding a shard or changing a weight only moves the projects whose ring
+position changed (about weight / total of them); the rebalance job
+migrates those in the background. A weight of 0 drains a shard: it
+receives no new projects and the rebalance job moves its projects away.
+
+Usage:
+    from app.utils.storage_shards import shard_for_project
+
+    project.storage_shard = shard_for_project(project.id)
+"""
+
+import bisect
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+DEFAULT_SHARD = "default"
+# Virtual nodes per unit of weight, smooths the share of each shard
+RING_VNODES = 160
+
+
+@dataclass(frozen=True)
+class ShardConfig:
+    """Connection settings of one storage shard"""
+
+    name: str
+    endpoint: str
+    access_key: str
+    secret_key: str
+    bucket: str
+    public_url: str
+    secure: bool = False
+    weight: int = 1
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent-hash ring with weighted virtual nodes"""
+
+    def __init__(self, weights: Dict[str, int], vnodes: int = RING_VNODES):
+        points = sorted(
+            (_hash(f"{name}#{index}"), name)
+            for name, weight in weights.items()
+            for index in range(max(weight, 0) * vnodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._names = [name for _, name in points]
+
+    def get(self, key: str) -> Optional[str]:
+        """Shard owning the key (first virtual node clockwise), None for an empty ring"""
+        if not self._hashes:
+            return None
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._names[index]
+
+
+_shards: Optional[Dict[str, ShardConfig]] = None
+_ring: Optional[HashRing] = None
+_shards_lock = threading.Lock()
+
+
+def _load_shards() -> Dict[str, ShardConfig]:
+    shards = {
+        DEFAULT_SHARD: ShardConfig(
+            name=DEFAULT_SHARD,
+            endpoint=settings.MINIO_ENDPOINT,
+            access_key=settings.MINIO_ACCESS_KEY,
+            secret_key=settings.MINIO_SECRET_KEY,
+            bucket=settings.MINIO_BUCKET_NAME,
+            public_url=settings.MINIO_PUBLIC_URL,
+            secure=settings.MINIO_SECURE,
+            weight=settings.MINIO_DEFAULT_SHARD_WEIGHT,
+        )
+    }
+    for entry in settings.MINIO_SHARDS:
+        shard = ShardConfig(
+            name=entry["name"],
+            endpoint=entry["endpoint"],
+            access_key=entry["access_key"],
+            secret_key=entry["secret_key"],
+            bucket=entry.get("bucket", settings.MINIO_BUCKET_NAME),
+            public_url=entry.get("public_url") or f"{'https' if entry.get('secure') else 'http'}://{entry['endpoint']}",
+            secure=bool(entry.get("secure", False)),
+            weight=int(entry.get("weight", 1)),
+        )
+        if shard.name in shards:
+            raise ValueError(f"Duplicate storage shard name: {shard.name}")
+        shards[shard.name] = shard
+    return shards
+
+
+def get_shards() -> Dict[str, ShardConfig]:
+    """All configured shards by name, the default shard included"""
+    global _shards, _ring
+    if _shards is None:
+        with _shards_lock:
+            if _shards is None:
+                shards = _load_shards()
+                _ring = HashRing({shard.name: shard.weight for shard in shards.values()})
+                _shards = shards
+    return _shards
+
+
+def get_shard(name: Optional[str] = None) -> ShardConfig:
+    """
+    Get a shard by name (None means the default shard).
+
+    Raises:
+        ValueError: If the shard is not configured
+    """
+    shard = get_shards().get(name or DEFAULT_SHARD)
+    if shard is None:
+        raise ValueError(f"Unknown storage shard: {name}")
+    return shard
+
+
+def shard_names() -> List[str]:
+    """Names of all configured shards"""
+    return list(get_shards())
+
+
+def shard_for_project(project_id) -> str:
+    """Shard a project is placed on by the current ring (default when every weight is 0)"""
+    get_shards()
+    return _ring.get(str(project_id)) or DEFAULT_SHARD
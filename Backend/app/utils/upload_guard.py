@@ -0,0 +1,226 @@
+"""
+ASGI guard that rejects bad uploads before the body is spooled.
+
+Starlette parses and spools the whole multipart body before an endpoint
+can look at the file. This middleware sits in front of the upload routes
+and inspects the stream as it arrives:
+
+- Content-Length above the route limit is rejected with 413 before any
+  body is read
+- every file part is counted and rejected with 413 once it exceeds the
+  per-file limit
+- the first bytes of every file part are sniffed for the JPEG magic bytes
+  and frame dimensions; anything else is rejected with 415
+
+Bulk routes only get the whole-request size cap: one bad file must not
+abort the batch, so their files are checked one by one by the service,
+which reports each rejected file in its results.
+
+The client-supplied part Content-Type is never trusted.
+"""
+
+from typing import Optional
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.constant.messages import MessageConstants
+from app.schemas.common import ApiResponse
+from app.utils.image_utils import is_jpeg_header, sniff_jpeg_dimensions
+from app.utils.logging import logger
+
+
+class UploadRejected(Exception):
+    """Raised by the multipart inspector when an upload must be aborted"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+class _MultipartInspector:
+    """Incremental multipart inspector fed with raw body chunks"""
+
+    def __init__(self, boundary: bytes):
+        self.error: Optional[UploadRejected] = None
+        self._header_field = b""
+        self._header_value = b""
+        self._is_file = False
+        self._part_size = 0
+        self._sniff_buffer = b""
+        self._sniff_done = False
+        self._parser = MultipartParser(
+            boundary,
+            callbacks={
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            },
+        )
+
+    def feed(self, chunk: bytes) -> Optional[UploadRejected]:
+        """Feed a body chunk, returns the rejection once one is found"""
+        if self.error is None and chunk:
+            try:
+                self._parser.write(chunk)
+            except UploadRejected as e:
+                self.error = e
+            except Exception as e:
+                # Malformed multipart is left to the endpoint's own parser
+                logger.debug(f"Upload guard could not parse multipart body: {e}")
+        return self.error
+
+    def _on_part_begin(self) -> None:
+        self._header_field = b""
+        self._header_value = b""
+        self._is_file = False
+        self._part_size = 0
+        self._sniff_buffer = b""
+        self._sniff_done = False
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        if self._header_field.lower() == b"content-disposition":
+            _, options = parse_options_header(self._header_value)
+            self._is_file = b"filename" in options
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if not self._is_file:
+            return
+
+        self._part_size += end - start
+        if self._part_size > settings.UPLOAD_MAX_FILE_SIZE:
+            raise UploadRejected(413, MessageConstants.FILE_TOO_LARGE)
+
+        if not self._sniff_done:
+            self._sniff_buffer += data[start : min(end, start + settings.UPLOAD_SNIFF_BYTES - len(self._sniff_buffer))]
+            self._check_header(final=len(self._sniff_buffer) >= settings.UPLOAD_SNIFF_BYTES)
+
+    def _on_part_end(self) -> None:
+        if self._is_file and not self._sniff_done:
+            self._check_header(final=True)
+
+    def _check_header(self, final: bool) -> None:
+        """Validate magic bytes and, when reachable, the frame dimensions"""
+        if len(self._sniff_buffer) < 3 and not final:
+            return
+        if not is_jpeg_header(self._sniff_buffer):
+            raise UploadRejected(415, MessageConstants.INVALID_FILE_TYPE)
+
+        dimensions = sniff_jpeg_dimensions(self._sniff_buffer)
+        if dimensions:
+            width, height = dimensions
+            if width > settings.UPLOAD_MAX_IMAGE_DIMENSION or height > settings.UPLOAD_MAX_IMAGE_DIMENSION:
+                raise UploadRejected(413, MessageConstants.IMAGE_DIMENSIONS_TOO_LARGE)
+            self._sniff_done = True
+        elif final:
+            # Frame header beyond the sniff window (large EXIF block): magic bytes are enough
+            self._sniff_done = True
+
+
+class UploadGuardMiddleware:
+    """
+    Middleware that aborts oversized or non-JPEG uploads early.
+
+    Only POST requests to the photo upload routes are inspected; the body
+    is passed through to the application unchanged while it is checked.
+    File parts of bulk routes are not inspected (request size cap only).
+    """
+
+    def __init__(self, app):
+        self.app = app
+        photos_path = f"{settings.API_V1_STR}/photos"
+        self.route_limits = {
+            photos_path: settings.UPLOAD_MAX_FILE_SIZE + settings.UPLOAD_MULTIPART_OVERHEAD,
+            f"{photos_path}/edited": settings.UPLOAD_MAX_FILE_SIZE + settings.UPLOAD_MULTIPART_OVERHEAD,
+            f"{photos_path}/edited/bulk": settings.UPLOAD_MAX_BULK_REQUEST_SIZE,
+        }
+        self.bulk_routes = {f"{photos_path}/edited/bulk"}
+
+    @staticmethod
+    def _route_path(scope) -> str:
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path) :]
+        return path.rstrip("/")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        route_path = self._route_path(scope)
+        request_limit = self.route_limits.get(route_path)
+        if request_limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        content_length = headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > request_limit:
+            await self._reject(scope, receive, send, UploadRejected(413, MessageConstants.FILE_TOO_LARGE))
+            return
+
+        content_type, options = parse_options_header(headers.get("content-type", ""))
+        boundary = options.get(b"boundary")
+        if content_type != b"multipart/form-data" or not boundary:
+            await self.app(scope, receive, send)
+            return
+
+        inspector = None if route_path in self.bulk_routes else _MultipartInspector(boundary)
+        received = 0
+        rejection: Optional[UploadRejected] = None
+
+        async def guarded_receive():
+            nonlocal received, rejection
+            message = await receive()
+            if message["type"] != "http.request" or rejection is not None:
+                return message
+
+            body = message.get("body", b"")
+            received += len(body)
+            if received > request_limit:
+                rejection = UploadRejected(413, MessageConstants.FILE_TOO_LARGE)
+            elif inspector is not None:
+                rejection = inspector.feed(body)
+
+            if rejection is not None:
+                await self._reject(scope, receive, send, rejection)
+                # Stop the application's body parser without reading the rest
+                return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            # The rejection response has already been sent
+            if rejection is None:
+                await send(message)
+
+        try:
+            await self.app(scope, guarded_receive, guarded_send)
+        except Exception:
+            if rejection is None:
+                raise
+
+    @staticmethod
+    async def _reject(scope, receive, send, rejection: UploadRejected) -> None:
+        logger.warning(f"Upload rejected on {scope['path']}: {rejection.status_code} {rejection.message}")
+        response = JSONResponse(
+            status_code=rejection.status_code,
+            content=ApiResponse(message=rejection.message, success=False, data=None).model_dump(),
+            headers={"Connection": "close"},
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,95 @@
+"""
+Streaming ZIP writer.
+
+Builds a ZIP archive incrementally and hands out the bytes as they are
+produced, so an archive of any size is sent with constant memory. The
+stdlib zipfile writes into an unseekable sink: every entry gets a local
+header up front and a data descriptor (CRC and sizes) after its data, and
+the central directory is emitted on close. Zip64 records are written
+automatically once entries or offsets pass the 4 GB / 65535 entry limits.
+
+Usage:
+    writer = ZipStreamWriter()
+    for chunk in writer.write_entry("Selected/JPG/a.jpg", file_bytes):
+        yield chunk
+    yield writer.close()
+"""
+
+from datetime import datetime
+from typing import Iterator, List, Optional
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
+
+WRITE_CHUNK_SIZE = 256 * 1024
+
+# Formats that are already compressed: deflating them only costs CPU
+STORED_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".zip")
+
+
+class _StreamSink:
+    """Unseekable write target collecting ZIP output until it is drained"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ZipStreamWriter:
+    """Incremental ZIP writer yielding output chunks per entry"""
+
+    def __init__(self):
+        self._sink = _StreamSink()
+        # No tell/seek on the sink: zipfile switches to data descriptors
+        self._zip = ZipFile(self._sink, "w", allowZip64=True)
+
+    def write_entry(
+        self,
+        arcname: str,
+        data: bytes,
+        compress: Optional[bool] = None,
+        modified_at: Optional[datetime] = None,
+    ) -> Iterator[bytes]:
+        """
+        Add one file and yield the archive bytes it produces.
+
+        Args:
+            arcname: Path inside the archive
+            data: File content
+            compress: Deflate the entry (default: only if the extension is not already compressed)
+            modified_at: Timestamp stored in the entry (default: now)
+
+        Yields:
+            Archive chunks (local header, data, data descriptor)
+        """
+        if compress is None:
+            compress = not arcname.lower().endswith(STORED_EXTENSIONS)
+        zinfo = ZipInfo(arcname, date_time=(modified_at or datetime.now()).timetuple()[:6])
+        zinfo.compress_type = ZIP_DEFLATED if compress else ZIP_STORED
+        # Known size up front: Zip64 extra fields are only added to entries that need them
+        zinfo.file_size = len(data)
+
+        view = memoryview(data)
+        with self._zip.open(zinfo, "w") as entry:
+            for offset in range(0, len(view), WRITE_CHUNK_SIZE):
+                entry.write(view[offset : offset + WRITE_CHUNK_SIZE])
+                chunk = self._sink.drain()
+                if chunk:
+                    yield chunk
+        tail = self._sink.drain()
+        if tail:
+            yield tail
+
+    def close(self) -> bytes:
+        """Finish the archive, returning the central directory bytes"""
+        self._zip.close()
+        return self._sink.drain()
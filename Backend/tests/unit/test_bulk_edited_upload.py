@@ -0,0 +1,65 @@
+"""
+Tests for photo_service.upload_edited_photos_bulk result accounting.
+
+Database and storage calls are replaced by mocks: the test checks which
+files are reported as applied when several files of a batch resolve to
+the same photo, and which content references are kept or released.
+"""
+
+import asyncio
+import hashlib
+import io
+from unittest import mock
+
+from fastapi import UploadFile
+from PIL import Image
+from starlette.datastructures import Headers
+
+from app.crud.photo_crud import PhotoFilenameIndex
+from app.models.photo import Photo
+from app.models.project import Project
+from app.models.user import User
+from app.services import photo_service
+
+
+def _jpeg(color: str) -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", (8, 8), color).save(output, format="JPEG")
+    return output.getvalue()
+
+
+def _upload(filename: str, data: bytes) -> UploadFile:
+    return UploadFile(io.BytesIO(data), filename=filename, headers=Headers({"content-type": "image/jpeg"}))
+
+
+async def _store_content(_db, _project, file_bytes, _content_type=None):
+    return mock.Mock(content_hash=hashlib.sha256(file_bytes).hexdigest())
+
+
+def test_later_file_for_the_same_photo_supersedes_the_earlier_one():
+    user = User(google_uid="uid", email="owner@example.com")
+    project = Project(owner_id=user.id, title="Project")
+    photo = Photo(project_id=project.id, filename="IMG_1.jpg", is_selected=True)
+    other = Photo(project_id=project.id, filename="IMG_2.jpg", is_selected=True)
+    first, second, third = _jpeg("red"), _jpeg("blue"), _jpeg("green")
+    files = [_upload("IMG_1.jpg", first), _upload("IMG_1_edit.jpg", second), _upload("IMG_2.jpg", third)]
+
+    with (
+        mock.patch.object(photo_service.project_crud, "get_by_id", return_value=project),
+        mock.patch.object(photo_service.photo_crud, "get_filename_index", return_value=PhotoFilenameIndex([photo, other])),
+        mock.patch.object(photo_service.photo_version_crud, "get_by_photos_and_version_type", return_value={}),
+        mock.patch.object(photo_service.photo_version_crud, "bulk_upsert_photo_versions") as bulk_upsert,
+        mock.patch.object(photo_service, "store_content", side_effect=_store_content),
+        mock.patch.object(photo_service, "release_content") as release_content,
+    ):
+        response = asyncio.run(photo_service.upload_edited_photos_bulk(mock.Mock(), user, project.id, files))
+
+    assert [result.status for result in response.results] == ["superseded", "uploaded", "uploaded"]
+    assert [result.photo_id for result in response.results] == [photo.id, photo.id, other.id]
+    assert response.uploaded == 2
+    assert response.failed == 0
+
+    # The superseded file's reference is released, the later one is written
+    release_content.assert_called_once_with(mock.ANY, hashlib.sha256(first).hexdigest(), project.storage_shard)
+    rows = {row["photo_id"]: row["content_hash"] for row in bulk_upsert.call_args.args[2]}
+    assert rows == {photo.id: hashlib.sha256(second).hexdigest(), other.id: hashlib.sha256(third).hexdigest()}
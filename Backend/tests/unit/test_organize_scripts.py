@@ -0,0 +1,157 @@
+"""
+Tests for the generated organize scripts (photo_download_service).
+
+The scripts are run against a scratch directory holding files whose names
+need quoting: spaces, quotes, `$`, backticks, brackets and a leading `-`.
+The bash script always runs; the PowerShell script runs when pwsh is on
+the PATH, and its string literals are checked in Python otherwise.
+"""
+
+import shutil
+import subprocess
+import time
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from app.schemas.photo_download import PhotoManifest, PhotoManifestItem
+from app.services.photo_download_service import _POWERSHELL_QUOTES, _powershell_quote, generate_script_templates
+
+SELECTED = [
+    "with space.jpg",
+    "it's.jpg",
+    'double"quote.jpg',
+    "dollar$HOME.jpg",
+    "$(touch pwned).jpg",
+    "back`tick`.jpg",
+    "[bracket].jpg",
+    "a]=1 [b.jpg",
+    "-leading dash.jpg",
+    "--.jpg",
+    "smart’quote.jpg",
+    "*.jpg",
+    "UPPER.CR2",
+]
+NOT_SELECTED = [
+    "other space.jpg",
+    "-n.jpg",
+    "${HOME}.jpg",
+    "bracket].jpg",
+    "plain.cr2",
+]
+TITLE = "Wedding\n touch title_injected\r\n"
+
+
+def _script(name: str, selected: List[str], title: str = TITLE) -> str:
+    manifest = PhotoManifest(
+        project_title=title,
+        total_selected=len(selected),
+        photos=[PhotoManifestItem(filename=filename) for filename in selected],
+    )
+    return next(template.content for template in generate_script_templates(manifest) if template.name == name)
+
+
+def _populate(directory: Path, filenames: List[str]) -> None:
+    directory.mkdir()
+    for filename in filenames:
+        (directory / filename).write_bytes(filename.encode())
+
+
+def _assert_organized(directory: Path, selected: List[str], not_selected: List[str]) -> None:
+    for filename in selected:
+        ext = filename.rsplit(".", 1)[-1].upper()
+        assert (directory / "Selected" / ext / filename).read_bytes() == filename.encode(), filename
+    for filename in not_selected:
+        ext = filename.rsplit(".", 1)[-1].upper()
+        assert (directory / "NotSelected" / ext / filename).read_bytes() == filename.encode(), filename
+    assert sorted(path.name for path in directory.iterdir()) == ["NotSelected", "Selected"]
+
+
+def _run(command: List[str], script: str, directory: Path) -> None:
+    """Run the script (kept outside the photo directory) from the photo directory"""
+    script_path = directory.parent / "organize"
+    script_path.write_text(script)
+    result = subprocess.run([*command, str(script_path)], cwd=directory, capture_output=True, text=True, timeout=600)
+    assert result.returncode == 0, result.stderr
+    assert "Organization complete!" in result.stdout
+
+
+def test_project_title_stays_on_its_comment_line():
+    for name in ("bash", "zsh", "powershell"):
+        script = _script(name, SELECTED)
+        assert "\n touch title_injected" not in script
+        assert "# Project: Wedding  touch title_injected" in script
+
+
+def test_bash_script_organizes_filenames_needing_quotes(tmp_path):
+    photos = tmp_path / "photos"
+    _populate(photos, SELECTED + NOT_SELECTED)
+
+    _run(["bash"], _script("bash", SELECTED), photos)
+
+    _assert_organized(photos, SELECTED, NOT_SELECTED)
+    assert not (photos / "pwned").exists()
+
+
+@pytest.mark.skipif(shutil.which("zsh") is None, reason="zsh is not installed")
+def test_zsh_script_organizes_filenames_needing_quotes(tmp_path):
+    photos = tmp_path / "photos"
+    _populate(photos, SELECTED + NOT_SELECTED)
+
+    _run(["zsh"], _script("zsh", SELECTED), photos)
+
+    _assert_organized(photos, SELECTED, NOT_SELECTED)
+
+
+@pytest.mark.skipif(shutil.which("pwsh") is None, reason="pwsh is not installed")
+def test_powershell_script_organizes_filenames_needing_quotes(tmp_path):
+    photos = tmp_path / "photos"
+    _populate(photos, SELECTED + NOT_SELECTED)
+
+    _run(["pwsh", "-NoProfile", "-NonInteractive", "-File"], _script("powershell", SELECTED), photos)
+
+    _assert_organized(photos, SELECTED, NOT_SELECTED)
+
+
+def _parse_powershell_literal(literal: str) -> str:
+    """Value of a single-quoted PowerShell string literal (any quote doubled inside)"""
+    assert literal[0] == "'" and literal[-1] == "'"
+    body, value, index = literal[1:-1], [], 0
+    while index < len(body):
+        char = body[index]
+        if char in _POWERSHELL_QUOTES:
+            # A lone quote would end the literal
+            assert body[index + 1 : index + 2] == char, literal
+            index += 1
+        value.append(char)
+        index += 1
+    return "".join(value)
+
+
+def test_powershell_literals_round_trip():
+    for filename in SELECTED + NOT_SELECTED + ["‘‚‛'mixed'.jpg"]:
+        assert _parse_powershell_literal(_powershell_quote(filename)) == filename
+
+    script = _script("powershell", SELECTED)
+    for filename in SELECTED[:-1]:
+        assert f"\n    {_powershell_quote(filename)},\n" in script
+    assert f"\n    {_powershell_quote(SELECTED[-1])}\n)" in script
+
+
+@pytest.mark.slow
+def test_bash_script_with_10k_entries(tmp_path):
+    selected = [f"IMG_{index:05d} selected.jpg" for index in range(0, 10_000, 2)]
+    not_selected = [f"IMG_{index:05d}.jpg" for index in range(1, 10_000, 2)]
+
+    start = time.perf_counter()
+    content = _script("bash", selected)
+    assert time.perf_counter() - start < 1.0
+
+    photos = tmp_path / "photos"
+    _populate(photos, selected + not_selected)
+
+    _run(["bash"], content, photos)
+
+    assert len(list((photos / "Selected" / "JPG").iterdir())) == len(selected)
+    assert len(list((photos / "NotSelected" / "JPG").iterdir())) == len(not_selected)
@@ -0,0 +1,217 @@
+"""
+Round-trip tests for project backups (project_backup_service).
+
+A project is backed up from one environment and restored into another,
+each an in-memory SQLite database with a local storage backend. Parts
+hold one row each, so resuming after any committed part is exercised:
+reference counts on stored objects must come out exactly as on the
+source, however often parts are replayed.
+"""
+
+import asyncio
+import hashlib
+import io
+from zipfile import ZipFile
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+import app.models  # noqa: F401  (registers every table)
+from app.core.config import settings
+from app.models.client_session import ClientSession
+from app.models.photo import Photo
+from app.models.photo_comment import PhotoComment
+from app.models.photo_version import PhotoVersion, VersionType
+from app.models.project import Project
+from app.models.stored_object import StoredObject
+from app.models.user import User
+from app.services import project_backup_service
+from app.services.object_store_service import build_public_url, object_name_for_hash, webp_object_name_for_hash
+from app.utils import storage_backend
+from app.utils.storage_backend import get_storage_backend
+
+ROW_MODELS = (Photo, PhotoVersion, PhotoComment, ClientSession)
+
+
+class Environment:
+    """A database and a storage root, made current with activate()"""
+
+    def __init__(self, root, monkeypatch):
+        self.root = str(root)
+        self.monkeypatch = monkeypatch
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        SQLModel.metadata.create_all(self.engine)
+
+    def activate(self):
+        self.monkeypatch.setattr(settings, "STORAGE_LOCAL_ROOT", self.root)
+        self.monkeypatch.setattr(storage_backend, "_backends", {})
+        backend = get_storage_backend()
+        backend.init()
+        return backend
+
+    def session(self) -> Session:
+        return Session(self.engine, expire_on_commit=False)
+
+
+@pytest.fixture
+def environments(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "local")
+    monkeypatch.setattr(settings, "PROJECT_BACKUP_BATCH_SIZE", 1)
+    return Environment(tmp_path / "source", monkeypatch), Environment(tmp_path / "target", monkeypatch)
+
+
+def _store(db: Session, backend, data: bytes, ref_count: int) -> str:
+    content_hash = hashlib.sha256(data).hexdigest()
+    backend.upload(backend.bucket_name, object_name_for_hash(content_hash), data, "image/jpeg")
+    backend.upload(backend.bucket_name, webp_object_name_for_hash(content_hash), b"webp " + data, "image/webp")
+    db.add(
+        StoredObject(
+            content_hash=content_hash,
+            object_name=object_name_for_hash(content_hash),
+            size=len(data),
+            content_type="image/jpeg",
+            ref_count=ref_count,
+        )
+    )
+    return content_hash
+
+
+def _create_project(env: Environment) -> Project:
+    """Two photos, three versions (two sharing content), comments, a session and a legacy object"""
+    backend = env.activate()
+    with env.session() as db:
+        user = User(google_uid="owner", email="owner@example.com")
+        project = Project(owner_id=user.id, title="Backed up")
+        first = Photo(project_id=project.id, filename="IMG_1.jpg", is_selected=True)
+        second = Photo(project_id=project.id, filename="IMG_2.jpg")
+        shared_hash = _store(db, backend, b"shared original", ref_count=2)
+        edited_hash = _store(db, backend, b"edited", ref_count=1)
+        db.add_all([user, project, first, second])
+        for photo, version_type, content_hash in (
+            (first, VersionType.ORIGINAL, shared_hash),
+            (second, VersionType.ORIGINAL, shared_hash),
+            (first, VersionType.EDITED, edited_hash),
+        ):
+            db.add(
+                PhotoVersion(
+                    photo_id=photo.id,
+                    version_type=version_type.value,
+                    image_url=build_public_url(object_name_for_hash(content_hash)),
+                    content_hash=content_hash,
+                )
+            )
+        db.add_all(
+            [
+                PhotoComment(photo_id=first.id, content="Brighter please"),
+                PhotoComment(photo_id=second.id, content="Crop left"),
+                ClientSession(token="guest-token", project_id=project.id),
+            ]
+        )
+        backend.upload(backend.bucket_name, f"{project.id}/original/IMG_0.jpg", b"legacy", "image/jpeg")
+        db.commit()
+        return project
+
+
+def _backup(env: Environment, project: Project) -> bytes:
+    env.activate()
+
+    async def collect() -> bytes:
+        with env.session() as db:
+            return b"".join([chunk async for chunk in project_backup_service.stream_project_backup(db, project)])
+
+    return asyncio.run(collect())
+
+
+def _restore(env: Environment, backup: bytes, owner_id, **kwargs) -> dict:
+    env.activate()
+    with env.session() as db, ZipFile(io.BytesIO(backup)) as zip_file:
+        return project_backup_service.restore_project_backup(db, zip_file, owner_id, **kwargs)
+
+
+def _row_counts(env: Environment) -> dict:
+    with env.session() as db:
+        return {model.__name__: len(db.exec(select(model)).all()) for model in ROW_MODELS}
+
+
+def _ref_counts(env: Environment) -> dict:
+    with env.session() as db:
+        return {row.content_hash: row.ref_count for row in db.exec(select(StoredObject)).all()}
+
+
+def _object_names(env: Environment) -> list:
+    backend = env.activate()
+    return [info.object_name for info in backend.list_objects(backend.bucket_name)]
+
+
+def _parts(backup: bytes) -> int:
+    with ZipFile(io.BytesIO(backup)) as zip_file:
+        return len(project_backup_service.read_backup_manifest(zip_file)["entries"])
+
+
+class Interrupted(Exception):
+    pass
+
+
+def test_backup_restores_every_row_and_object(environments):
+    source, target = environments
+    project = _create_project(source)
+    backup = _backup(source, project)
+
+    result = _restore(target, backup, project.owner_id)
+
+    assert result["project_id"] == str(project.id)
+    assert result["objects_written"] == 5
+    assert result["objects_rejected"] == 0
+    assert _row_counts(target) == _row_counts(source) == {"Photo": 2, "PhotoVersion": 3, "PhotoComment": 2, "ClientSession": 1}
+    assert _ref_counts(target) == _ref_counts(source)
+    assert sorted(_object_names(target)) == sorted(_object_names(source))
+
+
+def test_resumed_and_repeated_restores_keep_reference_counts(environments):
+    source, target = environments
+    project = _create_project(source)
+    backup = _backup(source, project)
+    parts = _parts(backup)
+
+    # Interrupt after committing each part in turn, before its checkpoint is saved
+    for interrupt_at in range(1, parts + 1):
+
+        def checkpoint(index, interrupt_at=interrupt_at):
+            if index == interrupt_at:
+                raise Interrupted()
+
+        with pytest.raises(Interrupted):
+            _restore(target, backup, project.owner_id, on_checkpoint=checkpoint)
+        # The checkpoint before the interruption, so the committed part is replayed
+        _restore(target, backup, project.owner_id, entries_done=interrupt_at - 1)
+        assert _ref_counts(target) == _ref_counts(source)
+
+    for entries_done in (0, parts // 2, parts):
+        result = _restore(target, backup, project.owner_id, entries_done=entries_done)
+        assert result["objects_written"] == 0
+        assert _ref_counts(target) == _ref_counts(source)
+    assert _row_counts(target) == _row_counts(source)
+
+
+def test_object_not_matching_its_hash_is_rejected(environments):
+    source, target = environments
+    project = _create_project(source)
+    backup = _backup(source, project)
+
+    tampered_name = None
+    tampered = io.BytesIO()
+    with ZipFile(io.BytesIO(backup)) as original, ZipFile(tampered, "w") as rewritten:
+        for info in original.infolist():
+            data = original.read(info)
+            if tampered_name is None and project_backup_service._CONTENT_OBJECT_PATTERN.match(info.filename[len("objects/") :]):
+                if not info.filename.endswith(".webp"):
+                    tampered_name, data = info.filename[len("objects/") :], b"not the hashed bytes"
+            rewritten.writestr(info, data)
+    assert tampered_name is not None
+
+    result = _restore(target, tampered.getvalue(), project.owner_id)
+
+    assert result["objects_rejected"] == 1
+    assert result["objects_written"] == 4
+    assert tampered_name not in _object_names(target)
@@ -0,0 +1,87 @@
+"""
+Query-count regression test for photo_crud.get_selection_manifest.
+
+The manifest must come from a constant number of statements whatever the
+number of selected photos (no query per photo for versions, comments or
+sizes). Runs on an in-memory SQLite database built from the models.
+"""
+
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+import app.models  # noqa: F401  (registers every table)
+from app.crud import photo_crud
+from app.models.photo import Photo
+from app.models.photo_comment import PhotoComment
+from app.models.photo_version import PhotoVersion, VersionType
+from app.models.project import Project
+from app.models.stored_object import StoredObject
+from app.models.user import User
+from app.utils import common_utils
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def _create_project(db: Session, photo_count: int) -> Project:
+    """A project with `photo_count` selected photos, each with versions, comments and stored content"""
+    user = User(google_uid=f"uid-{photo_count}", email=f"owner-{photo_count}@example.com")
+    project = Project(owner_id=user.id, title=f"Project with {photo_count} photos")
+    db.add_all([user, project])
+    now = common_utils.get_utc_now()
+    for index in range(photo_count):
+        photo = Photo(project_id=project.id, filename=f"IMG_{index:04d}.jpg", is_selected=True)
+        content_hash = f"{photo_count:032x}{index:032x}"
+        db.add_all(
+            [
+                photo,
+                PhotoVersion(
+                    photo_id=photo.id,
+                    version_type=VersionType.ORIGINAL.value,
+                    image_url=f"http://storage/objects/{content_hash}",
+                    content_hash=content_hash,
+                ),
+                StoredObject(content_hash=content_hash, object_name=f"objects/{content_hash}", size=1000 + index),
+                PhotoComment(photo_id=photo.id, content="first", created_at=now),
+                PhotoComment(photo_id=photo.id, content=f"latest {index}", created_at=now + timedelta(minutes=1)),
+            ]
+        )
+    db.commit()
+    return project
+
+
+def _count_manifest_statements(engine, photo_count: int) -> int:
+    with Session(engine) as db:
+        project_id = _create_project(db, photo_count).id
+        statements = []
+
+        def count_statement(_conn, _cursor, statement, *_args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", count_statement)
+        try:
+            rows = photo_crud.get_selection_manifest(db, project_id, "default", VersionType.EDITED, VersionType.ORIGINAL)
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statement)
+
+    assert len(rows) == photo_count
+    for index, (photo, version, latest_comment, size) in enumerate(rows):
+        assert photo.filename == f"IMG_{index:04d}.jpg"
+        assert version.version_type == VersionType.ORIGINAL.value
+        assert latest_comment == f"latest {index}"
+        assert size == 1000 + index
+    return len(statements)
+
+
+def test_selection_manifest_query_count_is_constant(engine):
+    assert _count_manifest_statements(engine, 1) == 1
+    assert _count_manifest_statements(engine, 25) == 1
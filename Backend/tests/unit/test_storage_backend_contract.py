@@ -0,0 +1,160 @@
+"""
+Contract tests shared by every StorageBackend implementation.
+
+The local filesystem backend always runs. The MinIO backend runs when
+STORAGE_CONTRACT_MINIO_ENDPOINT points at a reachable server (credentials
+and bucket come from the MINIO_* settings); objects are written under a
+unique prefix and removed afterwards.
+"""
+
+import os
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.utils.local_storage import LocalFileSystemStorageBackend
+from app.utils.storage_backend import MinioStorageBackend, StorageBackend
+from app.utils.storage_shards import ShardConfig
+
+MINIO_ENDPOINT = os.environ.get("STORAGE_CONTRACT_MINIO_ENDPOINT")
+
+
+def _minio_backend() -> StorageBackend:
+    shard = ShardConfig(
+        name="contract-tests",
+        endpoint=MINIO_ENDPOINT,
+        access_key=settings.MINIO_ACCESS_KEY,
+        secret_key=settings.MINIO_SECRET_KEY,
+        bucket=settings.MINIO_BUCKET_NAME,
+        public_url=settings.MINIO_PUBLIC_URL,
+        secure=settings.MINIO_SECURE,
+    )
+    return MinioStorageBackend(shard)
+
+
+@pytest.fixture(
+    params=[
+        "local",
+        pytest.param(
+            "minio",
+            marks=[
+                pytest.mark.integration,
+                pytest.mark.skipif(not MINIO_ENDPOINT, reason="STORAGE_CONTRACT_MINIO_ENDPOINT is not set"),
+            ],
+        ),
+    ]
+)
+def backend(request, tmp_path) -> StorageBackend:
+    if request.param == "local":
+        backend = LocalFileSystemStorageBackend(str(tmp_path), "photos")
+    else:
+        backend = _minio_backend()
+    backend.init()
+    return backend
+
+
+@pytest.fixture
+def prefix(backend):
+    prefix = f"contract-tests/{uuid.uuid4().hex}/"
+    yield prefix
+    names = [info.object_name for info in backend.list_objects(backend.bucket_name, prefix=prefix)]
+    backend.remove_objects(backend.bucket_name, names)
+
+
+def test_upload_then_download_round_trips(backend, prefix):
+    name = f"{prefix}photo.jpg"
+
+    assert backend.upload(backend.bucket_name, name, b"first", content_type="image/jpeg")
+    assert backend.download(backend.bucket_name, name) == b"first"
+
+    assert backend.upload(backend.bucket_name, name, b"second version", content_type="image/jpeg")
+    assert backend.download(backend.bucket_name, name) == b"second version"
+
+
+def test_upload_file_streams_a_local_file(backend, prefix, tmp_path):
+    source = tmp_path / "source.bin"
+    source.write_bytes(b"x" * 100_000)
+    name = f"{prefix}archive.zip"
+
+    assert backend.upload_file(backend.bucket_name, name, str(source), "application/zip")
+    assert backend.download(backend.bucket_name, name) == b"x" * 100_000
+
+
+def test_download_missing_object_returns_none(backend, prefix):
+    assert backend.download(backend.bucket_name, f"{prefix}missing.jpg") is None
+
+
+def test_download_range(backend, prefix):
+    name = f"{prefix}range.bin"
+    backend.upload(backend.bucket_name, name, b"0123456789")
+
+    assert backend.download_range(backend.bucket_name, name, 2, 3) == b"234"
+    assert backend.download_range(backend.bucket_name, name, 7) == b"789"
+    assert backend.download_range(backend.bucket_name, name, 0, 10) == b"0123456789"
+
+
+def test_stat_and_exists(backend, prefix):
+    name = f"{prefix}stat.jpg"
+    assert backend.stat(backend.bucket_name, name) is None
+    assert not backend.exists(backend.bucket_name, name)
+
+    backend.upload(backend.bucket_name, name, b"12345", content_type="image/jpeg")
+
+    info = backend.stat(backend.bucket_name, name)
+    assert info is not None
+    assert info.object_name == name
+    assert info.size == 5
+    assert info.last_modified is not None
+    assert backend.exists(backend.bucket_name, name)
+
+
+def test_delete(backend, prefix):
+    name = f"{prefix}deleted.jpg"
+    backend.upload(backend.bucket_name, name, b"bytes")
+
+    assert backend.delete(backend.bucket_name, name)
+    assert not backend.exists(backend.bucket_name, name)
+    # Deleting a missing object succeeds (S3 semantics)
+    assert backend.delete(backend.bucket_name, name)
+
+
+def test_list_objects_with_prefix_in_byte_order(backend, prefix):
+    names = [f"{prefix}a/b.jpg", f"{prefix}a-b.jpg", f"{prefix}a/c/d.jpg", f"{prefix}b.jpg"]
+    for name in names:
+        backend.upload(backend.bucket_name, name, b"x")
+    backend.upload(backend.bucket_name, f"{prefix[:-1]}-other/e.jpg", b"x")
+
+    listed = [info.object_name for info in backend.list_objects(backend.bucket_name, prefix=prefix)]
+    assert listed == sorted(names, key=lambda name: name.encode())
+
+    nested = [info.object_name for info in backend.list_objects(backend.bucket_name, prefix=f"{prefix}a/")]
+    assert nested == [f"{prefix}a/b.jpg", f"{prefix}a/c/d.jpg"]
+
+    after = [info.object_name for info in backend.list_objects(backend.bucket_name, prefix=prefix, start_after=f"{prefix}a/b.jpg")]
+    assert after == [f"{prefix}a/c/d.jpg", f"{prefix}b.jpg"]
+
+    backend.delete(backend.bucket_name, f"{prefix[:-1]}-other/e.jpg")
+
+
+def test_remove_objects(backend, prefix):
+    names = [f"{prefix}{index}.jpg" for index in range(3)]
+    for name in names:
+        backend.upload(backend.bucket_name, name, b"x")
+
+    assert backend.remove_objects(backend.bucket_name, names) == []
+    assert list(backend.list_objects(backend.bucket_name, prefix=prefix)) == []
+
+
+def test_local_delete_prunes_empty_directories(tmp_path):
+    backend = LocalFileSystemStorageBackend(str(tmp_path), "photos")
+    backend.upload("photos", "objects/ab/cd/abcd", b"x")
+    backend.upload("photos", "objects/ab/ef/abef", b"x")
+
+    backend.delete("photos", "objects/ab/cd/abcd")
+    assert not (tmp_path / "photos" / "objects" / "ab" / "cd").exists()
+    assert (tmp_path / "photos" / "objects" / "ab" / "ef").is_dir()
+
+    backend.delete("photos", "objects/ab/ef/abef")
+    assert not (tmp_path / "photos" / "objects").exists()
+    assert (tmp_path / "photos").is_dir()